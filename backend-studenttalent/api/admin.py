@@ -1,10 +1,61 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Profile, Skill, ProfileSkill, Experience, Project, PortfolioLink
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.utils.functional import cached_property
+from .models import User, Profile, Skill, SkillAlias, ProfileSkill, SkillEndorsement, Experience, Project, PortfolioLink, ArchivedProfile, ProfileViewDaily
+from .percolator import percolate_profile
+from .signals import touch_profile
+from .taxonomy import merge_skills, rank_by_usage
+
+# Below this many rows an exact COUNT(*) is cheap enough
+ESTIMATED_COUNT_THRESHOLD = 10000
+# Filtered changelists stop counting here; later pages are reached by narrowing the filter
+FILTERED_COUNT_LIMIT = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Changelist paginator that avoids exact counts of big tables: an unfiltered list uses
+    the planner's row estimate on PostgreSQL, a filtered one counts at most FILTERED_COUNT_LIMIT rows.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if not queryset.query.where and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= ESTIMATED_COUNT_THRESHOLD:
+                return row[0]
+            return queryset.count()
+        return queryset.order_by()[:FILTERED_COUNT_LIMIT].count()
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # The "x of y selected" total would be a second exact COUNT(*) per page
+    show_full_result_count = False
+    list_per_page = 50
+    list_max_show_all = 200
+    # Newest first, straight off the primary key index (changelists and autocomplete alike)
+    ordering = ('-pk',)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Autocomplete results are labelled with __str__, which follows the same relations as the changelist
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if isinstance(self.list_select_related, (list, tuple)) and self.list_select_related:
+            queryset = queryset.select_related(*self.list_select_related)
+        return queryset, may_have_duplicates
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(BaseUserAdmin, ScalableModelAdmin):
     fieldsets = (
         (None, {'fields': ('email', 'password', 'username')}),
         ('Personal info', {'fields': ('first_name', 'last_name', 'role')}),
@@ -23,38 +74,124 @@ class UserAdmin(BaseUserAdmin):
 
 
 @admin.register(Profile)
-class ProfileAdmin(admin.ModelAdmin):
-    list_display = ('user', 'prodi', 'entry_year')
+class ProfileAdmin(ScalableModelAdmin):
+    list_display = ('user', 'prodi', 'entry_year', 'is_active', 'views_total')
+    list_select_related = ('user',)
     search_fields = ('user__email', 'user__first_name', 'prodi')
-    list_filter = ('entry_year',)
+    list_filter = ('is_active', 'entry_year')
+    autocomplete_fields = ('user',)
+    actions = ('activate_profiles', 'deactivate_profiles')
+
+    def _set_active(self, request, queryset, active):
+        profile_ids = list(queryset.exclude(is_active=active).values_list('pk', flat=True))
+        with transaction.atomic():
+            Profile.objects.filter(pk__in=profile_ids).update(is_active=active)
+            # queryset.update() skips the version, ranking and saved-search signals
+            for profile_id in profile_ids:
+                touch_profile(profile_id=profile_id)
+                percolate_profile(profile_id)
+        state = 'activated' if active else 'deactivated'
+        self.message_user(request, f"{len(profile_ids)} profiles {state}.", messages.SUCCESS)
+
+    @admin.action(description="Activate selected profiles")
+    def activate_profiles(self, request, queryset):
+        self._set_active(request, queryset, True)
+
+    @admin.action(description="Deactivate selected profiles")
+    def deactivate_profiles(self, request, queryset):
+        self._set_active(request, queryset, False)
+
+
+class SkillAliasInline(admin.TabularInline):
+    model = SkillAlias
+    fields = ('name',)
+    extra = 1
 
 
 @admin.register(Skill)
-class SkillAdmin(admin.ModelAdmin):
-    search_fields = ('name',)
+class SkillAdmin(ScalableModelAdmin):
+    list_display = ('name', 'key')
+    search_fields = ('name', 'aliases__name')
+    inlines = [SkillAliasInline]
+    actions = ('merge_selected_skills',)
+
+    @admin.action(description="Merge selected skills into the most used one")
+    def merge_selected_skills(self, request, queryset):
+        skills = rank_by_usage(queryset)
+        if len(skills) < 2:
+            self.message_user(request, "Select at least two skills to merge.", messages.WARNING)
+            return
+        target, sources = skills[0], skills[1:]
+        affected = merge_skills(target, sources)
+        self.message_user(
+            request,
+            f"Merged {', '.join(skill.name for skill in sources)} into {target.name} ({len(affected)} profiles updated).",
+            messages.SUCCESS,
+        )
 
 
 @admin.register(ProfileSkill)
-class ProfileSkillAdmin(admin.ModelAdmin):
+class ProfileSkillAdmin(ScalableModelAdmin):
     list_display = ('profile', 'skill', 'level')
+    list_select_related = ('profile__user', 'skill')
     list_filter = ('level',)
     search_fields = ('profile__user__email', 'skill__name')
+    autocomplete_fields = ('profile', 'skill')
+
+
+@admin.register(SkillEndorsement)
+class SkillEndorsementAdmin(ScalableModelAdmin):
+    list_display = ('endorser', 'profile_skill', 'created_at')
+    list_select_related = ('endorser', 'profile_skill__profile__user', 'profile_skill__skill')
+    search_fields = ('endorser__email', 'profile_skill__profile__user__email', 'profile_skill__skill__name')
+    autocomplete_fields = ('profile_skill', 'endorser')
 
 
 @admin.register(Experience)
-class ExperienceAdmin(admin.ModelAdmin):
+class ExperienceAdmin(ScalableModelAdmin):
     list_display = ('profile', 'title', 'company', 'is_current')
+    list_select_related = ('profile__user',)
     list_filter = ('is_current',)
     search_fields = ('profile__user__email', 'title', 'company')
+    autocomplete_fields = ('profile',)
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(ScalableModelAdmin):
     list_display = ('profile', 'title')
+    list_select_related = ('profile__user',)
     search_fields = ('profile__user__email', 'title')
+    autocomplete_fields = ('profile',)
 
 
 @admin.register(PortfolioLink)
-class PortfolioLinkAdmin(admin.ModelAdmin):
+class PortfolioLinkAdmin(ScalableModelAdmin):
     list_display = ('profile', 'url')
+    list_select_related = ('profile__user',)
     search_fields = ('profile__user__email', 'url')
+    autocomplete_fields = ('profile',)
+
+
+@admin.register(ProfileViewDaily)
+class ProfileViewDailyAdmin(ScalableModelAdmin):
+    list_display = ('profile', 'day', 'views')
+    list_select_related = ('profile__user',)
+    list_filter = ('day',)
+    search_fields = ('profile__user__email',)
+    # Written by flush_views(); edits here would drift from Profile.views_total
+    readonly_fields = ('profile', 'day', 'views')
+
+
+@admin.register(ArchivedProfile)
+class ArchivedProfileAdmin(ScalableModelAdmin):
+    list_display = ('profile_id', 'name', 'prodi', 'entry_year', 'reason', 'archived_at')
+    list_filter = ('reason', 'entry_year')
+    search_fields = ('name', 'user__email', 'prodi')
+    readonly_fields = ('profile_id', 'user', 'name', 'prodi', 'entry_year', 'reason', 'archived_at', 'data')
+
+    def get_queryset(self, request):
+        # The snapshot is only needed on the change page
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            queryset = queryset.defer('data')
+        return queryset
@@ -5,5 +5,6 @@ class ApiConfig(AppConfig):
     name = 'api'
 
     def ready(self):
-        # Ensure development seed data is registered when migrations run.
+        # Ensure development seed data is registered when migrations run (the data itself loads lazily).
         import api.seed  # noqa: F401
+        import api.signals  # noqa: F401
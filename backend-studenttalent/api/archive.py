@@ -0,0 +1,198 @@
+"""
+Hot/cold split for student profiles.
+
+archive_profiles() moves profiles that match the archiving criteria out of the live tables
+in batches, one transaction per batch. A profile and its related rows (skills with their
+endorsements, experiences, projects and portfolio links) are serialized into a single
+ArchivedProfile row and the live rows are deleted. The regular delete signals keep the change
+feed, rankings, trending rollups and saved-search matches in step.
+
+restore_profile() loads the rows back with their original ids and stamps Profile.restored_at.
+A restored profile is no longer a graduated candidate (the student chose to keep it live); it
+is archived again only once it is deactivated and goes stale. Reads never restore: a
+student whose profile was archived gets a 409 from GET /profiles/me/ and restores it with
+POST /profiles/me/restore/, or by saving their profile (get_or_restore_profile).
+
+Archived project images stay in storage: gc_storage_objects counts the image keys inside
+ArchivedProfile.data as referenced (archived_storage_keys).
+"""
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+from itertools import chain
+
+from django.conf import settings
+from django.core import serializers
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ArchivedProfile, Profile, ProfileSkill, Skill, SkillEndorsement, User
+
+ARCHIVE_BATCH_SIZE = 100
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def archive_candidates(inactive_days=None, graduated_years=None, limit=None):
+    """(profile_id, reason) for every live profile due for archiving; 0 disables a criterion.
+
+    Restored profiles are only archived again by the inactive criterion.
+    """
+    inactive_days = settings.ARCHIVE_INACTIVE_AFTER_DAYS if inactive_days is None else inactive_days
+    graduated_years = settings.ARCHIVE_GRADUATED_AFTER_YEARS if graduated_years is None else graduated_years
+
+    inactive = Q(pk__in=[])
+    if inactive_days:
+        inactive = Q(is_active=False, updated_at__lt=timezone.now() - timedelta(days=inactive_days))
+    graduated = Q(pk__in=[])
+    if graduated_years:
+        graduated = Q(entry_year__lte=timezone.localdate().year - graduated_years, restored_at__isnull=True)
+
+    rows = (
+        Profile.objects.exclude(user__role='admin')
+        .filter(inactive | graduated)
+        .order_by('pk')
+        .values_list('pk', 'is_active')
+    )
+    if limit:
+        rows = rows[:limit]
+    return [(pk, 'graduated' if is_active else 'inactive') for pk, is_active in rows]
+
+
+def snapshot(profile):
+    """The profile and its related rows in Django's serialization format, plus skill names."""
+    skills = list(profile.profile_skills.select_related('skill').order_by('pk'))
+    rows = chain(
+        [profile],
+        skills,
+        SkillEndorsement.objects.filter(profile_skill__profile=profile).order_by('pk'),
+        profile.experiences.order_by('pk'),
+        profile.projects.order_by('pk'),
+        profile.portfolio_links.order_by('pk'),
+    )
+    return {
+        'objects': json.loads(serializers.serialize('json', rows)),
+        # Lets restore find the skill again if it was merged or deleted meanwhile
+        'skill_names': {str(row.skill_id): row.skill.name for row in skills},
+    }
+
+
+def archive_profile(profile_id, reason='manual'):
+    """Move one profile to the archive; returns the ArchivedProfile (None if it is gone)."""
+    with transaction.atomic():
+        profile = Profile.objects.select_for_update().select_related('user').filter(pk=profile_id).first()
+        if profile is None:
+            return None
+        archived = ArchivedProfile.objects.create(
+            profile_id=profile.pk,
+            user=profile.user,
+            name=profile.user.get_full_name(),
+            prodi=profile.prodi,
+            entry_year=profile.entry_year,
+            reason=reason,
+            data=snapshot(profile),
+        )
+        profile.delete()
+    return archived
+
+
+def archive_profiles(candidates, batch_size=ARCHIVE_BATCH_SIZE):
+    """Archive (profile_id, reason) pairs, committing every batch_size profiles; returns the count."""
+    archived = 0
+    for start in range(0, len(candidates), batch_size):
+        with transaction.atomic():
+            for profile_id, reason in candidates[start:start + batch_size]:
+                if archive_profile(profile_id, reason) is not None:
+                    archived += 1
+    return archived
+
+
+def restore_profile(archived):
+    """Put an archived profile back in the live tables; returns the Profile."""
+    from .signals import touch_profile
+    from .taxonomy import resolve_or_create_skill
+
+    data = archived.data
+    with transaction.atomic():
+        if Profile.objects.filter(user_id=archived.user_id).exists():
+            raise ArchiveError("The student already has a live profile.")
+
+        objects = list(serializers.deserialize('json', json.dumps(data['objects'])))
+        endorser_ids = {obj.object.endorser_id for obj in objects if isinstance(obj.object, SkillEndorsement)}
+        live_endorsers = set(User.objects.filter(pk__in=endorser_ids).values_list('pk', flat=True))
+        live_skills = set(Skill.objects.filter(
+            pk__in=[obj.object.skill_id for obj in objects if isinstance(obj.object, ProfileSkill)]
+        ).values_list('pk', flat=True))
+
+        restored_skills, held_skills = set(), set()
+        for obj in objects:
+            row = obj.object
+            if isinstance(row, ProfileSkill):
+                if row.skill_id not in live_skills:
+                    row.skill_id = resolve_or_create_skill(data['skill_names'][str(row.skill_id)]).pk
+                if row.skill_id in held_skills:
+                    # Two archived skills were merged into one meanwhile; keep the first
+                    continue
+                held_skills.add(row.skill_id)
+                restored_skills.add(row.pk)
+            elif isinstance(row, SkillEndorsement):
+                if row.endorser_id not in live_endorsers or row.profile_skill_id not in restored_skills:
+                    continue
+            obj.save()
+
+        archived.delete()
+        Profile.objects.filter(pk=archived.profile_id).update(restored_at=timezone.now())
+        touch_profile(profile_id=archived.profile_id)
+    return Profile.objects.select_related('user').get(pk=archived.profile_id)
+
+
+def get_or_restore_profile(user):
+    """The user's live profile, restored from the archive or created empty if there is none; for writes only."""
+    profile = Profile.objects.filter(user=user).first()
+    if profile is not None:
+        return profile
+    archived = ArchivedProfile.objects.filter(user=user).first()
+    if archived is not None:
+        return restore_profile(archived)
+    profile, _ = Profile.objects.get_or_create(user=user)
+    return profile
+
+
+def archived_storage_keys():
+    """Storage keys of the project images held in archived snapshots."""
+    for data in ArchivedProfile.objects.values_list('data', flat=True).iterator():
+        for item in data.get('objects', ()):
+            if item['model'] == 'api.project' and item['fields'].get('image'):
+                yield item['fields']['image']
+
+
+def archived_detail(archived):
+    """Readable view of an archive row for admins: the profile fields and its related rows."""
+    sections = {
+        'api.profileskill': 'skills',
+        'api.skillendorsement': 'endorsements',
+        'api.experience': 'experiences',
+        'api.project': 'projects',
+        'api.portfoliolink': 'portfolio',
+    }
+    detail = {'profile': None, **{name: [] for name in sections.values()}}
+    skill_names = archived.data.get('skill_names', {})
+    for item in archived.data['objects']:
+        row = {'id': item['pk'], **item['fields']}
+        if item['model'] == 'api.profile':
+            detail['profile'] = row
+        elif item['model'] in sections:
+            if item['model'] == 'api.profileskill':
+                row['name'] = skill_names.get(str(row['skill']), '')
+            detail[sections[item['model']]].append(row)
+    return {
+        'profile_id': archived.profile_id,
+        'user_id': archived.user_id,
+        'reason': archived.reason,
+        'archived_at': archived.archived_at,
+        **detail,
+    }
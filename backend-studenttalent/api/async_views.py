@@ -0,0 +1,250 @@
+"""
+Async views used when the app is served over ASGI (see backend/asgi.py).
+
+They cover the public profile reads, the photo upload and the live endorsement stream.
+Each request awaits the DB and storage round-trips, so one worker can hold many slow
+requests at once. Writes and other methods are delegated to the regular DRF views.
+"""
+from __future__ import annotations
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .db_router import replica_reads
+from .documents import document_rows, render_documents
+from .models import User
+from .profile_views import record_view
+from .pubsub import get_broker
+from .signals import endorsement_channel, endorsement_counts, touch_profile
+from .utils.conditional import (
+    LIST_VALIDATOR_AGGREGATES,
+    detail_validators,
+    list_validators,
+    not_modified_response,
+    set_validators,
+)
+from .utils.supabase_storage import StorageUnavailableError, SupabaseUploadError, upload_profile_photo_async
+from .views import ProfilePhotoUploadView, ProfileViewSet, public_profile_queryset, sse_event
+
+SAFE_METHODS = ("GET", "HEAD")
+
+profile_list_fallback = ProfileViewSet.as_view({"get": "list", "post": "create"})
+profile_detail_fallback = ProfileViewSet.as_view(
+    {"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"}
+)
+photo_upload_fallback = ProfilePhotoUploadView.as_view()
+
+
+class _ThrottleView:
+    """Stand-in view object so the DRF throttle classes can be reused."""
+
+    def __init__(self, scope):
+        self.throttle_scope = scope
+
+
+async def _authenticate(request):
+    def authenticate():
+        result = JWTAuthentication().authenticate(request)
+        return result[0] if result else AnonymousUser()
+
+    return await sync_to_async(authenticate)()
+
+
+def _throttled(request, scope):
+    view = _ThrottleView(scope)
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, view):
+            response = JsonResponse({"detail": "Request was throttled."}, status=429)
+            wait = throttle.wait()
+            if wait is not None:
+                response["Retry-After"] = str(max(int(wait), 1))
+            return response
+    return None
+
+
+async def _prepare(request, scope=None):
+    """Authenticate and throttle like DRF would; returns an error response or None."""
+    try:
+        request.user = await _authenticate(request)
+    except AuthenticationFailed as exc:
+        data = exc.detail if isinstance(exc.detail, dict) else {"detail": exc.detail}
+        return JsonResponse(data, status=401)
+    return await sync_to_async(_throttled)(request, scope)
+
+
+@csrf_exempt
+async def profile_list(request):
+    if request.method not in SAFE_METHODS:
+        return await sync_to_async(profile_list_fallback)(request)
+
+    error = await _prepare(request, ProfileViewSet.throttle_scope)
+    if error:
+        return error
+    with replica_reads():
+        return await _profile_list(request)
+
+
+def _filtered_profiles(request):
+    # Filters may load the skill resolver map, which is a sync DB read
+    queryset = public_profile_queryset(request.GET.get("ordering"))
+    drf_request = Request(request)
+    for backend in ProfileViewSet.filter_backends:
+        queryset = backend().filter_queryset(drf_request, queryset, ProfileViewSet)
+    return queryset
+
+
+async def _profile_list(request):
+    queryset = await sync_to_async(_filtered_profiles)(request)
+    aggregates = await queryset.order_by().aaggregate(**LIST_VALIDATOR_AGGREGATES)
+    etag, last_modified = list_validators(request, aggregates)
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    page_size = api_settings.PAGE_SIZE
+    try:
+        page_number = int(request.GET.get("page", 1))
+    except ValueError:
+        page_number = 0
+    count = aggregates["rows"]
+    last_page = max((count + page_size - 1) // page_size, 1)
+    if not 1 <= page_number <= last_page:
+        return JsonResponse({"detail": "Invalid page."}, status=404)
+
+    start = (page_number - 1) * page_size
+    rows = [row async for row in document_rows(queryset)[start:start + page_size]]
+    results = await sync_to_async(render_documents)(rows, request.user, request.build_absolute_uri)
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, "page", page_number + 1) if page_number < last_page else None
+    if page_number <= 1:
+        previous_url = None
+    elif page_number == 2:
+        previous_url = remove_query_param(url, "page")
+    else:
+        previous_url = replace_query_param(url, "page", page_number - 1)
+
+    response = JsonResponse({"count": count, "next": next_url, "previous": previous_url, "results": results})
+    return set_validators(response, etag, last_modified)
+
+
+@csrf_exempt
+async def profile_detail(request, pk):
+    if request.method not in SAFE_METHODS:
+        return await sync_to_async(profile_detail_fallback)(request, pk=pk)
+
+    error = await _prepare(request, ProfileViewSet.throttle_scope)
+    if error:
+        return error
+    with replica_reads():
+        return await _profile_detail(request, pk)
+
+
+async def _profile_detail(request, pk):
+    row = await document_rows(public_profile_queryset().order_by().filter(pk=pk)).afirst()
+    if row is None:
+        return JsonResponse({"detail": "No Profile matches the given query."}, status=404)
+    # Counted before the 304 check, so revalidations count as views too
+    await sync_to_async(record_view)(request, row.pk, row.user_id)
+    etag, last_modified = detail_validators(request, row.pk, row.content_version, row.updated_at, row.views_total)
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    documents = await sync_to_async(render_documents)([row], request.user, request.build_absolute_uri)
+    if not documents:
+        return JsonResponse({"detail": "No Profile matches the given query."}, status=404)
+    return set_validators(JsonResponse(documents[0]), etag, last_modified)
+
+
+@csrf_exempt
+async def photo_upload(request):
+    # Django only parses multipart bodies for POST; PATCH goes through DRF's parsers
+    if request.method != "POST":
+        return await sync_to_async(photo_upload_fallback)(request)
+
+    error = await _prepare(request)
+    if error:
+        return error
+    if not request.user.is_authenticated:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+    photo_file = request.FILES.get("file") or request.FILES.get("photo")
+    if not photo_file:
+        return JsonResponse(
+            {"detail": "No file provided. Attach the photo with the key 'file' or 'photo'."},
+            status=400,
+        )
+
+    try:
+        public_url = await upload_profile_photo_async(photo_file)
+    except StorageUnavailableError as exc:
+        response = JsonResponse({"detail": str(exc)}, status=503)
+        response["Retry-After"] = str(exc.retry_after)
+        return response
+    except SupabaseUploadError as exc:
+        return JsonResponse({"detail": str(exc)}, status=502)
+
+    await User.objects.filter(pk=request.user.pk).aupdate(photo_profile=public_url)
+    await sync_to_async(touch_profile)(user_id=request.user.pk)
+    return JsonResponse({"photo_profile": public_url})
+
+
+async def endorsement_stream(request, pk):
+    """
+    Server-Sent Events with live endorsement counts for the skills of one profile.
+
+    The first ``snapshot`` event carries every skill's count; after that each
+    ``endorsements`` event is ``{"id": <skill id>, "endorsements_count": n}``.
+    """
+    if request.method != "GET":
+        return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+
+    error = await _prepare(request, ProfileViewSet.throttle_scope)
+    if error:
+        return error
+    if not await public_profile_queryset().order_by().filter(pk=pk).aexists():
+        return JsonResponse({"detail": "No Profile matches the given query."}, status=404)
+
+    broker = get_broker()
+    if broker.subscriber_count() >= settings.SSE_MAX_SUBSCRIBERS:
+        response = JsonResponse({"detail": "Too many live connections, please retry shortly."}, status=503)
+        response["Retry-After"] = "5"
+        return response
+
+    response = StreamingHttpResponse(_endorsement_events(broker, pk), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def _endorsement_events(broker, profile_id):
+    # Subscribing happens on first iteration, so a response that is never streamed holds nothing
+    channel = endorsement_channel(profile_id)
+    subscription = broker.subscribe(channel)
+    try:
+        # Subscribed before the snapshot is read, so no update can fall in between
+        snapshot = [
+            {"id": skill_id, "endorsements_count": count}
+            async for skill_id, count in endorsement_counts(profile_id)
+        ]
+        yield f"retry: {settings.SSE_RETRY_MS}\n"
+        yield sse_event("snapshot", snapshot)
+        while True:
+            messages = await subscription.get(timeout=settings.SSE_HEARTBEAT_SECONDS)
+            if not messages:
+                # Keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+            for message in messages:
+                yield sse_event("endorsements", message)
+    finally:
+        broker.unsubscribe(channel, subscription)
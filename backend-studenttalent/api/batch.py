@@ -0,0 +1,114 @@
+"""
+In-process execution of /api/batch/ subrequests.
+
+Each subrequest is dispatched straight to the view its path resolves to, so the batch
+pays for middleware and JWT decoding once. The caller's user and token are handed to
+DRF views through forced authentication. Permissions, throttles and status codes are
+still applied per subrequest, and everything runs on the batch request's connection.
+"""
+from __future__ import annotations
+
+import io
+import json
+import logging
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger(__name__)
+
+# Conditional headers a subrequest may set for itself; everything else comes from the batch request
+SUBREQUEST_HEADERS = {"if-none-match": "HTTP_IF_NONE_MATCH", "if-modified-since": "HTTP_IF_MODIFIED_SINCE"}
+RETURNED_HEADERS = ("ETag", "Last-Modified", "Cache-Control", "Location", "Retry-After")
+INHERITED_META = ("REMOTE_ADDR", "SERVER_NAME", "SERVER_PORT", "SERVER_PROTOCOL", "SCRIPT_NAME")
+
+
+class SubrequestError(Exception):
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def _environ(parent, method, path, query, body, headers):
+    environ = {
+        key: value
+        for key, value in parent.META.items()
+        if key in INHERITED_META or (key.startswith("HTTP_") and key not in SUBREQUEST_HEADERS.values())
+    }
+    data = b"" if body is None else json.dumps(body).encode()
+    environ.update({
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "CONTENT_TYPE": "application/json" if data else "",
+        "CONTENT_LENGTH": str(len(data)),
+        "wsgi.input": io.BytesIO(data),
+        "wsgi.url_scheme": parent.scheme,
+        "HTTP_ACCEPT": "application/json",
+    })
+    for name, value in (headers or {}).items():
+        meta_key = SUBREQUEST_HEADERS.get(name.lower())
+        if meta_key:
+            environ[meta_key] = value
+    return environ
+
+
+def _build_subrequest(request, spec, api_prefix, batch_view):
+    url = urlsplit(spec["path"])
+    if not url.path.startswith(api_prefix):
+        raise SubrequestError(400, f"Only paths under {api_prefix} can be batched.")
+    try:
+        match = resolve(url.path)
+    except Resolver404:
+        raise SubrequestError(404, "Not found.")
+    if getattr(match.func, "view_class", None) is batch_view:
+        raise SubrequestError(400, "Batches cannot be nested.")
+
+    sub = WSGIRequest(_environ(request._request, spec["method"], url.path, url.query, spec.get("body"), spec.get("headers")))
+    sub.resolver_match = match
+    if request.user.is_authenticated:
+        # DRF views reuse the batch request's authentication instead of decoding the JWT again
+        sub._force_auth_user = request.user
+        sub._force_auth_token = request.auth
+    return sub, match
+
+
+def _payload(response):
+    result = {
+        "status": response.status_code,
+        "headers": {name: response[name] for name in RETURNED_HEADERS if response.has_header(name)},
+        "body": None,
+    }
+    if response.content:
+        content = response.content.decode(response.charset or "utf-8", errors="replace")
+        if response.get("Content-Type", "").startswith("application/json"):
+            content = json.loads(content)
+        result["body"] = content
+    return result
+
+
+def _error(status, detail):
+    return {"status": status, "headers": {}, "body": {"detail": detail}}
+
+
+def run_subrequest(request, spec, api_prefix, batch_view):
+    """Execute one subrequest and return its {status, headers, body}."""
+    try:
+        sub, match = _build_subrequest(request, spec, api_prefix, batch_view)
+    except SubrequestError as exc:
+        return _error(exc.status, exc.detail)
+
+    try:
+        view = async_to_sync(match.func) if iscoroutinefunction(match.func) else match.func
+        response = view(sub, *match.args, **match.kwargs)
+        if getattr(response, "streaming", False):
+            return _error(400, "Streaming responses cannot be batched.")
+        if hasattr(response, "render") and not response.is_rendered:
+            response.render()
+    except Exception:
+        logger.exception("Batch subrequest %s %s failed", spec["method"], spec["path"])
+        return _error(500, "Internal server error.")
+    return _payload(response)
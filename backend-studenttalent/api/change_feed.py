@@ -0,0 +1,129 @@
+"""
+Incremental profile sync feed.
+
+Consumers keep a local mirror by polling with the last cursor they saw; each page only
+contains profiles that changed since then (upserts), plus tombstones for deleted and
+deactivated profiles.
+
+The cursor is the ProfileChange id. record_profile_change() writes the row only once the
+transaction that changed the profile has committed, in a statement of its own, so ids are
+drawn in commit order whatever the length of that transaction (merge_skills, a batch of
+archive_profiles, an admin bulk action). The only id that can still commit behind a higher
+one is drawn by that single statement; CHANGE_FEED_SETTLE_SECONDS holds rows back long
+enough to cover it. A change rolled back never reaches the feed.
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Profile, ProfileChange
+
+FEED_PAGE_LIMIT = 100
+MAX_FEED_PAGE_LIMIT = 500
+
+
+def record_profile_change(profile_id, kind=None, user_id=None):
+    """Replace the profile's feed row once the current transaction commits (right away outside one)."""
+    transaction.on_commit(partial(_write_change, profile_id, kind, user_id))
+
+
+def _write_change(profile_id, kind, user_id):
+    # The new id is greater than every cursor handed out so far
+    if kind is None:
+        row = Profile.objects.filter(pk=profile_id).values('user_id', 'is_active').first()
+        if row is None:
+            return
+        kind = 'updated' if row['is_active'] else 'deactivated'
+        user_id = row['user_id']
+
+    if connection.vendor != 'postgresql':
+        # SQLite serializes writers, so the delete and insert cannot interleave with another touch
+        with transaction.atomic():
+            ProfileChange.objects.filter(profile_id=profile_id).delete()
+            ProfileChange.objects.create(profile_id=profile_id, user_id=user_id, kind=kind)
+        return
+
+    # One statement, so concurrent touches of a profile queue on its row instead of racing to
+    # insert it; EXCLUDED.id is the fresh identity value drawn for the attempted insert
+    table = connection.ops.quote_name(ProfileChange._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (profile_id, user_id, kind, changed_at) VALUES (%s, %s, %s, %s) "
+            "ON CONFLICT (profile_id) DO UPDATE SET id = EXCLUDED.id, user_id = EXCLUDED.user_id, "
+            "kind = EXCLUDED.kind, changed_at = EXCLUDED.changed_at",
+            [profile_id, user_id, kind, timezone.now()],
+        )
+
+
+def changes_page(profiles, cursor=None, since=None, limit=FEED_PAGE_LIMIT):
+    """
+    Return (changes, next_cursor, has_more) for the feed.
+
+    ``profiles`` is the queryset whose members count as visible; changed rows outside it
+    are reported as tombstones. Rows younger than CHANGE_FEED_SETTLE_SECONDS are held back
+    so a row whose insert commits just after a higher id is not skipped.
+    """
+    limit = max(1, min(limit, MAX_FEED_PAGE_LIMIT))
+    horizon = timezone.now() - timedelta(seconds=settings.CHANGE_FEED_SETTLE_SECONDS)
+    rows = ProfileChange.objects.filter(changed_at__lte=horizon).order_by('id')
+    if cursor is not None:
+        rows = rows.filter(id__gt=cursor)
+    if since is not None:
+        rows = rows.filter(changed_at__gte=since)
+    rows = list(rows[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    live_ids = [row.profile_id for row in rows if row.kind != 'deleted']
+    visible = {profile.pk: profile for profile in profiles.filter(pk__in=live_ids)} if live_ids else {}
+
+    changes = []
+    for row in rows:
+        profile = visible.get(row.profile_id)
+        kind = row.kind
+        if profile is None and kind != 'deleted':
+            kind = 'deactivated'
+        changes.append({
+            'cursor': row.id,
+            'kind': kind,
+            'profile_id': row.profile_id,
+            'user_id': row.user_id,
+            'changed_at': row.changed_at,
+            'profile': profile,
+        })
+
+    next_cursor = rows[-1].id if rows else cursor
+    return changes, next_cursor, has_more
+
+
+def feed_response_data(request, profiles, serializer_class):
+    """Parse ?cursor= / ?updated_since= / ?limit= and build the feed payload."""
+    from django.utils.dateparse import parse_datetime
+    from rest_framework import serializers
+
+    params = request.query_params
+    try:
+        cursor = int(params['cursor']) if params.get('cursor') not in (None, '') else None
+        limit = int(params.get('limit', FEED_PAGE_LIMIT))
+    except ValueError:
+        raise serializers.ValidationError({'detail': 'cursor and limit must be integers.'})
+
+    since = None
+    if params.get('updated_since'):
+        since = parse_datetime(params['updated_since'])
+        if since is None:
+            raise serializers.ValidationError({'updated_since': 'Use an ISO 8601 timestamp.'})
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+
+    changes, next_cursor, has_more = changes_page(profiles, cursor=cursor, since=since, limit=limit)
+    context = {'request': request}
+    for change in changes:
+        profile = change['profile']
+        change['profile'] = serializer_class(profile, context=context).data if profile is not None else None
+    return {'results': changes, 'next_cursor': next_cursor, 'has_more': has_more}
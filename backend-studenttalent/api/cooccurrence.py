@@ -0,0 +1,172 @@
+"""
+Skill co-occurrence counts backing /api/skills/<id>/related/.
+
+SkillCooccurrence holds, for every ordered pair of skills, how many profiles have both;
+the diagonal row (related == skill) is how many profiles have the skill. Storing both
+directions makes one skill's partners a single index range on (skill, -profiles).
+
+api/signals.py keeps the counts current as ProfileSkill rows come and go. A change is a
+set update, skills x profile skills, in one or two UPDATE statements however many skills
+the profile has. Bulk inserts, which send no signals, call record_bulk_added(), and
+merge_skills() recomputes the target with refresh_skill(). rebuild_cooccurrence()
+recomputes the whole table with one self-join.
+
+related_skills() scores the most frequent partners of a skill with lift (how much more
+often two skills appear together than they would by chance) and PMI (log2 of the lift),
+and ranks them by confidence x PMI so a rare skill that happens to coincide twice does
+not outrank a common, strongly associated one.
+"""
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import ProfileSkill, SkillCooccurrence
+
+RELATED_LIMIT = 5
+MAX_RELATED_LIMIT = 20
+# Partners scored per request, taken by how many profiles share them
+RELATED_CANDIDATES = 50
+RELATED_MIN_PROFILES = 2
+POPULATION_CACHE_KEY = "skill-cooccurrence:profiles"
+POPULATION_TTL = 600
+
+
+def _profile_skill_ids(profile_id):
+    return set(ProfileSkill.objects.filter(profile_id=profile_id).values_list("skill_id", flat=True))
+
+
+def _add(skill_ids, related_ids, amount):
+    """Add ``amount`` to every (skill, related) pair of the two sets."""
+    if not skill_ids or not related_ids:
+        return
+    if amount > 0:
+        SkillCooccurrence.objects.bulk_create(
+            [SkillCooccurrence(skill_id=skill_id, related_id=related_id) for skill_id in skill_ids for related_id in related_ids],
+            ignore_conflicts=True,
+        )
+    # Decrements never insert: a missing row belongs to a skill that is being deleted
+    SkillCooccurrence.objects.filter(skill_id__in=skill_ids, related_id__in=related_ids).update(
+        profiles=F("profiles") + amount
+    )
+
+
+def record_added(profile_id, skill_ids):
+    """Count skills just saved on a profile: their pairs with each other and with its other skills."""
+    added = set(skill_ids)
+    current = _profile_skill_ids(profile_id) | added
+    _add(added, current, 1)
+    _add(current - added, added, 1)
+
+
+def record_bulk_added(profile_skills):
+    """record_added() for ProfileSkill rows inserted with bulk_create, which sends no signals."""
+    by_profile = defaultdict(set)
+    for profile_skill in profile_skills:
+        by_profile[profile_skill.profile_id].add(profile_skill.skill_id)
+    for profile_id, skill_ids in by_profile.items():
+        record_added(profile_id, skill_ids)
+
+
+# Rows deleted together (a queryset or a cascade) each send pre_delete before any is
+# deleted and post_delete after all are. So pre_delete takes away the row's own direction
+# against every skill the profile had, itself and the other doomed rows included, and
+# post_delete takes away the reverse direction from the skills the profile kept.
+
+def record_removing(profile_id, skill_id):
+    """pre_delete half of removing a skill from a profile."""
+    _add({skill_id}, _profile_skill_ids(profile_id), -1)
+
+
+def record_removed(profile_id, skill_id):
+    """post_delete half of removing a skill from a profile."""
+    _add(_profile_skill_ids(profile_id) - {skill_id}, {skill_id}, -1)
+
+
+def _pair_counts(queryset):
+    # Self-join through the profile: one row per (skill, partner) with the profiles having both
+    return (
+        queryset.values("skill_id", related_skill=F("profile__profile_skills__skill_id"))
+        .annotate(profiles=Count("pk"))
+        .order_by()
+    )
+
+
+def refresh_skill(skill_id):
+    """Recompute every pair of one skill from ProfileSkill, both directions."""
+    rows = []
+    for row in _pair_counts(ProfileSkill.objects.filter(skill_id=skill_id)).iterator():
+        rows.append(SkillCooccurrence(skill_id=skill_id, related_id=row["related_skill"], profiles=row["profiles"]))
+        if row["related_skill"] != skill_id:
+            rows.append(SkillCooccurrence(skill_id=row["related_skill"], related_id=skill_id, profiles=row["profiles"]))
+    with transaction.atomic():
+        SkillCooccurrence.objects.filter(Q(skill_id=skill_id) | Q(related_id=skill_id)).delete()
+        SkillCooccurrence.objects.bulk_create(rows, batch_size=1000)
+
+
+def rebuild_cooccurrence():
+    """Recompute the whole table from ProfileSkill; returns the number of rows written."""
+    rows = [
+        SkillCooccurrence(skill_id=row["skill_id"], related_id=row["related_skill"], profiles=row["profiles"])
+        for row in _pair_counts(ProfileSkill.objects.all()).iterator()
+    ]
+    with transaction.atomic():
+        SkillCooccurrence.objects.all().delete()
+        SkillCooccurrence.objects.bulk_create(rows, batch_size=1000)
+    cache.delete(POPULATION_CACHE_KEY)
+    return len(rows)
+
+
+def _population():
+    # Profiles with at least one skill; lift barely moves while it is a few minutes old
+    return cache.get_or_set(
+        POPULATION_CACHE_KEY,
+        lambda: ProfileSkill.objects.values("profile_id").distinct().count(),
+        POPULATION_TTL,
+    )
+
+
+def related_skills(skill_id, limit=RELATED_LIMIT):
+    """Skills most associated with this one, best first; a fixed number of indexed reads."""
+    limit = max(1, min(limit, MAX_RELATED_LIMIT))
+    pairs = SkillCooccurrence.objects.filter(skill_id=skill_id)
+    own = pairs.filter(related_id=skill_id).values_list("profiles", flat=True).first()
+    if not own or own <= 0:
+        return []
+    candidates = list(
+        pairs.exclude(related_id=skill_id)
+        .filter(profiles__gte=RELATED_MIN_PROFILES)
+        .order_by("-profiles")
+        .values_list("related_id", "related__name", "profiles")[:RELATED_CANDIDATES]
+    )
+    totals = dict(
+        SkillCooccurrence.objects.filter(skill_id__in=[related_id for related_id, _, _ in candidates], related_id=F("skill_id"))
+        .values_list("skill_id", "profiles")
+    )
+    population = max(_population(), own)
+
+    scored = []
+    for related_id, name, together in candidates:
+        theirs = totals.get(related_id)
+        if not theirs or theirs <= 0:
+            continue
+        lift = together * population / (own * theirs)
+        if lift <= 1:
+            # Held together no more often than by chance
+            continue
+        confidence = together / own
+        pmi = math.log2(lift)
+        scored.append((-confidence * pmi, -together, related_id, {
+            "id": related_id,
+            "name": name,
+            "profiles": together,
+            "confidence": round(confidence, 3),
+            "lift": round(lift, 3),
+            "pmi": round(pmi, 3),
+        }))
+    scored.sort(key=lambda item: item[:3])
+    return [result for *_, result in scored[:limit]]
@@ -0,0 +1,100 @@
+"""
+Read-replica routing.
+
+Reads are only sent to a replica inside replica_reads() (entered by the public list
+views for safe methods). Even then the primary is used when the client wrote recently
+(ReplicaPinningMiddleware), inside a transaction, or when every replica lags more
+than DATABASE_REPLICA_MAX_LAG seconds.
+"""
+from __future__ import annotations
+
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+_pinned_to_primary = contextvars.ContextVar("pinned_to_primary", default=False)
+
+LAG_CHECK_INTERVAL = 5.0
+POSTGRES_LAG_SQL = """
+    SELECT COALESCE(
+        CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+             ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END, 0)
+"""
+
+_lag_cache: dict[str, tuple[float, float]] = {}
+_lag_lock = threading.Lock()
+
+
+@contextmanager
+def replica_reads():
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def pinned_to_primary(pinned=True):
+    token = _pinned_to_primary.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+def replica_lag(alias):
+    """Replication lag of a replica in seconds (cached briefly); inf when it cannot be checked."""
+    now = time.monotonic()
+    with _lag_lock:
+        cached = _lag_cache.get(alias)
+        if cached and now - cached[0] < LAG_CHECK_INTERVAL:
+            return cached[1]
+
+    connection = connections[alias]
+    try:
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(POSTGRES_LAG_SQL)
+                lag = float(cursor.fetchone()[0])
+        else:
+            lag = 0.0
+    except Exception:
+        lag = float("inf")
+
+    with _lag_lock:
+        _lag_cache[alias] = (now, lag)
+    return lag
+
+
+def healthy_replicas():
+    max_lag = settings.DATABASE_REPLICA_MAX_LAG
+    return [alias for alias in settings.DATABASE_REPLICAS if replica_lag(alias) <= max_lag]
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or _pinned_to_primary.get():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        replicas = healthy_replicas()
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Allowed everywhere so local replica databases can be set up with migrate --database
+        return True
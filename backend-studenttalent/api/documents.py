@@ -0,0 +1,121 @@
+"""
+Materialized profile documents.
+
+ProfileDocument holds each profile's public ProfileSerializer output, so the list and
+detail endpoints read one row per profile (joined on the profile's primary key) instead
+of rebuilding the payload from six tables.
+
+touch_profile() runs for every change that shows up in the payload; it schedules a rebuild
+for when the transaction commits. A document whose version differs from the profile's
+content_version is stale: readers rebuild it on the spot, which also covers profiles that
+have no document yet and rebuilds lost to a crash. rebuild_profile_documents refills the
+whole table. With PROFILE_JSON_ENGINE=postgres the payloads are built in SQL (see
+api/json_engine.py).
+
+Viewer-specific fields (endorsed_by_me, absolute media URLs) are stored in their anonymous
+form and merged in per request by personalize(). The view count is not part of the content:
+it is read from the profile row with the document and replaces the stored one.
+"""
+from __future__ import annotations
+
+import json
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+
+from .json_engine import PAYLOAD_COLUMN, engine_enabled, with_payload
+from .models import Profile, ProfileDocument, SkillEndorsement
+
+REBUILD_BATCH_SIZE = 200
+# Row shape read by render_documents(); the first three are the detail validators
+DOCUMENT_COLUMNS = ('pk', 'content_version', 'updated_at', 'document__version', 'document__data', 'user_id', 'views_total')
+
+
+def document_rows(queryset):
+    """The queryset as named DOCUMENT_COLUMNS rows: one indexed join per profile, no related tables."""
+    return queryset.prefetch_related(None).values_list(*DOCUMENT_COLUMNS, named=True)
+
+
+def rebuild_documents(profile_ids):
+    """Serialize and store the documents of these profiles; returns {profile_id: data}."""
+    from .serializers import ProfileSerializer
+    from .views import PROFILE_PREFETCH
+
+    profiles = Profile.objects.filter(pk__in=profile_ids)
+    if engine_enabled(profiles.db):
+        # The payload is assembled by PostgreSQL in the statement that reads the version
+        rows = with_payload(profiles).values_list('pk', 'content_version', PAYLOAD_COLUMN)
+        documents = [
+            ProfileDocument(profile_id=pk, version=version, data=json.loads(payload))
+            for pk, version, payload in rows
+        ]
+    else:
+        profiles = profiles.select_related('user').prefetch_related(*PROFILE_PREFETCH)
+        documents = [
+            ProfileDocument(profile_id=profile.pk, version=profile.content_version, data=ProfileSerializer(profile).data)
+            for profile in profiles
+        ]
+    # A slower concurrent rebuild may store an older version; readers see the mismatch and rebuild
+    ProfileDocument.objects.bulk_create(
+        documents,
+        batch_size=REBUILD_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['profile'],
+        update_fields=['version', 'data', 'built_at'],
+    )
+    return {document.profile_id: document.data for document in documents}
+
+
+def stale_profile_ids(queryset=None):
+    """Ids of profiles whose document is missing or older than the profile."""
+    queryset = Profile.objects.all() if queryset is None else queryset
+    return queryset.exclude(document__version=F('content_version')).values_list('pk', flat=True)
+
+
+def _rebuild_if_stale(profile_id):
+    if stale_profile_ids(Profile.objects.filter(pk=profile_id)).exists():
+        rebuild_documents([profile_id])
+
+
+def schedule_rebuild(profile_id):
+    """Rebuild the profile's document once the current transaction commits."""
+    # Several touches in one transaction queue several callbacks; all but the first find it fresh
+    transaction.on_commit(partial(_rebuild_if_stale, profile_id), robust=True)
+
+
+def personalize(documents, user=None, build_absolute_uri=None):
+    """Merge the viewer-specific fields into stored documents (in place); returns them."""
+    endorsed = set()
+    if user is not None and user.is_authenticated and documents:
+        endorsed = set(
+            SkillEndorsement.objects.filter(
+                endorser_id=user.pk,
+                profile_skill__profile_id__in=[document['id'] for document in documents],
+            ).values_list('profile_skill__profile_id', 'profile_skill__skill_id')
+        )
+    for document in documents:
+        for skill in document['skills']:
+            skill['endorsed_by_me'] = (document['id'], skill['id']) in endorsed
+        if build_absolute_uri is not None:
+            # DRF renders local media URLs absolute when it has a request; documents are built without one
+            for project in document['projects']:
+                if project['image'] and project['image'].startswith('/'):
+                    project['image'] = build_absolute_uri(project['image'])
+    return documents
+
+
+def render_documents(rows, user=None, build_absolute_uri=None):
+    """Payloads for DOCUMENT_COLUMNS rows in order, rebuilding the stale ones first."""
+    stale = {row.pk for row in rows if row.document__version != row.content_version}
+    rebuilt = rebuild_documents(stale) if stale else {}
+    documents = []
+    for row in rows:
+        data = row.document__data
+        if row.pk in stale:
+            # Missing if the profile was deleted since the rows were read
+            data = rebuilt.get(row.pk)
+        if data is not None:
+            data['views'] = row.views_total
+            documents.append(data)
+    return personalize(documents, user, build_absolute_uri)
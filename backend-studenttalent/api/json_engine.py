@@ -0,0 +1,131 @@
+"""
+Postgres-native assembly of ProfileSerializer payloads.
+
+With PROFILE_JSON_ENGINE=postgres the database builds each profile's payload in the same
+statement that selects it: json_build_object for the profile and user fields, and one
+json_agg subquery each for skills (with endorsement counts), experiences, projects and
+portfolio links. Nothing is reassembled in Python; the JSON text goes straight into the
+response or the stored document.
+
+Used by rebuild_documents() (and therefore every ProfileViewSet read) and by
+AdminStudentsView, which streams the rows out of a server-side cursor. On other databases,
+or with PROFILE_JSON_ENGINE=python, the ProfileSerializer path is used instead.
+api.tests.test_json_engine checks that the two outputs match; benchmark_json_engine times them.
+
+The payload is the anonymous form ProfileSerializer renders without a request:
+endorsed_by_me is false and project images are storage URLs (storage.url('') + name).
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import TextField
+from django.db.models.expressions import RawSQL
+from django.http import StreamingHttpResponse
+
+from .models import Experience, PortfolioLink, Profile, ProfileSkill, Project, Skill, SkillEndorsement, User
+
+PAYLOAD_COLUMN = "payload_json"
+STREAM_CHUNK_SIZE = 200
+# str.strip() whitespace that PostgreSQL's btrim() needs spelled out (User.get_full_name)
+NAME_WHITESPACE = "E' \\t\\n\\r\\f\\x0b'"
+
+
+def engine_enabled(using) -> bool:
+    """Whether payloads for this database alias are built in SQL."""
+    return settings.PROFILE_JSON_ENGINE == "postgres" and connections[using].vendor == "postgresql"
+
+
+def _table(model):
+    return f'"{model._meta.db_table}"'
+
+
+def payload_sql() -> str:
+    """Scalar subquery with the ProfileSerializer JSON (as text) of the outer profile row."""
+    profile = _table(Profile)
+    return f"""(
+        SELECT json_build_object(
+            'id', {profile}."id",
+            'user_id', u."id",
+            'name', btrim(u."first_name" || ' ' || u."last_name", {NAME_WHITESPACE}),
+            'email', u."email",
+            'role', u."role",
+            'major', {profile}."prodi",
+            'year', {profile}."entry_year",
+            'bio', {profile}."about",
+            'avatar', u."photo_profile",
+            'photo_profile', u."photo_profile",
+            'is_active', {profile}."is_active",
+            'linkedin', {profile}."linkedin",
+            'github', {profile}."github",
+            'website', {profile}."website",
+            'skills', COALESCE((
+                SELECT json_agg(json_build_object(
+                    'id', s."id",
+                    'name', s."name",
+                    'level', ps."level",
+                    'endorsements_count', (
+                        SELECT count(*) FROM {_table(SkillEndorsement)} e WHERE e."profile_skill_id" = ps."id"
+                    ),
+                    'endorsed_by_me', false
+                ) ORDER BY ps."id")
+                FROM {_table(ProfileSkill)} ps JOIN {_table(Skill)} s ON s."id" = ps."skill_id"
+                WHERE ps."profile_id" = {profile}."id"
+            ), '[]'::json),
+            'experiences', COALESCE((
+                SELECT json_agg(json_build_object(
+                    'id', x."id",
+                    'title', x."title",
+                    'company', x."company",
+                    'startDate', to_char(x."start_date", 'YYYY-MM'),
+                    'endDate', to_char(x."end_date", 'YYYY-MM'),
+                    'current', x."is_current",
+                    'description', x."description"
+                ) ORDER BY x."id")
+                FROM {_table(Experience)} x WHERE x."profile_id" = {profile}."id"
+            ), '[]'::json),
+            'projects', COALESCE((
+                SELECT json_agg(json_build_object(
+                    'id', pr."id",
+                    'title', pr."title",
+                    'image', CASE WHEN pr."image" IS NULL OR pr."image" = '' THEN NULL ELSE %s || pr."image" END,
+                    'link', pr."link",
+                    'description', pr."description"
+                ) ORDER BY pr."id")
+                FROM {_table(Project)} pr WHERE pr."profile_id" = {profile}."id"
+            ), '[]'::json),
+            'portfolio', COALESCE((
+                SELECT json_agg(l."url" ORDER BY l."id")
+                FROM {_table(PortfolioLink)} l WHERE l."profile_id" = {profile}."id"
+            ), '[]'::json),
+            'views', {profile}."views_total"
+        )::text
+        FROM {_table(User)} u WHERE u."id" = {profile}."user_id"
+    )"""
+
+
+def with_payload(queryset):
+    """The profile queryset with a PAYLOAD_COLUMN text column; filters, ordering and slicing still apply."""
+    image_prefix = Project._meta.get_field("image").storage.url("")
+    return queryset.prefetch_related(None).annotate(
+        **{PAYLOAD_COLUMN: RawSQL(payload_sql(), [image_prefix], output_field=TextField())}
+    )
+
+
+def _json_array(texts):
+    yield "["
+    chunk = []
+    for index, text in enumerate(texts):
+        chunk.append(text if index == 0 else f",{text}")
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk = []
+    yield "".join(chunk) + "]"
+
+
+def stream_payloads(queryset):
+    """JSON array response of the queryset's payloads, read through a server-side cursor as it is sent."""
+    # Bound now: the body is produced after the view (and any replica_reads() scope) has returned
+    queryset = with_payload(queryset.using(queryset.db))
+    texts = queryset.values_list(PAYLOAD_COLUMN, flat=True).iterator(chunk_size=STREAM_CHUNK_SIZE)
+    return StreamingHttpResponse(_json_array(texts), content_type="application/json")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.taxonomy import add_alias, resolve_skill
+
+
+class Command(BaseCommand):
+    help = "Map another spelling (e.g. JS) to a canonical skill so writes, search and filters resolve it."
+
+    def add_arguments(self, parser):
+        parser.add_argument("skill", help="Canonical skill name (or an existing alias of it).")
+        parser.add_argument("aliases", nargs="+", help="Spellings to map to the skill.")
+
+    def handle(self, *args, **options):
+        skill = resolve_skill(options["skill"])
+        if skill is None:
+            raise CommandError(f"Unknown skill: {options['skill']}")
+        for alias in options["aliases"]:
+            try:
+                add_alias(alias, skill)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(f'"{alias}" -> "{skill.name}"')
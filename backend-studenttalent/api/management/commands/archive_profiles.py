@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from api.archive import ARCHIVE_BATCH_SIZE, archive_candidates, archive_profiles
+
+
+class Command(BaseCommand):
+    help = (
+        "Move deactivated and long-graduated student profiles, with their skills, endorsements, experiences, "
+        "projects and links, out of the live tables into the archive. Criteria default to "
+        "ARCHIVE_INACTIVE_AFTER_DAYS / ARCHIVE_GRADUATED_AFTER_YEARS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--inactive-days", type=int, help="Archive profiles deactivated and untouched for this many days (0 disables).")
+        parser.add_argument("--graduated-years", type=int, help="Archive profiles whose entry year is this many years back (0 disables).")
+        parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="Profiles per transaction.")
+        parser.add_argument("--limit", type=int, help="Archive at most this many profiles.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the profiles that would be archived.")
+
+    def handle(self, *args, **options):
+        candidates = archive_candidates(options["inactive_days"], options["graduated_years"], options["limit"])
+        if options["dry_run"]:
+            inactive = sum(1 for _, reason in candidates if reason == "inactive")
+            self.stdout.write(f"{len(candidates)} profiles would be archived ({inactive} inactive, {len(candidates) - inactive} graduated).")
+            return
+        count = archive_profiles(candidates, batch_size=max(options["batch_size"], 1))
+        self.stdout.write(self.style.SUCCESS(f"Archived {count} profiles."))
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from api.json_engine import PAYLOAD_COLUMN, with_payload
+from api.models import Profile
+from api.serializers import ProfileSerializer
+from api.tests.scale import seed_scale_data
+from api.views import PROFILE_PREFETCH
+
+
+def _python_payloads(queryset):
+    profiles = queryset.select_related("user").prefetch_related(*PROFILE_PREFETCH)
+    return JSONRenderer().render(ProfileSerializer(profiles, many=True).data)
+
+
+def _sql_payloads(queryset):
+    texts = with_payload(queryset).values_list(PAYLOAD_COLUMN, flat=True)
+    return f"[{','.join(texts)}]".encode()
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the PostgreSQL payload engine (PROFILE_JSON_ENGINE=postgres) against ProfileSerializer "
+        "for a page and for the whole admin list. Runs inside a transaction that is rolled back; "
+        "--scale seeds that many synthetic profiles first. Parity is checked by api.tests.test_json_engine."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=int, default=0, help="Synthetic profiles to create before timing.")
+        parser.add_argument("--page-size", type=int, default=20, help="Profiles in the page benchmark.")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per engine and case.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("The SQL payload engine needs PostgreSQL; other databases always use ProfileSerializer.")
+
+        with transaction.atomic():
+            if options["scale"]:
+                seed_scale_data(options["scale"])
+            profiles = Profile.objects.exclude(user__role="admin").order_by("pk")
+            cases = [
+                (f"page of {options['page_size']}", profiles[:options["page_size"]]),
+                (f"all {profiles.count()} students", profiles),
+            ]
+            self.stdout.write(f"{'case':<22}{'engine':<8}{'queries':>8}{'median ms':>11}{'bytes':>11}")
+            for name, queryset in cases:
+                for engine, render in (("python", _python_payloads), ("sql", _sql_payloads)):
+                    queries, median, size = self._time(render, queryset, options["repeat"])
+                    self.stdout.write(f"{name:<22}{engine:<8}{queries:>8}{median:>11.1f}{size:>11}")
+            transaction.set_rollback(True)
+
+    def _time(self, render, queryset, repeat):
+        with CaptureQueriesContext(connection) as queries:
+            size = len(render(queryset))
+        durations = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            render(queryset)
+            durations.append((time.perf_counter() - started) * 1000)
+        return len(queries), statistics.median(durations), size
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.models import Profile, User
+
+BENCH_EMAIL = "bench-serving@bench.invalid"
+# Smallest valid PNG, enough for the upload path
+PNG_BYTES = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c63000100000500010d0a2db40000000049454e44ae426082"
+)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _stub_storage(latency):
+    """Local stand-in for Supabase Storage that answers uploads after a fixed delay."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            time.sleep(latency)
+            body = b'{"Key": "bench"}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", _free_port()), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare sync WSGI (gunicorn) and ASGI (uvicorn) throughput at a fixed worker count "
+        "under a mixed profile-read / photo-upload load. Uploads go to a local storage stub "
+        "with configurable latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--concurrency", type=int, default=32, help="Concurrent client connections.")
+        parser.add_argument("--duration", type=float, default=15.0, help="Seconds of load per mode.")
+        parser.add_argument("--upload-every", type=int, default=5, help="Every Nth request is an upload.")
+        parser.add_argument("--storage-latency", type=float, default=0.3, help="Seconds the storage stub waits.")
+        parser.add_argument("--modes", default="wsgi,asgi", help="Comma separated subset of wsgi,asgi.")
+
+    def handle(self, *args, **options):
+        try:
+            import httpx  # noqa: F401
+        except ImportError as exc:
+            raise CommandError("httpx is required for the benchmark client.") from exc
+
+        token = self._bench_token()
+        storage = _stub_storage(options["storage_latency"])
+        storage_url = f"http://127.0.0.1:{storage.server_address[1]}"
+        profile_ids = list(Profile.objects.filter(is_active=True).values_list("pk", flat=True)[:50])
+        if not profile_ids:
+            raise CommandError("No active profiles to read; seed some data first.")
+
+        rows = []
+        try:
+            for mode in [m.strip() for m in options["modes"].split(",") if m.strip()]:
+                port = _free_port()
+                server = self._start_server(mode, port, options["workers"], storage_url)
+                try:
+                    base_url = f"http://127.0.0.1:{port}/api"
+                    self._wait_ready(base_url, server)
+                    rows.append((mode, asyncio.run(self._load(base_url, token, profile_ids, options))))
+                finally:
+                    server.terminate()
+                    server.wait(timeout=10)
+        finally:
+            storage.shutdown()
+
+        self.stdout.write(f"{'mode':<6}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+        for mode, result in rows:
+            self.stdout.write(
+                f"{mode:<6}{result['requests']:>10}{result['rps']:>10.1f}"
+                f"{result['p50']:>10.1f}{result['p95']:>10.1f}{result['errors']:>8}"
+            )
+
+    def _bench_token(self):
+        user = User.objects.filter(email=BENCH_EMAIL).first()
+        if user is None:
+            user = User.objects.create_user(email=BENCH_EMAIL, password=None)
+        Profile.objects.get_or_create(user=user)
+        return str(RefreshToken.for_user(user).access_token)
+
+    def _start_server(self, mode, port, workers, storage_url):
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "backend.settings"),
+            "SUPABASE_URL": storage_url,
+            "SUPABASE_SERVICE_ROLE_KEY": "bench",
+            "RATE_LIMIT_ENABLED": "false",
+            "ASYNC_READ_VIEWS": "true" if mode == "asgi" else "false",
+        }
+        if mode == "wsgi":
+            cmd = [sys.executable, "-m", "gunicorn", "backend.wsgi:application",
+                   "--workers", str(workers), "--bind", f"127.0.0.1:{port}", "--log-level", "warning"]
+        elif mode == "asgi":
+            cmd = [sys.executable, "-m", "uvicorn", "backend.asgi:application",
+                   "--workers", str(workers), "--port", str(port), "--log-level", "warning"]
+        else:
+            raise CommandError(f"Unknown mode: {mode}")
+        return subprocess.Popen(cmd, cwd=settings.BASE_DIR, env=env)
+
+    def _wait_ready(self, base_url, server, timeout=30):
+        import httpx
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError("Server exited during startup.")
+            try:
+                if httpx.get(f"{base_url}/profiles/", timeout=2).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        raise CommandError("Server did not become ready in time.")
+
+    async def _load(self, base_url, token, profile_ids, options):
+        import httpx
+
+        latencies, errors = [], 0
+        deadline = time.monotonic() + options["duration"]
+        counter = iter(range(sys.maxsize))
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def client_loop(client):
+            nonlocal errors
+            while time.monotonic() < deadline:
+                n = next(counter)
+                started = time.perf_counter()
+                try:
+                    if n % options["upload_every"] == 0:
+                        response = await client.post(
+                            f"{base_url}/users/me/photo/",
+                            headers=headers,
+                            files={"file": ("bench.png", PNG_BYTES, "image/png")},
+                        )
+                    else:
+                        response = await client.get(f"{base_url}/profiles/{profile_ids[n % len(profile_ids)]}/")
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        limits = httpx.Limits(max_connections=options["concurrency"])
+        async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+            started = time.monotonic()
+            await asyncio.gather(*(client_loop(client) for _ in range(options["concurrency"])))
+            elapsed = time.monotonic() - started
+
+        latencies.sort()
+        return {
+            "requests": len(latencies),
+            "rps": len(latencies) / elapsed,
+            "p50": statistics.median(latencies) if latencies else 0.0,
+            "p95": latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+            "errors": errors,
+        }
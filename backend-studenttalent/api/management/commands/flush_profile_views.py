@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from api.models import Profile, ProfileViewDaily
+from api.profile_views import CacheBuffer, flush_views, get_buffer
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the profile views buffered in the shared cache (PROFILE_VIEW_BUFFER=CacheBuffer) to the "
+        "daily table and profile totals. Run it from cron when PROFILE_VIEW_FLUSH_SECONDS is 0. "
+        "--recount-totals recomputes every Profile.views_total from the daily rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recount-totals", action="store_true", help="Recompute the totals from ProfileViewDaily.")
+
+    def handle(self, *args, **options):
+        if not isinstance(get_buffer(), CacheBuffer):
+            self.stdout.write(self.style.WARNING(
+                f"PROFILE_VIEW_BUFFER is {settings.PROFILE_VIEW_BUFFER}: views are buffered inside each "
+                "server process and flushed by it, so there is nothing to flush from here."
+            ))
+        else:
+            written = flush_views()
+            self.stdout.write(self.style.SUCCESS(f"Flushed {written} views."))
+
+        if options["recount_totals"]:
+            daily_sum = (
+                ProfileViewDaily.objects.filter(profile=OuterRef("pk"))
+                .values("profile")
+                .annotate(total=Sum("views"))
+                .values("total")
+            )
+            updated = Profile.objects.update(views_total=Coalesce(Subquery(daily_sum), Value(0)))
+            self.stdout.write(self.style.SUCCESS(f"Recounted the view totals of {updated} profiles."))
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from api.archive import archived_storage_keys
+from api.models import Project, User
+from api.utils.supabase_storage import (
+    PHOTO_PREFIX,
+    SupabaseStorageError,
+    delete_objects,
+    list_objects,
+    storage_key_from_url,
+)
+
+
+def referenced_keys():
+    """Object keys still used by a profile photo or a project image, archived projects included."""
+    keys = set()
+    for url in User.objects.exclude(photo_profile__isnull=True).exclude(photo_profile="").values_list("photo_profile", flat=True).iterator():
+        key = storage_key_from_url(url)
+        if key:
+            keys.add(key)
+    keys.update(Project.objects.exclude(image="").exclude(image__isnull=True).values_list("image", flat=True).iterator())
+    # Restoring an archived profile brings its projects back with the same image keys
+    keys.update(archived_storage_keys())
+    return keys
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete storage objects in the profile bucket that no User.photo_profile or Project.image, "
+        "live or archived, references any more. Objects written in the last --min-age-hours are kept so uploads whose "
+        "database write is still in flight are not collected."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prefix",
+            action="append",
+            dest="prefixes",
+            help=f"Folder to scan; repeatable (default: {PHOTO_PREFIX} and projects/).",
+        )
+        parser.add_argument("--min-age-hours", type=float, default=24.0)
+        parser.add_argument("--batch-size", type=int, default=100, help="Objects deleted per storage request.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted.")
+
+    def handle(self, *args, **options):
+        prefixes = options["prefixes"] or [PHOTO_PREFIX, "projects/"]
+        cutoff = timezone.now() - timedelta(hours=options["min_age_hours"])
+        batch_size = max(options["batch_size"], 1)
+
+        # Read references before listing: anything uploaded (or re-uploaded) since is younger than the cutoff
+        referenced = referenced_keys()
+        scanned = deleted = 0
+        orphans = []
+        try:
+            # List everything first: deleting while paging by offset would skip objects
+            for prefix in prefixes:
+                for key, updated_at in list_objects(prefix):
+                    scanned += 1
+                    updated = parse_datetime(updated_at) if updated_at else None
+                    if key not in referenced and updated is not None and updated <= cutoff:
+                        orphans.append(key)
+
+            if options["dry_run"]:
+                for key in orphans:
+                    self.stdout.write(f"would delete {key}")
+            else:
+                for start in range(0, len(orphans), batch_size):
+                    batch = orphans[start:start + batch_size]
+                    delete_objects(batch)
+                    deleted += len(batch)
+        except SupabaseStorageError as exc:
+            raise CommandError(f"{exc} ({deleted} objects deleted before the failure)") from exc
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {scanned} objects, {len(referenced)} referenced, {len(orphans)} unreferenced, {deleted} deleted."
+        ))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Skill
+from api.taxonomy import duplicate_groups, merge_skills, resolve_skill
+
+
+class Command(BaseCommand):
+    help = (
+        "Merge duplicate skills into a canonical one: profile skills and endorsements are re-pointed in bulk "
+        "and the merged names become aliases. Give TARGET and SOURCE skills (names, aliases or ids), "
+        "or --auto to merge every group of skills whose names differ only in case, spacing or punctuation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("skills", nargs="*", help="TARGET SOURCE [SOURCE ...]")
+        parser.add_argument("--auto", action="store_true", help="Merge spelling variants into their most used skill.")
+        parser.add_argument("--dry-run", action="store_true", help="Only print what would be merged.")
+
+    def _skill(self, value):
+        skill = Skill.objects.filter(pk=int(value)).first() if value.isdigit() else resolve_skill(value)
+        if skill is None:
+            raise CommandError(f"Unknown skill: {value}")
+        return skill
+
+    def handle(self, *args, **options):
+        if options["auto"]:
+            groups = duplicate_groups()
+        elif len(options["skills"]) >= 2:
+            target, *sources = [self._skill(value) for value in options["skills"]]
+            groups = [[target, *sources]]
+        else:
+            raise CommandError("Give a target and at least one source skill, or use --auto.")
+
+        for target, *sources in groups:
+            names = ", ".join(f'"{skill.name}" ({skill.pk})' for skill in sources)
+            if options["dry_run"]:
+                self.stdout.write(f'Would merge {names} into "{target.name}" ({target.pk})')
+                continue
+            affected = merge_skills(target, sources)
+            self.stdout.write(f'Merged {names} into "{target.name}" ({target.pk}); {len(affected)} profiles updated')
+        if not groups:
+            self.stdout.write("No duplicate skills found.")
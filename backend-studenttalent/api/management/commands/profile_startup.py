@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter (with -X importtime) and prints its phase timings as JSON
+CHILD_SCRIPT = r"""
+import json, sys, time
+start = time.perf_counter()
+marks = {}
+apps = {}
+
+from django.apps.config import AppConfig
+
+_create = AppConfig.create.__func__
+
+
+def _timed(label, phase, method):
+    def wrapper(*args, **kwargs):
+        began = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            apps.setdefault(label, {})[phase] = (time.perf_counter() - began) * 1000
+    return wrapper
+
+
+def create(cls, entry):
+    config = _create(cls, entry)
+    config.import_models = _timed(config.label, "models", config.import_models)
+    config.ready = _timed(config.label, "ready", config.ready)
+    return config
+
+
+AppConfig.create = classmethod(create)
+
+
+def mark(name):
+    marks[name] = (time.perf_counter() - start) * 1000
+
+
+from django.conf import settings
+settings.INSTALLED_APPS
+mark("settings")
+
+import django
+django.setup(set_prefix=False)
+mark("setup")
+
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+mark("handler")
+
+from wsgiref.util import setup_testing_defaults
+host = next((h for h in settings.ALLOWED_HOSTS if h != "*" and not h.startswith(".")), "localhost")
+environ = {"PATH_INFO": sys.argv[1], "HTTP_HOST": host}
+setup_testing_defaults(environ)
+statuses = []
+b"".join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+mark("first_response")
+
+print(json.dumps({"marks": marks, "apps": apps, "status": statuses[0], "wall": time.time()}))
+"""
+
+PHASES = (
+    ("settings", "import settings (dotenv, dj_database_url, ...)"),
+    ("setup", "django.setup(): app modules, models, ready()"),
+    ("handler", "WSGI handler and middleware"),
+    ("first_response", "first request (URLconf, views, serializers, DB connect)"),
+)
+
+
+def _parse_importtime(stderr):
+    """(self, cumulative) microseconds per module from ``-X importtime`` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold start: start fresh interpreters, serve one request and report time-to-first-response, "
+        "per-phase cost, per-app models/ready() cost and the slowest imports. "
+        "With --budget-ms it fails when the median time-to-first-response is over budget (used by CI)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/all-skills/", help="Request served as the first response.")
+        parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to start; the median is reported.")
+        parser.add_argument("--top", type=int, default=20, help="Number of slowest imports to list.")
+        parser.add_argument("--budget-ms", type=float, default=None, help="Fail if the median time-to-first-response exceeds this.")
+        parser.add_argument("--output", help="Also write the raw timings of every run to this JSON file.")
+
+    def handle(self, *args, **options):
+        runs = [self._run_once(options["path"]) for _ in range(max(options["runs"], 1))]
+        median_run = sorted(runs, key=lambda run: run["ttfr"])[len(runs) // 2]
+        ttfr = statistics.median(run["ttfr"] for run in runs)
+
+        self._report(median_run, ttfr, runs, options["top"])
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump({"ttfr_ms": ttfr, "runs": runs}, output, indent=2)
+
+        budget = options["budget_ms"]
+        if budget is not None:
+            if ttfr > budget:
+                raise CommandError(f"Time to first response {ttfr:.0f} ms is over the {budget:.0f} ms budget.")
+            self.stdout.write(self.style.SUCCESS(f"Time to first response {ttfr:.0f} ms is within the {budget:.0f} ms budget."))
+
+    def _run_once(self, path):
+        env = dict(os.environ)
+        began = time.time()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT, path],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Startup run failed:\n{result.stderr[-2000:]}")
+        data = json.loads(result.stdout.strip().splitlines()[-1])
+        data["ttfr"] = (data.pop("wall") - began) * 1000
+        data["imports"] = _parse_importtime(result.stderr)
+        return data
+
+    def _report(self, run, ttfr, runs, top):
+        self.stdout.write(
+            f"Time to first response: {ttfr:.0f} ms (median of {len(runs)}; "
+            f"interpreter start included; response {run['status']!r})"
+        )
+        self.stdout.write("\nPhases (ms since the interpreter began running the script):")
+        previous = 0.0
+        for key, label in PHASES:
+            at = run["marks"][key]
+            self.stdout.write(f"  {label:<60} +{at - previous:7.1f}  (at {at:7.1f})")
+            previous = at
+
+        self.stdout.write("\nApps (ms):")
+        self.stdout.write(f"  {'app':<24} {'models':>8} {'ready':>8}")
+        for label, phases in sorted(run["apps"].items(), key=lambda item: -sum(item[1].values())):
+            self.stdout.write(f"  {label:<24} {phases.get('models', 0):8.1f} {phases.get('ready', 0):8.1f}")
+
+        # Cumulative time includes nested imports, so a package and its submodules overlap
+        self.stdout.write(f"\nSlowest imports (ms, top {top}):")
+        self.stdout.write(f"  {'cumulative':>10} {'self':>8}  module")
+        slowest = sorted(run["imports"].items(), key=lambda item: -item[1][1])[:top]
+        for name, (self_us, cumulative_us) in slowest:
+            self.stdout.write(f"  {cumulative_us / 1000:10.1f} {self_us / 1000:8.1f}  {name}")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from api.documents import REBUILD_BATCH_SIZE, rebuild_documents, stale_profile_ids
+from api.models import Profile, ProfileDocument
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the stored profile documents (api/documents.py) from the live tables. "
+        "Run after deploys that change the profile payload; --stale-only skips documents that are current."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stale-only", action="store_true", help="Only rebuild missing or outdated documents.")
+        parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+        queryset = stale_profile_ids() if options["stale_only"] else Profile.objects.values_list("pk", flat=True)
+        profile_ids = list(queryset.order_by("pk"))
+        rebuilt = 0
+        for start in range(0, len(profile_ids), batch_size):
+            rebuilt += len(rebuild_documents(profile_ids[start:start + batch_size]))
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {rebuilt} profile documents ({ProfileDocument.objects.count()} stored)."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.trending import rebuild_skill_activity
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-skill daily and weekly activity rollups behind /api/skills/trending/ from the source tables."
+
+    def handle(self, *args, **options):
+        count = rebuild_skill_activity()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} skill activity buckets."))
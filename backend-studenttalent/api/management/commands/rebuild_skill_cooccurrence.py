@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.cooccurrence import rebuild_cooccurrence
+
+
+class Command(BaseCommand):
+    help = "Recompute the skill co-occurrence counts behind /api/skills/<id>/related/ from the profile skills."
+
+    def handle(self, *args, **options):
+        count = rebuild_cooccurrence()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} skill co-occurrence rows."))
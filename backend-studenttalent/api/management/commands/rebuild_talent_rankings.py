@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from api.ranking import rebuild_rankings, refresh_open_ended_rankings
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the stored ranking columns (score, endorsement/skill counts, experience) for every profile. "
+        "With --open-ended only profiles with a current job are recomputed; run that daily from cron so "
+        "their experience keeps counting up to today."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--open-ended",
+            action="store_true",
+            help="Only profiles whose experience runs to today (current or end-less jobs).",
+        )
+
+    def handle(self, *args, **options):
+        count = refresh_open_ended_rankings() if options["open_ended"] else rebuild_rankings()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rankings for {count} profiles."))
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.supabase_storage import SPOOL_REJECTED_DIR, SupabaseStorageError, replay_spool, spooled_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Send photo uploads spooled to STORAGE_SPOOL_DIR during a storage outage to Supabase. "
+        "Stops early while the storage circuit is open; run it on every host that spools, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="Most uploads to replay in this run.")
+        parser.add_argument("--dry-run", action="store_true", help="Only list the spooled uploads.")
+
+    def handle(self, *args, **options):
+        if not settings.STORAGE_SPOOL_DIR:
+            raise CommandError("STORAGE_SPOOL_DIR is not set.")
+        if options["dry_run"]:
+            entries = spooled_uploads()
+            for entry in entries:
+                self.stdout.write(f"{entry['key']} ({entry['content_type']})")
+            self.stdout.write(f"{len(entries)} spooled uploads.")
+            return
+        try:
+            replayed, rejected, remaining = replay_spool(options["limit"])
+        except SupabaseStorageError as exc:
+            raise CommandError(str(exc)) from exc
+        if rejected:
+            self.stdout.write(self.style.WARNING(
+                f"{rejected} uploads could not be replayed and were moved to {settings.STORAGE_SPOOL_DIR}/{SPOOL_REJECTED_DIR}/."
+            ))
+        self.stdout.write(self.style.SUCCESS(f"Replayed {replayed} uploads, {remaining} still spooled."))
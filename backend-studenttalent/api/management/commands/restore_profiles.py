@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.archive import ArchiveError, restore_profile
+from api.models import ArchivedProfile
+
+
+class Command(BaseCommand):
+    help = "Restore archived profiles (by profile id) to the live tables with their related rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("profile_ids", nargs="+", type=int)
+
+    def handle(self, *args, **options):
+        for profile_id in options["profile_ids"]:
+            archived = ArchivedProfile.objects.filter(profile_id=profile_id).first()
+            if archived is None:
+                raise CommandError(f"Profile {profile_id} is not archived.")
+            try:
+                restore_profile(archived)
+            except ArchiveError as exc:
+                raise CommandError(f"Profile {profile_id}: {exc}")
+            self.stdout.write(f"Restored profile {profile_id}")
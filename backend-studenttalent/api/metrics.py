@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import threading
+
+from django.core.cache import cache
+
+KEY_PREFIX = "metrics:"
+NAMES_KEY = f"{KEY_PREFIX}__names__"
+
+_known_names: set[str] = set()
+_lock = threading.Lock()
+
+
+def _register(name: str) -> None:
+    # Keep a shared index of counter names so any worker can report every counter
+    with _lock:
+        if name in _known_names:
+            return
+        _known_names.add(name)
+    names = cache.get(NAMES_KEY) or []
+    if name not in names:
+        cache.set(NAMES_KEY, sorted({*names, name}), timeout=None)
+
+
+def incr(name: str, amount: int = 1) -> None:
+    """Increment a counter shared by all workers through the cache."""
+    _register(name)
+    key = f"{KEY_PREFIX}{name}"
+    if cache.add(key, amount, timeout=None):
+        return
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        cache.set(key, amount, timeout=None)
+
+
+def counters() -> dict[str, int]:
+    names = cache.get(NAMES_KEY) or []
+    values = cache.get_many([f"{KEY_PREFIX}{name}" for name in names])
+    return {name: values.get(f"{KEY_PREFIX}{name}", 0) for name in names}
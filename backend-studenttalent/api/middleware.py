@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, JsonResponse
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import metrics
+from .db_router import pinned_to_primary
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Shed load instead of queueing when too many requests are in flight in this worker.
+
+    A request waits at most REQUEST_QUEUE_TIMEOUT seconds for a slot and otherwise gets an
+    immediate 503 with Retry-After, so a burst cannot pile up behind slow requests.
+    Disabled when MAX_CONCURRENT_REQUESTS is 0.
+    """
+
+    def __init__(self, get_response):
+        limit = getattr(settings, "MAX_CONCURRENT_REQUESTS", 0)
+        if not limit:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slots = threading.BoundedSemaphore(limit)
+        self.queue_timeout = getattr(settings, "REQUEST_QUEUE_TIMEOUT", 0.5)
+        self.exempt_prefixes = tuple(getattr(settings, "LOAD_SHEDDING_EXEMPT_PATHS", ()))
+
+    def __call__(self, request):
+        if self.exempt_prefixes and request.path.startswith(self.exempt_prefixes):
+            return self.get_response(request)
+
+        if not self.slots.acquire(timeout=self.queue_timeout):
+            metrics.incr("requests_shed")
+            response = JsonResponse(
+                {"detail": "Server is busy, please retry shortly."},
+                status=503,
+            )
+            response["Retry-After"] = "1"
+            return response
+
+        try:
+            return self.get_response(request)
+        finally:
+            self.slots.release()
+
+
+class ReplicaPinningMiddleware:
+    """
+    Read-your-writes for replica routing: after a client's successful write, its reads
+    stay on the primary for READ_YOUR_WRITES_WINDOW seconds.
+
+    Clients are keyed by the user id in their JWT (or the session user), so the pin is
+    shared by every worker through the cache and survives token refreshes.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        if not getattr(settings, "DATABASE_REPLICAS", None):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.window = settings.READ_YOUR_WRITES_WINDOW
+
+    def _client_key(self, request):
+        authorization = request.META.get("HTTP_AUTHORIZATION", "")
+        if authorization:
+            _, _, raw_token = authorization.partition(" ")
+            try:
+                # Signature check only, no DB lookup
+                user_id = AccessToken(raw_token)[jwt_settings.USER_ID_CLAIM]
+                return f"db-pin:user:{user_id}"
+            except (TokenError, KeyError):
+                return "db-pin:" + hashlib.sha256(authorization.encode()).hexdigest()
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return f"db-pin:user:{user.pk}"
+        return None
+
+    def __call__(self, request):
+        key = self._client_key(request)
+        with pinned_to_primary(bool(key and cache.get(key))):
+            response = self.get_response(request)
+
+        # Batches of reads arrive as POST but mark the request read_only
+        writes = request.method not in self.SAFE_METHODS and not getattr(request, "read_only", False)
+        if key and writes and response.status_code < 400:
+            cache.set(key, True, timeout=self.window)
+        return response
+
+
+class RequestProfilerMiddleware:
+    """
+    Profile a single request on demand: admins send ``X-Profile: <mode>`` (or ``?_profile=<mode>``).
+
+    Modes: ``report`` (default) keeps the normal response and adds an X-Profile-Report
+    header with the URL of the stored report; ``inline`` returns the report instead of
+    the response; ``pstats`` returns the raw profile as a download. Requests from
+    non-admins ignore the flag. Not installed unless REQUEST_PROFILING_ENABLED is set.
+    """
+
+    MODES = ("report", "inline", "pstats")
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def _is_admin(self, request):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return user.role == "admin"
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+
+        try:
+            result = JWTAuthentication().authenticate(request)
+        except Exception:
+            return False
+        return bool(result) and result[0].role == "admin"
+
+    def __call__(self, request):
+        mode = request.headers.get("X-Profile") or request.GET.get("_profile")
+        if not mode or not self._is_admin(request):
+            return self.get_response(request)
+        mode = mode.lower() if mode.lower() in self.MODES else "report"
+
+        from . import profiling
+
+        response, profiler, queries, wall_ms = profiling.profile_call(self.get_response, request)
+        if getattr(response, "streaming", False):
+            return response
+
+        if mode == "pstats":
+            download = HttpResponse(profiling.pstats_dump(profiler), content_type="application/octet-stream")
+            download["Content-Disposition"] = 'attachment; filename="request.prof"'
+            return download
+
+        report = profiling.build_report(request, response, profiler, queries, wall_ms)
+        if mode == "inline":
+            return JsonResponse(report)
+        report_id = profiling.store_report(report, profiler)
+        response["X-Profile-Report"] = request.build_absolute_uri(f"/api/admin/profiles/{report_id}/")
+        return response
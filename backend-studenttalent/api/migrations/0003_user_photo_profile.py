@@ -1,6 +1,21 @@
 from django.db import migrations, models
 
 
+def add_photo_profile(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        # Databases created before this migration may already have the column
+        schema_editor.execute("ALTER TABLE api_user ADD COLUMN IF NOT EXISTS photo_profile TEXT;")
+    else:
+        schema_editor.execute("ALTER TABLE api_user ADD COLUMN photo_profile TEXT;")
+
+
+def drop_photo_profile(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE api_user DROP COLUMN IF EXISTS photo_profile;")
+    else:
+        schema_editor.execute("ALTER TABLE api_user DROP COLUMN photo_profile;")
+
+
 class Migration(migrations.Migration):
 
     dependencies = [
@@ -8,8 +23,5 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
-        migrations.RunSQL(
-            sql="""ALTER TABLE api_user ADD COLUMN IF NOT EXISTS photo_profile TEXT;""",
-            reverse_sql="""ALTER TABLE api_user DROP COLUMN IF EXISTS photo_profile;""",
-        ),
+        migrations.RunPython(add_photo_profile, drop_photo_profile),
     ]
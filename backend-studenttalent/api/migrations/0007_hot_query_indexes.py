@@ -0,0 +1,57 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_profile_skills(apps, schema_editor):
+    """Collapse duplicate (profile, skill) rows so the unique constraint can be added."""
+    ProfileSkill = apps.get_model("api", "ProfileSkill")
+    SkillEndorsement = apps.get_model("api", "SkillEndorsement")
+
+    duplicates = (
+        ProfileSkill.objects.values("profile_id", "skill_id")
+        .annotate(rows=Count("id"), keep_id=Min("id"))
+        .filter(rows__gt=1)
+    )
+    for group in duplicates:
+        extra_ids = list(
+            ProfileSkill.objects.filter(profile_id=group["profile_id"], skill_id=group["skill_id"])
+            .exclude(id=group["keep_id"])
+            .values_list("id", flat=True)
+        )
+        kept_endorsers = set(
+            SkillEndorsement.objects.filter(profile_skill_id=group["keep_id"]).values_list("endorser_id", flat=True)
+        )
+        for endorsement in SkillEndorsement.objects.filter(profile_skill_id__in=extra_ids):
+            if endorsement.endorser_id in kept_endorsers:
+                continue
+            endorsement.profile_skill_id = group["keep_id"]
+            endorsement.save(update_fields=["profile_skill"])
+            kept_endorsers.add(endorsement.endorser_id)
+        ProfileSkill.objects.filter(id__in=extra_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_skill_endorsement"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_profile_skills, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["role"], name="user_role_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(fields=["is_active", "user"], name="profile_active_user_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="profileskill",
+            constraint=models.UniqueConstraint(fields=("profile", "skill"), name="unique_profile_skill"),
+        ),
+        migrations.AddIndex(
+            model_name="skillendorsement",
+            index=models.Index(fields=["endorser", "profile_skill"], name="endorsement_endorser_idx"),
+        ),
+    ]
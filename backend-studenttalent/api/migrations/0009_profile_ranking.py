@@ -0,0 +1,93 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:52
+
+from django.db import migrations, models
+from django.db.models import Count, Exists, OuterRef
+
+
+def backfill_rankings(apps, schema_editor):
+    # Only the pure scoring helpers are shared with api.ranking; rows come from historical models
+    from api.ranking import COMPLETENESS_FIELDS, experience_months, profile_completeness, ranking_score
+
+    Profile = apps.get_model('api', 'Profile')
+    ProfileSkill = apps.get_model('api', 'ProfileSkill')
+    Experience = apps.get_model('api', 'Experience')
+    Project = apps.get_model('api', 'Project')
+    PortfolioLink = apps.get_model('api', 'PortfolioLink')
+
+    rows = Profile.objects.annotate(
+        has_projects=Exists(Project.objects.filter(profile=OuterRef('pk'))),
+        has_links=Exists(PortfolioLink.objects.filter(profile=OuterRef('pk'))),
+    ).values('pk', *COMPLETENESS_FIELDS, 'has_projects', 'has_links')
+    for values in rows.iterator():
+        counts = ProfileSkill.objects.filter(profile_id=values['pk']).aggregate(
+            skills=Count('id', distinct=True),
+            endorsements=Count('endorsements'),
+        )
+        ranges = list(
+            Experience.objects.filter(profile_id=values['pk']).values_list('start_date', 'end_date', 'is_current')
+        )
+        # Open-ended jobs are left out so the result does not depend on the day the migration
+        # runs; the scheduled rebuild_talent_rankings --open-ended counts them up to today
+        months = experience_months(ranges, None)
+        completeness = profile_completeness(
+            values, counts['skills'], bool(ranges), values['has_projects'], values['has_links']
+        )
+        Profile.objects.filter(pk=values['pk']).update(
+            endorsements_total=counts['endorsements'],
+            skills_count=counts['skills'],
+            experience_months=months,
+            completeness=completeness,
+            ranking_score=ranking_score(counts['endorsements'], counts['skills'], months, completeness),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_profile_content_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='completeness',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='endorsements_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='experience_months',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='ranking_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='skills_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['is_active', '-ranking_score', '-id'], name='profile_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['is_active', '-endorsements_total', '-id'], name='profile_endorsements_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['is_active', '-experience_months', '-id'], name='profile_experience_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['is_active', '-updated_at', '-id'], name='profile_recent_idx'),
+        ),
+        migrations.RunPython(backfill_rankings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:53
+
+from django.db import migrations, models
+
+
+def seed_feed(apps, schema_editor):
+    # Existing profiles enter the feed as "created" so a consumer starting at cursor 0 sees everyone
+    Profile = apps.get_model('api', 'Profile')
+    ProfileChange = apps.get_model('api', 'ProfileChange')
+    ProfileChange.objects.bulk_create(
+        [
+            ProfileChange(
+                profile_id=pk,
+                user_id=user_id,
+                kind='created' if is_active else 'deactivated',
+            )
+            for pk, user_id, is_active in Profile.objects.order_by('pk').values_list('pk', 'user_id', 'is_active')
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_profile_ranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile_id', models.BigIntegerField(unique=True)),
+                ('user_id', models.BigIntegerField(blank=True, null=True)),
+                ('kind', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deactivated', 'Deactivated'), ('deleted', 'Deleted')], max_length=20)),
+                ('changed_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+        ),
+        migrations.RunPython(seed_feed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:40
+
+from django.db import DatabaseError, migrations, models, transaction
+
+
+def backfill_search_names(apps, schema_editor):
+    from api.search import search_name
+
+    Profile = apps.get_model('api', 'Profile')
+    profiles = list(Profile.objects.select_related('user').only('pk', 'user__first_name', 'user__last_name'))
+    for profile in profiles:
+        profile.search_name = search_name(profile.user.first_name, profile.user.last_name)
+    Profile.objects.bulk_update(profiles, ['search_name'], batch_size=1000)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # Postgres only; other databases use the in-memory index in api/search.py
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except DatabaseError:
+        # Server without the contrib package: typeahead falls back to the in-memory index
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS profile_search_name_trgm_idx '
+        'ON api_profile USING gin (search_name gin_trgm_ops)'
+    )
+    # Matches the UPPER(nim::text) LIKE 'X%' that istartswith produces
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS profile_nim_prefix_idx '
+        'ON api_profile (UPPER(nim::text) text_pattern_ops)'
+    )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS profile_search_name_trgm_idx')
+    schema_editor.execute('DROP INDEX IF EXISTS profile_nim_prefix_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_profile_change_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='search_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=301),
+        ),
+        migrations.RunPython(backfill_search_names, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
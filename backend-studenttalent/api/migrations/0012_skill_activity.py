@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:05
+
+from collections import Counter
+from datetime import timedelta
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_activity(apps, schema_editor):
+    # Endorsements already carry created_at; existing profile skills have no add date to count
+    SkillActivity = apps.get_model('api', 'SkillActivity')
+    SkillEndorsement = apps.get_model('api', 'SkillEndorsement')
+    counts = Counter()
+    for skill_id, created_at in SkillEndorsement.objects.values_list('profile_skill__skill_id', 'created_at').iterator():
+        day = timezone.localdate(created_at)
+        counts[skill_id, 'day', day] += 1
+        counts[skill_id, 'week', day - timedelta(days=day.weekday())] += 1
+    SkillActivity.objects.bulk_create(
+        [
+            SkillActivity(skill_id=skill_id, period=period, bucket_start=bucket_start, endorsements=count)
+            for (skill_id, period, bucket_start), count in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_profile_search_name'),
+    ]
+
+    operations = [
+        # Added without a default first so existing rows stay NULL instead of getting today's date
+        migrations.AddField(
+            model_name='profileskill',
+            name='created_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='profileskill',
+            name='created_at',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='SkillActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week')], max_length=4)),
+                ('bucket_start', models.DateField()),
+                ('endorsements', models.IntegerField(default=0)),
+                ('additions', models.IntegerField(default=0)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='api.skill')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('skill', 'period', 'bucket_start'), name='unique_skill_activity_bucket')],
+                'indexes': [models.Index(fields=['period', 'bucket_start', 'skill'], name='skill_activity_window_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_activity, migrations.RunPython.noop),
+    ]
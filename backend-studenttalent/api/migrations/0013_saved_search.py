@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_skill_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('min_level', models.CharField(blank=True, choices=[('Beginner', 'Beginner'), ('Intermediate', 'Intermediate'), ('Advanced', 'Advanced'), ('Expert', 'Expert')], max_length=20)),
+                ('prodi', models.CharField(blank=True, max_length=100)),
+                ('prodi_key', models.CharField(blank=True, editable=False, max_length=100)),
+                ('entry_year', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL)),
+                ('skill', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to='api.skill')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['skill', 'min_level'], name='saved_search_skill_idx'),
+                    models.Index(fields=['prodi_key'], name='saved_search_prodi_idx'),
+                    models.Index(fields=['entry_year'], name='saved_search_year_idx'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedSearchMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matched_at', models.DateTimeField(auto_now_add=True)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_search_matches', to='api.profile')),
+                ('search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='api.savedsearch')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('search', 'profile'), name='unique_saved_search_match')],
+                'indexes': [
+                    models.Index(fields=['search', 'id'], name='saved_search_match_feed_idx'),
+                    models.Index(fields=['profile'], name='saved_search_match_profile_idx'),
+                ],
+            },
+        ),
+    ]
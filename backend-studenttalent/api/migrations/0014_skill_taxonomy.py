@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_keys(apps, schema_editor):
+    from api.taxonomy import skill_key
+
+    Skill = apps.get_model('api', 'Skill')
+    skills = list(Skill.objects.all())
+    for skill in skills:
+        skill.key = skill_key(skill.name)
+    Skill.objects.bulk_update(skills, ['key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_saved_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=50),
+        ),
+        migrations.CreateModel(
+            name='SkillAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True)),
+                ('name', models.CharField(max_length=50)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='api.skill')),
+            ],
+        ),
+        migrations.RunPython(backfill_keys, migrations.RunPython.noop),
+    ]
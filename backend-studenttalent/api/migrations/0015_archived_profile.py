@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_skill_taxonomy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile_id', models.BigIntegerField(unique=True)),
+                ('name', models.CharField(blank=True, max_length=301)),
+                ('prodi', models.CharField(blank=True, max_length=100)),
+                ('entry_year', models.IntegerField(blank=True, null=True)),
+                ('reason', models.CharField(max_length=20)),
+                ('archived_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('data', models.JSONField()),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archived_profile', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_archived_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileDocument',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='api.profile')),
+                ('version', models.PositiveIntegerField()),
+                ('data', models.JSONField()),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_profile_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='views_total',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='ProfileViewDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_views', to='api.profile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('profile', 'day'), name='unique_profile_view_day')],
+            },
+        ),
+    ]
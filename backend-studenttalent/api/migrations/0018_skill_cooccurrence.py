@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def backfill_cooccurrence(apps, schema_editor):
+    # Same self-join as api.cooccurrence.rebuild_cooccurrence()
+    ProfileSkill = apps.get_model('api', 'ProfileSkill')
+    SkillCooccurrence = apps.get_model('api', 'SkillCooccurrence')
+    pairs = (
+        ProfileSkill.objects.values('skill_id', related_skill=F('profile__profile_skills__skill_id'))
+        .annotate(profiles=Count('pk'))
+        .order_by()
+    )
+    SkillCooccurrence.objects.bulk_create(
+        (
+            SkillCooccurrence(skill_id=row['skill_id'], related_id=row['related_skill'], profiles=row['profiles'])
+            for row in pairs.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_profile_views'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillCooccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profiles', models.IntegerField(default=0)),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.skill')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cooccurrences', to='api.skill')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('skill', 'related'), name='unique_skill_cooccurrence')],
+                'indexes': [models.Index(fields=['skill', '-profiles'], name='skill_cooccurrence_top_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_cooccurrence, migrations.RunPython.noop),
+    ]
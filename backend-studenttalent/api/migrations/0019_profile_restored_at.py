@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_skill_cooccurrence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='restored_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.utils import timezone
 
 
 class UserManager(BaseUserManager):
@@ -46,12 +47,30 @@ class User(AbstractUser):
     REQUIRED_FIELDS = []
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Every public profile query excludes admins by role
+            models.Index(fields=['role'], name='user_role_idx'),
+        ]
+
 class Skill(models.Model):
     name = models.CharField(max_length=50, unique=True)
+    # Spelling-insensitive form of the name, set on save (see api/taxonomy.py)
+    key = models.CharField(max_length=50, blank=True, editable=False, db_index=True)
 
     def __str__(self):
         return self.name
 
+class SkillAlias(models.Model):
+    """Another spelling of a canonical skill, e.g. "JS" for JavaScript (see api/taxonomy.py)."""
+    key = models.CharField(max_length=50, unique=True)  # skill_key() of name
+    name = models.CharField(max_length=50)
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='aliases')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} -> {self.skill_id}"
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     nim = models.CharField(max_length=15, unique=True, blank=True, null=True)
@@ -65,9 +84,60 @@ class Profile(models.Model):
     github = models.URLField(blank=True)
     website = models.URLField(blank=True)
 
+    # Bumped whenever the profile or anything rendered with it changes (see api/signals.py)
+    content_version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Precomputed sort keys, maintained by api/ranking.py
+    endorsements_total = models.PositiveIntegerField(default=0)
+    skills_count = models.PositiveIntegerField(default=0)
+    experience_months = models.PositiveIntegerField(default=0)
+    completeness = models.PositiveSmallIntegerField(default=0)  # percent
+    ranking_score = models.FloatField(default=0)
+
+    # Normalized "first last" name for typeahead matching (see api/search.py)
+    search_name = models.CharField(max_length=301, blank=True, default='', editable=False)
+
+    # Sum of ProfileViewDaily, added to by api/profile_views.py when buffered views are flushed
+    views_total = models.PositiveBigIntegerField(default=0, editable=False)
+
+    # Set when the profile comes back from the archive; exempts it from the graduated rule (see api/archive.py)
+    restored_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Public listings filter on is_active and join the user row
+            models.Index(fields=['is_active', 'user'], name='profile_active_user_idx'),
+            # One index per ?ordering= value so sorted pages are index scans
+            models.Index(fields=['is_active', '-ranking_score', '-id'], name='profile_featured_idx'),
+            models.Index(fields=['is_active', '-endorsements_total', '-id'], name='profile_endorsements_idx'),
+            models.Index(fields=['is_active', '-experience_months', '-id'], name='profile_experience_idx'),
+            models.Index(fields=['is_active', '-updated_at', '-id'], name='profile_recent_idx'),
+        ]
+
     def __str__(self):
         return self.user.username
 
+class ProfileChange(models.Model):
+    """
+    Latest change per profile for the incremental sync feed (see api/change_feed.py).
+    Each change gives the profile's row a new auto-increment id, so the id works as a
+    monotonic cursor. There is no FK so deletions survive as tombstones.
+    """
+    KIND_CHOICES = (
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deactivated', 'Deactivated'),
+        ('deleted', 'Deleted'),
+    )
+    profile_id = models.BigIntegerField(unique=True)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    changed_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind} profile {self.profile_id}"
+
 class ProfileSkill(models.Model):
     LEVEL_CHOICES = (
         ('Beginner', 'Beginner'),
@@ -78,6 +148,13 @@ class ProfileSkill(models.Model):
     profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='profile_skills')
     skill = models.ForeignKey(Skill, on_delete=models.CASCADE)
     level = models.CharField(max_length=20, choices=LEVEL_CHOICES, default='Intermediate')
+    # Null for rows added before this was tracked; they are left out of the trending rollups
+    created_at = models.DateTimeField(default=timezone.now, null=True, blank=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'skill'], name='unique_profile_skill'),
+        ]
 
     def __str__(self):
         return f"{self.profile.user.username} - {self.skill.name}"
@@ -89,10 +166,63 @@ class SkillEndorsement(models.Model):
 
     class Meta:
         unique_together = ('profile_skill', 'endorser')
+        indexes = [
+            # "Endorsed by me" checks and per-user endorsement listings start from the endorser
+            models.Index(fields=['endorser', 'profile_skill'], name='endorsement_endorser_idx'),
+        ]
 
     def __str__(self):
         return f"{self.endorser.email} endorsed {self.profile_skill}"
 
+class SkillActivity(models.Model):
+    """
+    Endorsements given and profiles that added a skill, per skill per day or week.
+    Maintained by api/trending.py; backs /api/skills/trending/.
+    """
+    PERIOD_CHOICES = (
+        ('day', 'Day'),
+        ('week', 'Week'),
+    )
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='activity')
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    bucket_start = models.DateField()  # the day, or the Monday of the week
+    endorsements = models.IntegerField(default=0)
+    additions = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['skill', 'period', 'bucket_start'], name='unique_skill_activity_bucket'),
+        ]
+        indexes = [
+            # Trending reads a window of buckets for every skill
+            models.Index(fields=['period', 'bucket_start', 'skill'], name='skill_activity_window_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.skill_id} {self.period} {self.bucket_start}"
+
+class SkillCooccurrence(models.Model):
+    """
+    Profiles that have both ``skill`` and ``related``, stored once per direction; the row with
+    related == skill counts the profiles that have the skill. Maintained by api/cooccurrence.py;
+    backs /api/skills/<id>/related/.
+    """
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='cooccurrences')
+    related = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='+')
+    profiles = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['skill', 'related'], name='unique_skill_cooccurrence'),
+        ]
+        indexes = [
+            # Related skills read one skill's most frequent partners
+            models.Index(fields=['skill', '-profiles'], name='skill_cooccurrence_top_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.skill_id} & {self.related_id}: {self.profiles}"
+
 class Experience(models.Model):
     profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='experiences')
     title = models.CharField(max_length=100)
@@ -121,3 +251,97 @@ class Project(models.Model):
 
     def __str__(self):
         return self.title
+
+class SavedSearch(models.Model):
+    """
+    A stored talent search. Every predicate is optional, but at least one is set.
+    Profiles are matched incrementally as they change (see api/percolator.py).
+    """
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='saved_searches')
+    name = models.CharField(max_length=100)
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, null=True, blank=True, related_name='saved_searches')
+    min_level = models.CharField(max_length=20, choices=ProfileSkill.LEVEL_CHOICES, blank=True)  # needs skill
+    prodi = models.CharField(max_length=100, blank=True)
+    prodi_key = models.CharField(max_length=100, blank=True, editable=False)  # normalized prodi
+    entry_year = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Reverse index: one lookup per predicate finds the searches a profile can satisfy
+            models.Index(fields=['skill', 'min_level'], name='saved_search_skill_idx'),
+            models.Index(fields=['prodi_key'], name='saved_search_prodi_idx'),
+            models.Index(fields=['entry_year'], name='saved_search_year_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+class SavedSearchMatch(models.Model):
+    """A profile currently matching a saved search; the id is the cursor of the search's result feed."""
+    search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='matches')
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='saved_search_matches')
+    matched_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['search', 'profile'], name='unique_saved_search_match'),
+        ]
+        indexes = [
+            # Result feed pages walk one search's matches by id
+            models.Index(fields=['search', 'id'], name='saved_search_match_feed_idx'),
+            # Re-evaluation reads every match of the changed profile
+            models.Index(fields=['profile'], name='saved_search_match_profile_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.profile_id} matches {self.search_id}"
+
+class ProfileViewDaily(models.Model):
+    """
+    Detail-page views of a profile per day, after bot and repeat-view filtering.
+    Written in batches by api/profile_views.py, never per request.
+    """
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='daily_views')
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'day'], name='unique_profile_view_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.profile_id} {self.day}: {self.views}"
+
+class ProfileDocument(models.Model):
+    """
+    The profile's public ProfileSerializer output, stored so reads skip the related tables.
+    ``version`` is the Profile.content_version it was built from; a mismatch means it is stale
+    (see api/documents.py).
+    """
+    profile = models.OneToOneField(Profile, on_delete=models.CASCADE, primary_key=True, related_name='document')
+    version = models.PositiveIntegerField()
+    data = models.JSONField()
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"document for profile {self.profile_id} (v{self.version})"
+
+class ArchivedProfile(models.Model):
+    """
+    Cold storage for an archived profile: the serialized Profile and all its related rows.
+    The live rows are deleted so public queries never see them (see api/archive.py).
+    """
+    profile_id = models.BigIntegerField(unique=True)
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='archived_profile')
+    # Copied out of the snapshot for the admin listing
+    name = models.CharField(max_length=301, blank=True)
+    prodi = models.CharField(max_length=100, blank=True)
+    entry_year = models.IntegerField(null=True, blank=True)
+    reason = models.CharField(max_length=20)
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    data = models.JSONField()
+
+    def __str__(self):
+        return f"archived profile {self.profile_id}"
@@ -0,0 +1,110 @@
+"""
+Incremental matching of saved talent searches.
+
+Instead of re-running every saved search, a changed profile is run "in reverse":
+one query over the indexed SavedSearch predicate columns (skill / min_level,
+prodi_key, entry_year) returns exactly the searches the profile satisfies, and the
+difference with its current SavedSearchMatch rows is applied. New matches get fresh ids,
+so they show up after the last cursor of each search's result feed.
+
+api/signals.py calls percolate_profile() when a profile or one of its skills
+changes; the profile editor calls it after its bulk writes.
+"""
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Profile, ProfileSkill, SavedSearch, SavedSearchMatch
+from .search import normalize
+
+LEVELS = [value for value, _ in ProfileSkill.LEVEL_CHOICES]
+MATCH_PAGE_LIMIT = 100
+MAX_MATCH_PAGE_LIMIT = 500
+
+
+def levels_up_to(level):
+    """min_level values satisfied by a skill at ``level`` (blank means any level)."""
+    rank = LEVELS.index(level) if level in LEVELS else 0
+    return [''] + LEVELS[:rank + 1]
+
+
+def visible_profiles():
+    return Profile.objects.filter(is_active=True).exclude(user__role='admin')
+
+
+def matching_searches(profile_id):
+    """Ids of the saved searches the profile satisfies, from one query over the predicate indexes."""
+    profile = visible_profiles().filter(pk=profile_id).values('prodi', 'entry_year').first()
+    if profile is None:
+        return set()
+
+    skill_match = Q(skill__isnull=True)
+    for skill_id, level in ProfileSkill.objects.filter(profile_id=profile_id).values_list('skill_id', 'level'):
+        skill_match |= Q(skill_id=skill_id, min_level__in=levels_up_to(level))
+    prodi_match = Q(prodi_key='')
+    if profile['prodi']:
+        prodi_match |= Q(prodi_key=normalize(profile['prodi']))
+    year_match = Q(entry_year__isnull=True)
+    if profile['entry_year'] is not None:
+        year_match |= Q(entry_year=profile['entry_year'])
+    return set(SavedSearch.objects.filter(skill_match, prodi_match, year_match).values_list('pk', flat=True))
+
+
+def percolate_profile(profile_id, allow_new=True):
+    """
+    Bring the profile's saved-search matches up to date; returns (added, removed) search ids.
+
+    With allow_new=False matches are only removed, for changes that cannot add any
+    (e.g. a skill deleted while its profile may be going away too).
+    """
+    current = set(SavedSearchMatch.objects.filter(profile_id=profile_id).values_list('search_id', flat=True))
+    matched = matching_searches(profile_id)
+    added = matched - current if allow_new else set()
+    removed = current - matched
+    if removed:
+        SavedSearchMatch.objects.filter(profile_id=profile_id, search_id__in=removed).delete()
+    if added:
+        SavedSearchMatch.objects.bulk_create(
+            [SavedSearchMatch(search_id=search_id, profile_id=profile_id) for search_id in sorted(added)],
+            ignore_conflicts=True,
+        )
+    return added, removed
+
+
+def refresh_search(search):
+    """Run one saved search forwards and sync its matches; used when a search is created or edited."""
+    profiles = visible_profiles()
+    if search.skill_id:
+        skills = ProfileSkill.objects.filter(skill_id=search.skill_id)
+        if search.min_level:
+            skills = skills.filter(level__in=LEVELS[LEVELS.index(search.min_level):])
+        profiles = profiles.filter(pk__in=skills.values('profile_id'))
+    if search.entry_year is not None:
+        profiles = profiles.filter(entry_year=search.entry_year)
+    # prodi is compared in normalized form, the same way matching_searches() does
+    profile_ids = {
+        pk for pk, prodi in profiles.values_list('pk', 'prodi')
+        if not search.prodi_key or normalize(prodi) == search.prodi_key
+    }
+
+    with transaction.atomic():
+        current = set(search.matches.values_list('profile_id', flat=True))
+        search.matches.filter(profile_id__in=current - profile_ids).delete()
+        SavedSearchMatch.objects.bulk_create(
+            [SavedSearchMatch(search=search, profile_id=pk) for pk in sorted(profile_ids - current)],
+            ignore_conflicts=True,
+        )
+
+
+def matches_page(search, cursor=None, limit=MATCH_PAGE_LIMIT):
+    """Return (matches, next_cursor, has_more) for the search's result feed."""
+    limit = max(1, min(limit, MAX_MATCH_PAGE_LIMIT))
+    rows = search.matches.select_related('profile__user').order_by('id')
+    if cursor is not None:
+        rows = rows.filter(id__gt=cursor)
+    rows = list(rows[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = rows[-1].id if rows else cursor
+    return rows, next_cursor, has_more
@@ -0,0 +1,319 @@
+"""
+Profile view counts with write-behind aggregation.
+
+record_view() runs on every profile detail read, before the conditional check, so a
+revalidation answered with 304 is counted too. It never touches the database. It drops
+bots, prefetches and the owner's own views, counts one viewer at most once per profile per
+PROFILE_VIEW_DEDUP_SECONDS, and adds the view to a buffer chosen with PROFILE_VIEW_BUFFER:
+
+- ProcessBuffer keeps the counts in the worker's memory (a killed process loses them).
+- CacheBuffer keeps them in the shared cache, so every worker adds to the same counters, with
+  an index of the keys that changed so a flush only reads those.
+
+flush_views() drains the buffer into ProfileViewDaily and Profile.views_total with one
+upsert and one UPDATE per batch. Every process flushes from a background thread each
+PROFILE_VIEW_FLUSH_SECONDS and once more when it exits; flush_profile_views does the same
+from cron. Totals are therefore up to one flush interval behind (plus two index buckets,
+20 seconds, with CacheBuffer). views_total is part of the
+profile ETags (api/utils/conditional.py), so a flush invalidates cached payloads.
+"""
+from __future__ import annotations
+
+import atexit
+import datetime
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.db.models import Case, F, PositiveBigIntegerField, Value, When
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+from . import metrics
+from .models import Profile, ProfileViewDaily
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "profile-views:"
+FLUSH_BATCH_SIZE = 500
+# Crawlers, link unfurlers, monitors and scripted clients; an empty User-Agent counts as a bot too
+BOT_USER_AGENT = re.compile(
+    r"bot|crawl|spider|slurp|archiver|facebookexternalhit|embedly|preview|headless|lighthouse"
+    r"|monitor|uptime|pingdom|curl|wget|python-|httpx|go-http-client|java/|okhttp|libwww|scrapy",
+    re.IGNORECASE,
+)
+
+
+def is_bot(request) -> bool:
+    user_agent = request.META.get("HTTP_USER_AGENT", "")
+    if not user_agent or BOT_USER_AGENT.search(user_agent):
+        return True
+    # Speculative loads (link prefetch, prerender) are not views
+    purpose = request.META.get("HTTP_SEC_PURPOSE") or request.META.get("HTTP_PURPOSE") or ""
+    return "prefetch" in purpose.lower()
+
+
+def _viewer(request) -> str:
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"u{user.pk}"
+    # Same client address logic as the throttles (honours NUM_PROXIES)
+    ident = f"{BaseThrottle().get_ident(request)}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return f"a{hashlib.sha1(ident.encode()).hexdigest()[:16]}"
+
+
+def record_view(request, profile_id, owner_id=None) -> bool:
+    """Count one view of the profile unless it is a bot, the owner or a repeat; returns whether it counted."""
+    if is_bot(request):
+        return False
+    user = getattr(request, "user", None)
+    if owner_id is not None and user is not None and user.is_authenticated and user.pk == owner_id:
+        return False
+    seen_key = f"{KEY_PREFIX}seen:{profile_id}:{_viewer(request)}"
+    if not cache.add(seen_key, 1, timeout=settings.PROFILE_VIEW_DEDUP_SECONDS):
+        return False
+    get_buffer().add(profile_id, timezone.localdate())
+    _start_flusher()
+    return True
+
+
+class ProcessBuffer:
+    """Counts held in this process until the next flush."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, profile_id, day, amount=1):
+        with self._lock:
+            self._counts[(profile_id, day)] += amount
+
+    def drain(self) -> Counter:
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        return counts
+
+    def restore(self, counts):
+        with self._lock:
+            self._counts.update(counts)
+
+
+class CacheBuffer:
+    """
+    Counts held in the shared cache, one key per profile and day.
+
+    add() indexes a count key whenever it goes from zero to non-zero: it appends (profile_id,
+    day) to a slot in the current BUCKET_SECONDS bucket of a dirty index. drain() reads only the
+    closed buckets since its cursor, so a flush costs as much as the profiles viewed since the
+    last one, not the profile population. A lock keeps two flushers from subtracting the same
+    counts.
+    """
+
+    LOCK_KEY = f"{KEY_PREFIX}drain-lock"
+    CURSOR_KEY = f"{KEY_PREFIX}dirty-cursor"
+    BUCKET_SECONDS = 10
+    # Buffered days older than this are dropped with their keys
+    KEY_TIMEOUT = 2 * 24 * 3600
+
+    def _key(self, profile_id, day):
+        return f"{KEY_PREFIX}count:{day.isoformat()}:{profile_id}"
+
+    def _bucket(self):
+        return int(time.time() // self.BUCKET_SECONDS)
+
+    def _size_key(self, bucket):
+        return f"{KEY_PREFIX}dirty:{bucket}:size"
+
+    def _slot_key(self, bucket, slot):
+        return f"{KEY_PREFIX}dirty:{bucket}:{slot}"
+
+    def _incr(self, key, amount):
+        """Add to a counter key, creating it if needed; returns the new value."""
+        if cache.add(key, amount, timeout=self.KEY_TIMEOUT):
+            return amount
+        try:
+            return cache.incr(key, amount)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.add(key, amount, timeout=self.KEY_TIMEOUT)
+            return amount
+
+    def _mark_dirty(self, profile_id, day):
+        bucket = self._bucket()
+        slot = self._incr(self._size_key(bucket), 1)
+        cache.set(self._slot_key(bucket, slot), (profile_id, day), timeout=self.KEY_TIMEOUT)
+
+    def add(self, profile_id, day, amount=1):
+        if self._incr(self._key(profile_id, day), amount) == amount:
+            # New, or drained to zero since the last flush
+            self._mark_dirty(profile_id, day)
+
+    def drain(self) -> Counter:
+        counts = Counter()
+        if not cache.add(self.LOCK_KEY, 1, timeout=max(settings.PROFILE_VIEW_FLUSH_SECONDS, 60)):
+            return counts
+        try:
+            current = self._bucket()
+            # A lost cursor (first flush, eviction) rescans every bucket a count key can outlive
+            last = cache.get(self.CURSOR_KEY, current - self.KEY_TIMEOUT // self.BUCKET_SECONDS)
+            # The bucket before the current one may still be getting its last slots written
+            closed = current - 2
+            for start in range(last + 1, closed + 1, FLUSH_BATCH_SIZE):
+                self._drain_buckets(range(start, min(start + FLUSH_BATCH_SIZE, closed + 1)), counts)
+            if closed > last:
+                cache.set(self.CURSOR_KEY, closed, timeout=None)
+        finally:
+            cache.delete(self.LOCK_KEY)
+        return counts
+
+    def _drain_buckets(self, buckets, counts):
+        size_keys = {self._size_key(bucket): bucket for bucket in buckets}
+        sizes = cache.get_many(list(size_keys))
+        slot_keys = [
+            self._slot_key(size_keys[key], slot) for key, size in sizes.items() for slot in range(1, size + 1)
+        ]
+        dirty = set()
+        for start in range(0, len(slot_keys), FLUSH_BATCH_SIZE):
+            # A slot whose writer died between the two cache calls is simply missing
+            dirty.update(cache.get_many(slot_keys[start:start + FLUSH_BATCH_SIZE]).values())
+        dirty = sorted(dirty)
+        for start in range(0, len(dirty), FLUSH_BATCH_SIZE):
+            self._drain_counts(dirty[start:start + FLUSH_BATCH_SIZE], counts)
+        cache.delete_many(list(sizes) + slot_keys)
+
+    def _drain_counts(self, entries, counts):
+        keys = {self._key(profile_id, day): (profile_id, day) for profile_id, day in entries}
+        for key, amount in cache.get_many(list(keys)).items():
+            if not amount:
+                continue
+            try:
+                # Subtract rather than delete, so views added since the read stay buffered
+                left = cache.decr(key, amount)
+            except ValueError:
+                # Expired since the read
+                continue
+            counts[keys[key]] += amount
+            if left:
+                # Those views were added to a non-zero key, so add() did not index it
+                self._mark_dirty(*keys[key])
+
+    def restore(self, counts):
+        for (profile_id, day), amount in counts.items():
+            self.add(profile_id, day, amount)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = import_string(settings.PROFILE_VIEW_BUFFER)()
+    return _buffer
+
+
+def _upsert_daily(rows):
+    # bulk_create(update_conflicts=True) can only overwrite the count, not add to it
+    table = connection.ops.quote_name(ProfileViewDaily._meta.db_table)
+    placeholders = ", ".join(["(%s, %s, %s)"] * len(rows))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (profile_id, day, views) VALUES {placeholders} "
+            f"ON CONFLICT (profile_id, day) DO UPDATE SET views = {table}.views + EXCLUDED.views",
+            [value for row in rows for value in row],
+        )
+
+
+def write_counts(counts) -> int:
+    """Add {(profile_id, day): views} to the daily rows and profile totals; returns the views written."""
+    counts = {key: amount for key, amount in counts.items() if amount > 0}
+    existing = set(Profile.objects.filter(pk__in={profile_id for profile_id, _ in counts}).values_list("pk", flat=True))
+    # Sorted so concurrent flushers lock rows in the same order
+    rows = sorted((profile_id, day, amount) for (profile_id, day), amount in counts.items() if profile_id in existing)
+    written = 0
+    for start in range(0, len(rows), FLUSH_BATCH_SIZE):
+        batch = rows[start:start + FLUSH_BATCH_SIZE]
+        totals = Counter()
+        for profile_id, _, amount in batch:
+            totals[profile_id] += amount
+        with transaction.atomic():
+            _upsert_daily(batch)
+            # queryset.update() leaves updated_at and content_version alone: a view is not a content change
+            Profile.objects.filter(pk__in=totals).update(
+                views_total=F("views_total") + Case(
+                    *(When(pk=profile_id, then=Value(amount)) for profile_id, amount in totals.items()),
+                    default=Value(0),
+                    output_field=PositiveBigIntegerField(),
+                )
+            )
+        written += sum(totals.values())
+    return written
+
+
+def flush_views() -> int:
+    """Write the buffered views to the database; returns how many were written."""
+    buffer = get_buffer()
+    counts = buffer.drain()
+    if not counts:
+        return 0
+    try:
+        written = write_counts(counts)
+    except Exception:
+        # Keep the counts for the next flush (a batch that did commit may be counted twice)
+        buffer.restore(counts)
+        raise
+    metrics.incr("profile_views.flushed", written)
+    return written
+
+
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def _flush_loop(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush_views()
+        except Exception:
+            logger.exception("Flushing profile views failed")
+        finally:
+            # This thread's own connections
+            connections.close_all()
+
+
+def _flush_at_exit():
+    try:
+        flush_views()
+    except Exception:
+        logger.exception("Flushing profile views at exit failed")
+
+
+def _start_flusher():
+    global _flusher
+    interval = settings.PROFILE_VIEW_FLUSH_SECONDS
+    if _flusher is not None or interval <= 0:
+        return
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, args=(interval,), name="profile-views-flusher", daemon=True)
+            _flusher.start()
+            atexit.register(_flush_at_exit)
+
+
+def daily_views(profile_id, days):
+    """[{'day', 'views'}] for the last ``days`` days that had views, oldest first."""
+    since = timezone.localdate() - datetime.timedelta(days=days - 1)
+    return list(
+        ProfileViewDaily.objects.filter(profile_id=profile_id, day__gte=since).order_by("day").values("day", "views")
+    )
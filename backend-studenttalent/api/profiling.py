@@ -0,0 +1,134 @@
+"""
+On-demand request profiling for admins (see RequestProfilerMiddleware).
+
+A profiled request runs under cProfile with every SQL statement timed through a
+connection execute wrapper. The report holds the top functions, a pruned call tree and
+the SQL log. It is kept in the cache for PROFILE_REPORT_TTL seconds so it can be fetched
+from /api/admin/profiles/<id>/.
+"""
+from __future__ import annotations
+
+import cProfile
+import marshal
+import pstats
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+
+from django.core.cache import cache
+from django.db import connections
+
+PROFILE_REPORT_TTL = 600
+TOP_FUNCTIONS = 40
+TREE_DEPTH = 8
+TREE_MIN_SHARE = 0.01  # call tree nodes under 1% of the total are dropped
+
+
+class QueryLog:
+    """execute_wrapper that records every statement with its duration."""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                "alias": self.alias,
+                "sql": sql,
+                "params": repr(params)[:500],
+                "many": many,
+                "ms": round((time.perf_counter() - started) * 1000, 3),
+            })
+
+
+def profile_call(func, *args):
+    """Run func(*args) under cProfile and query logging; returns (result, profiler, queries, wall_ms)."""
+    logs = [QueryLog(alias) for alias in connections]
+    profiler = cProfile.Profile()
+    with ExitStack() as stack:
+        for log in logs:
+            stack.enter_context(connections[log.alias].execute_wrapper(log))
+        started = time.perf_counter()
+        result = profiler.runcall(func, *args)
+        wall_ms = (time.perf_counter() - started) * 1000
+    queries = sorted((query for log in logs for query in log.queries), key=lambda query: -query["ms"])
+    return result, profiler, queries, wall_ms
+
+
+def _label(func):
+    filename, line, name = func
+    return f"{name} ({filename}:{line})" if line else name
+
+
+def _call_tree(stats, total):
+    callees = defaultdict(dict)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = edge
+    # The middleware chain recurses through the same wrapper, so nothing in it is caller-free;
+    # the profiled call is the entry with the largest cumulative time
+    root = max(stats, key=lambda func: stats[func][3])
+
+    def node(func, edge, path):
+        calls, cumulative = edge[1], edge[3]
+        children = []
+        if len(path) < TREE_DEPTH:
+            for child, child_edge in sorted(callees[func].items(), key=lambda item: -item[1][3]):
+                if child in path or child_edge[3] < total * TREE_MIN_SHARE:
+                    continue
+                children.append(node(child, child_edge, path | {child}))
+        return {"function": _label(func), "calls": calls, "cumulative_ms": round(cumulative * 1000, 3), "children": children}
+
+    return node(root, stats[root], frozenset({root}))
+
+
+def build_report(request, response, profiler, queries, wall_ms):
+    stats = pstats.Stats(profiler)
+    total = stats.total_tt or 1e-9
+    rows = [
+        {
+            "function": _label(func),
+            "calls": calls,
+            "self_ms": round(tottime * 1000, 3),
+            "cumulative_ms": round(cumtime * 1000, 3),
+        }
+        for func, (_, calls, tottime, cumtime, _) in stats.stats.items()
+    ]
+    repeated = Counter(query["sql"] for query in queries)
+    return {
+        "request": {"method": request.method, "path": request.get_full_path()},
+        "status": response.status_code,
+        "wall_ms": round(wall_ms, 3),
+        "profiled_ms": round(total * 1000, 3),
+        "top_cumulative": sorted(rows, key=lambda row: -row["cumulative_ms"])[:TOP_FUNCTIONS],
+        "top_self": sorted(rows, key=lambda row: -row["self_ms"])[:TOP_FUNCTIONS],
+        "call_tree": _call_tree(stats.stats, total),
+        "sql": {
+            "count": len(queries),
+            "total_ms": round(sum(query["ms"] for query in queries), 3),
+            # Same statement run several times usually means an N+1
+            "repeated": [{"sql": sql, "count": count} for sql, count in repeated.most_common() if count > 1],
+            "queries": queries,
+        },
+    }
+
+
+def pstats_dump(profiler):
+    """Binary pstats data, loadable with pstats.Stats / snakeviz."""
+    profiler.create_stats()
+    return marshal.dumps(profiler.stats)
+
+
+def store_report(report, profiler):
+    report_id = uuid.uuid4().hex
+    cache.set(f"profile-report:{report_id}", {"report": report, "pstats": pstats_dump(profiler)}, PROFILE_REPORT_TTL)
+    return report_id
+
+
+def load_report(report_id):
+    return cache.get(f"profile-report:{report_id}")
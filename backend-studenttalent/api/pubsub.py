@@ -0,0 +1,145 @@
+"""
+Publish/subscribe for live updates pushed over Server-Sent Events.
+
+Publishers call get_broker().publish(channel, message) from sync code (usually in
+transaction.on_commit). Subscribers are async consumers inside the ASGI worker. The
+backend is chosen with PUBSUB_BACKEND:
+
+- InProcessBroker delivers only inside the current process (development, single worker).
+- RedisBroker fans messages out to every worker through Redis; each process keeps one
+  listener thread and delivers locally from there.
+
+A subscription keeps only the newest message per key, so a slow or idle client holds a
+bounded amount of memory however many updates arrive.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, key):
+        self.key = key
+        self._loop = asyncio.get_running_loop()
+        self._pending = {}
+        self._ready = asyncio.Event()
+
+    def _deliver(self, message):
+        # Runs on the subscriber's event loop
+        self._pending[message.get(self.key)] = message
+        self._ready.set()
+
+    def deliver_threadsafe(self, message):
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, message)
+        except RuntimeError:
+            # Event loop already closed; the stream is going away
+            pass
+
+    async def get(self, timeout):
+        """Wait up to ``timeout`` seconds and return the pending messages (possibly none)."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        messages = list(self._pending.values())
+        self._pending.clear()
+        return messages
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._channels = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel, key="id"):
+        subscription = Subscription(key)
+        with self._lock:
+            self._channels[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, channel, subscription):
+        with self._lock:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[channel]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._channels.values())
+
+    def publish(self, channel, message):
+        self.deliver(channel, message)
+
+    def deliver(self, channel, message):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver_threadsafe(message)
+
+
+class RedisBroker(InProcessBroker):
+    CHANNEL_PREFIX = "live:"
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self):
+        import redis
+
+        super().__init__()
+        self._redis = redis.Redis.from_url(settings.PUBSUB_REDIS_URL)
+        self._listener = None
+
+    def subscribe(self, channel, key="id"):
+        self._start_listener()
+        return super().subscribe(channel, key)
+
+    def publish(self, channel, message):
+        try:
+            self._redis.publish(self.CHANNEL_PREFIX + channel, json.dumps(message))
+        except Exception:
+            # Live updates are best effort; the write itself already succeeded
+            logger.warning("Could not publish to %s", channel, exc_info=True)
+
+    def _start_listener(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="pubsub-listener", daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(self.CHANNEL_PREFIX + "*")
+                for item in pubsub.listen():
+                    channel = item["channel"].decode()[len(self.CHANNEL_PREFIX):]
+                    self.deliver(channel, json.loads(item["data"]))
+            except Exception:
+                logger.warning("Pub/sub listener lost its Redis connection; reconnecting", exc_info=True)
+                time.sleep(self.RECONNECT_DELAY)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.PUBSUB_BACKEND)()
+    return _broker
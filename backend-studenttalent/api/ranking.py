@@ -0,0 +1,142 @@
+"""
+Stored ranking columns on Profile so sorted listings are plain index scans.
+
+refresh_profile_ranking() recomputes one profile's sort keys from a few indexed
+lookups; it runs from api/signals.py whenever the profile or its related rows change.
+
+Experience is counted in whole calendar months, and a current (or end-less) job keeps
+counting up to today, so those profiles' experience_months and ranking_score grow on the
+first of every month without any write to the profile. Run
+`rebuild_talent_rankings --open-ended` daily (cron) to bring them up to date; it only
+recomputes profiles that have such a job.
+"""
+from __future__ import annotations
+
+import math
+
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import Experience, PortfolioLink, Profile, ProfileSkill, Project
+
+# ?ordering= values accepted by the profile list; pk breaks ties so pages are stable
+PROFILE_ORDERINGS = {
+    'featured': ('-ranking_score', '-id'),
+    'endorsements': ('-endorsements_total', '-id'),
+    'experience': ('-experience_months', '-id'),
+    'recent': ('-updated_at', '-id'),
+}
+
+# Experiences that keep counting up to today
+OPEN_ENDED_EXPERIENCE = Q(start_date__isnull=False) & (Q(is_current=True) | Q(end_date__isnull=True))
+
+COMPLETENESS_FIELDS = ('nim', 'prodi', 'entry_year', 'about', 'linkedin', 'github', 'website', 'user__photo_profile')
+
+
+def experience_months(ranges, today):
+    """
+    Total months covered by (start, end, is_current) ranges, counting overlaps once.
+    Open-ended ranges run to ``today``; with today=None they are left out.
+    """
+    spans = []
+    for start, end, is_current in ranges:
+        if start is None:
+            continue
+        if is_current or end is None:
+            if today is None:
+                continue
+            finish = today
+        else:
+            finish = end
+        if finish > start:
+            spans.append((start, finish))
+
+    months = 0
+    current_start = current_end = None
+    for start, finish in sorted(spans):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                months += _months_between(current_start, current_end)
+            current_start, current_end = start, finish
+        else:
+            current_end = max(current_end, finish)
+    if current_end is not None:
+        months += _months_between(current_start, current_end)
+    return months
+
+
+def _months_between(start, end):
+    return (end.year - start.year) * 12 + (end.month - start.month)
+
+
+def ranking_score(endorsements, skills, months, completeness):
+    """Blend of social proof, breadth, experience and profile quality; diminishing returns on counts."""
+    return round(
+        3.0 * math.log1p(endorsements)
+        + 1.5 * math.log1p(skills)
+        + 2.0 * math.log1p(months / 6)
+        + 4.0 * completeness / 100,
+        4,
+    )
+
+
+def profile_completeness(values, has_skills, has_experiences, has_projects, has_links):
+    filled = sum(1 for field in COMPLETENESS_FIELDS if values.get(field))
+    filled += sum(1 for flag in (has_skills, has_experiences, has_projects, has_links) if flag)
+    return round(100 * filled / (len(COMPLETENESS_FIELDS) + 4))
+
+
+def refresh_profile_ranking(profile_id, today=None):
+    values = (
+        Profile.objects.filter(pk=profile_id)
+        .annotate(
+            has_projects=Exists(Project.objects.filter(profile=OuterRef('pk'))),
+            has_links=Exists(PortfolioLink.objects.filter(profile=OuterRef('pk'))),
+        )
+        .values(*COMPLETENESS_FIELDS, 'has_projects', 'has_links')
+        .first()
+    )
+    if values is None:
+        return
+
+    skills = ProfileSkill.objects.filter(profile_id=profile_id).aggregate(
+        skills=Count('id', distinct=True),
+        endorsements=Count('endorsements'),
+    )
+    ranges = list(Experience.objects.filter(profile_id=profile_id).values_list('start_date', 'end_date', 'is_current'))
+    months = experience_months(ranges, today or timezone.localdate())
+    completeness = profile_completeness(
+        values, skills['skills'], bool(ranges), values['has_projects'], values['has_links']
+    )
+    Profile.objects.filter(pk=profile_id).update(
+        endorsements_total=skills['endorsements'],
+        skills_count=skills['skills'],
+        experience_months=months,
+        completeness=completeness,
+        ranking_score=ranking_score(skills['endorsements'], skills['skills'], months, completeness),
+    )
+
+
+def rebuild_rankings():
+    """Recompute every profile; used by the rebuild_talent_rankings command."""
+    count = 0
+    for profile_id in Profile.objects.order_by('pk').values_list('pk', flat=True).iterator():
+        refresh_profile_ranking(profile_id)
+        count += 1
+    return count
+
+
+def refresh_open_ended_rankings():
+    """Recompute the profiles with a current or end-less job; the daily rebuild_talent_rankings --open-ended."""
+    today = timezone.localdate()
+    profile_ids = (
+        Profile.objects.filter(Exists(Experience.objects.filter(OPEN_ENDED_EXPERIENCE, profile=OuterRef('pk'))))
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
+    count = 0
+    for profile_id in profile_ids.iterator():
+        refresh_profile_ranking(profile_id, today)
+        count += 1
+    return count
+
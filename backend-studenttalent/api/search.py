@@ -0,0 +1,201 @@
+"""
+Typeahead for student names and NIMs.
+
+On Postgres with pg_trgm, names are matched through a GIN index on Profile.search_name
+and NIMs through a prefix index on UPPER(nim) (both created in migration 0011).
+Otherwise the lookup uses TrigramIndex, an in-memory trigram index per process that is rebuilt when
+the set of public profiles changes. A name scores its pg_trgm word_similarity to the
+query; a NIM prefix match scores 1.0. NIMs are admin-only, so they are matched only when
+the caller says the viewer is an admin.
+
+Changes that can move a profile in or out of the index, or change its name or NIM, call
+bump_search_index() (refresh_search_name() and api/signals.py); TrigramIndex compares one
+cache key against the version it was built from instead of scanning the profiles.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Case, FloatField, Q, Value, When
+
+from .models import Profile, User
+
+TYPEAHEAD_LIMIT = 8
+MAX_TYPEAHEAD_LIMIT = 20
+MIN_QUERY_LENGTH = 2
+MIN_SIMILARITY = 0.3
+SEARCH_INDEX_VERSION_KEY = "search:index-version"
+# Rebuild at least this often (seconds) even if a version bump was lost with the cache
+INDEX_TTL = 300
+
+
+def normalize(text):
+    """Lowercase, strip accents and collapse whitespace, the form search_name is stored in."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(text.lower().split())
+
+
+def search_name(first_name, last_name):
+    return normalize(f"{first_name} {last_name}")
+
+
+def bump_search_index():
+    """Make every process's TrigramIndex rebuild, once the current transaction commits."""
+    transaction.on_commit(lambda: cache.set(SEARCH_INDEX_VERSION_KEY, time.time_ns(), None))
+
+
+def refresh_search_name(profile_id):
+    names = User.objects.filter(profile__pk=profile_id).values_list("first_name", "last_name").first()
+    if names is not None:
+        Profile.objects.filter(pk=profile_id).update(search_name=search_name(*names))
+        bump_search_index()
+
+
+def ordered_trigrams(text):
+    """pg_trgm's trigrams in text order: each word padded with two spaces in front and one behind."""
+    grams = []
+    for word in text.split():
+        padded = f"  {word} "
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def trigrams(text):
+    return set(ordered_trigrams(text))
+
+
+def word_similarity(query, text):
+    """
+    pg_trgm word_similarity(query, text): the best similarity between the query's trigrams and
+    any contiguous extent of the text's trigrams, so a prefix scores against the start of a word.
+    """
+    query_grams = trigrams(query)
+    if not query_grams:
+        return 0.0
+    grams = ordered_trigrams(text)
+    best = 0.0
+    # Like pg_trgm, only extents that start and end on a trigram of the query can be best
+    for start, gram in enumerate(grams):
+        if gram not in query_grams:
+            continue
+        extent = set()
+        for end in range(start, len(grams)):
+            extent.add(grams[end])
+            if grams[end] in query_grams:
+                shared = len(extent & query_grams)
+                best = max(best, shared / (len(query_grams) + len(extent) - shared))
+    return best
+
+
+def visible_profiles():
+    return Profile.objects.filter(is_active=True).exclude(user__role="admin")
+
+
+def typeahead(query, limit=TYPEAHEAD_LIMIT, match_nim=False):
+    """Top matches as (profile_id, score, matched_field), best first; NIM prefixes only with match_nim."""
+    query = normalize(query)
+    if len(query) < MIN_QUERY_LENGTH:
+        return []
+    limit = max(1, min(limit, MAX_TYPEAHEAD_LIMIT))
+    if _has_pg_trgm():
+        return _postgres_typeahead(query, limit, match_nim)
+    return _memory_index.search(query, limit, match_nim)
+
+
+_pg_trgm_installed = None
+
+
+def _has_pg_trgm():
+    global _pg_trgm_installed
+    if connection.vendor != "postgresql":
+        return False
+    if _pg_trgm_installed is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _pg_trgm_installed = cursor.fetchone() is not None
+    return _pg_trgm_installed
+
+
+def _postgres_typeahead(query, limit, match_nim):
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    condition = Q(search_name__trigram_word_similar=query)
+    nim_score = Value(0.0)
+    if match_nim:
+        condition |= Q(nim__istartswith=query)
+        nim_score = Case(When(nim__istartswith=query, then=Value(1.0)), default=Value(0.0), output_field=FloatField())
+    with transaction.atomic(), connection.cursor() as cursor:
+        # %> only uses the GIN index against a threshold, so set ours for this transaction
+        cursor.execute("SET LOCAL pg_trgm.word_similarity_threshold = %s", [MIN_SIMILARITY])
+        rows = list(
+            visible_profiles()
+            .filter(condition)
+            .annotate(name_score=TrigramWordSimilarity(Value(query), "search_name"), nim_score=nim_score)
+            .order_by("-nim_score", "-name_score", "pk")
+            .values_list("pk", "name_score", "nim_score")[:limit]
+        )
+    return [_match(pk, name, nim) for pk, name, nim in rows]
+
+
+def _match(pk, name_score, nim_score):
+    name_score, nim_score = float(name_score or 0), float(nim_score or 0)
+    if nim_score > name_score:
+        return pk, round(nim_score, 4), "nim"
+    return pk, round(name_score, 4), "name"
+
+
+class TrigramIndex:
+    """Per-process trigram postings over the public profiles, for databases without pg_trgm."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._built_at = 0.0
+        self._names = {}
+        self._nims = {}
+        self._postings = defaultdict(set)
+
+    def _rebuild(self, version):
+        names, nims, postings = {}, {}, defaultdict(set)
+        for pk, name, nim in visible_profiles().values_list("pk", "search_name", "nim").iterator():
+            names[pk] = name
+            nims[pk] = normalize(nim)
+            for gram in trigrams(name):
+                postings[gram].add(pk)
+        self._names, self._nims, self._postings, self._version = names, nims, postings, version
+        self._built_at = time.monotonic()
+
+    def search(self, query, limit, match_nim=False):
+        version = cache.get(SEARCH_INDEX_VERSION_KEY)
+        with self._lock:
+            if version != self._version or time.monotonic() - self._built_at > INDEX_TTL:
+                self._rebuild(version)
+            names, nims, postings = self._names, self._nims, self._postings
+
+        # A name can only reach MIN_SIMILARITY if it shares that fraction of the query's trigrams
+        query_grams = trigrams(query)
+        hits = Counter()
+        for gram in query_grams:
+            hits.update(postings.get(gram, ()))
+        needed = MIN_SIMILARITY * len(query_grams)
+        candidates = {pk for pk, count in hits.items() if count >= needed}
+        if match_nim:
+            candidates.update(pk for pk, nim in nims.items() if nim.startswith(query))
+
+        matches = []
+        for pk in candidates:
+            nim_score = 1.0 if match_nim and nims.get(pk, "").startswith(query) else 0.0
+            pk, score, field = _match(pk, word_similarity(query, names.get(pk, "")), nim_score)
+            if score >= MIN_SIMILARITY:
+                matches.append((pk, score, field))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:limit]
+
+
+_memory_index = TrigramIndex()
@@ -1,6 +1,12 @@
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from .models import User, Profile, Skill, ProfileSkill, Experience, Project, PortfolioLink, SkillEndorsement
+from .models import User, Profile, Skill, ProfileSkill, Experience, Project, PortfolioLink, SkillEndorsement, SavedSearch, ArchivedProfile
+from .search import normalize
+from .taxonomy import resolve_or_create_skills, resolve_skill
+from .cooccurrence import record_bulk_added
+from .trending import record_additions
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     def validate(self, attrs):
@@ -42,6 +48,9 @@ class ProfileSkillSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return False
+        prefetched = getattr(obj, '_prefetched_objects_cache', {}).get('endorsements')
+        if prefetched is not None:
+            return any(endorsement.endorser_id == request.user.id for endorsement in prefetched)
         return obj.endorsements.filter(endorser=request.user).exists()
 
 class ExperienceSerializer(serializers.ModelSerializer):
@@ -88,6 +97,8 @@ class ProfileSerializer(serializers.ModelSerializer):
     experiences = ExperienceSerializer(many=True, read_only=True)
     projects = ProjectSerializer(many=True, read_only=True)
     portfolio = serializers.SerializerMethodField()
+    # Flushed views so far (see api/profile_views.py)
+    views = serializers.ReadOnlyField(source='views_total')
 
     class Meta:
         model = Profile
@@ -95,7 +106,7 @@ class ProfileSerializer(serializers.ModelSerializer):
             'id', 'user_id', 'name', 'email', 'role',
             'major', 'year', 'bio', 'avatar', 'photo_profile', 'is_active',
             'linkedin', 'github', 'website',
-            'skills', 'experiences', 'projects', 'portfolio'
+            'skills', 'experiences', 'projects', 'portfolio', 'views'
         ]
 
     def get_avatar(self, obj):
@@ -104,6 +115,215 @@ class ProfileSerializer(serializers.ModelSerializer):
     def get_portfolio(self, obj):
         return [link.url for link in obj.portfolio_links.all()]
 
+class SkillUpsertSerializer(serializers.Serializer):
+    skill_id = serializers.IntegerField(required=False)
+    name = serializers.CharField(max_length=50, required=False)
+    level = serializers.ChoiceField(choices=ProfileSkill.LEVEL_CHOICES, required=False)
+
+    def validate(self, attrs):
+        if not attrs.get('skill_id') and not attrs.get('name'):
+            raise serializers.ValidationError("Provide either skill_id or name.")
+        return attrs
+
+class SkillsDiffSerializer(serializers.Serializer):
+    upsert = SkillUpsertSerializer(many=True, required=False)
+    remove = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+class ExperienceUpdateSerializer(ExperienceSerializer):
+    id = serializers.IntegerField()
+
+    class Meta(ExperienceSerializer.Meta):
+        extra_kwargs = {'title': {'required': False}, 'company': {'required': False}}
+
+class ExperiencesDiffSerializer(serializers.Serializer):
+    create = ExperienceSerializer(many=True, required=False)
+    update = ExperienceUpdateSerializer(many=True, required=False)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+class ProjectWriteSerializer(serializers.ModelSerializer):
+    # Images still go through multipart uploads; diffs only carry text fields
+    class Meta:
+        model = Project
+        fields = ['title', 'link', 'description']
+
+class ProjectUpdateSerializer(ProjectWriteSerializer):
+    id = serializers.IntegerField()
+
+    class Meta(ProjectWriteSerializer.Meta):
+        fields = ['id'] + ProjectWriteSerializer.Meta.fields
+        extra_kwargs = {'title': {'required': False}}
+
+class ProjectsDiffSerializer(serializers.Serializer):
+    create = ProjectWriteSerializer(many=True, required=False)
+    update = ProjectUpdateSerializer(many=True, required=False)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+class PortfolioDiffSerializer(serializers.Serializer):
+    add = serializers.ListField(child=serializers.URLField(), required=False)
+    remove = serializers.ListField(child=serializers.URLField(), required=False)
+
+class ProfileEditSerializer(serializers.Serializer):
+    """
+    Single-request profile editor used by PATCH /profiles/me/.
+    Accepts user fields, profile fields and per-relation diffs, and applies
+    everything in one transaction with bulk queries.
+    """
+    # User fields
+    name = serializers.CharField(source='first_name', max_length=150, required=False, allow_blank=True)
+    email = serializers.EmailField(required=False)
+
+    # Profile fields (same public names as ProfileSerializer)
+    major = serializers.CharField(source='prodi', max_length=100, required=False, allow_blank=True)
+    year = serializers.IntegerField(source='entry_year', required=False, allow_null=True)
+    bio = serializers.CharField(source='about', required=False, allow_blank=True)
+    linkedin = serializers.URLField(required=False, allow_blank=True)
+    github = serializers.URLField(required=False, allow_blank=True)
+    website = serializers.URLField(required=False, allow_blank=True)
+
+    # Relation diffs
+    skills = SkillsDiffSerializer(required=False)
+    experiences = ExperiencesDiffSerializer(required=False)
+    projects = ProjectsDiffSerializer(required=False)
+    portfolio = PortfolioDiffSerializer(required=False)
+
+    USER_FIELDS = ('first_name', 'email')
+    PROFILE_FIELDS = ('prodi', 'entry_year', 'about', 'linkedin', 'github', 'website')
+
+    def validate_email(self, value):
+        user = self.instance.user
+        if User.objects.exclude(pk=user.pk).filter(email__iexact=value).exists():
+            raise serializers.ValidationError("This email is already in use.")
+        return value
+
+    def validate(self, attrs):
+        # Ids are checked here rather than while applying the diffs, so a bad id is rejected
+        # before the view uploads the photo
+        upserts = (attrs.get('skills') or {}).get('upsert') or []
+        ids = {item['skill_id'] for item in upserts if item.get('skill_id')}
+        missing_ids = ids - set(Skill.objects.filter(pk__in=ids).values_list('pk', flat=True))
+        if missing_ids:
+            raise serializers.ValidationError({'skills': f"Unknown skill ids: {sorted(missing_ids)}"})
+
+        for model, key in ((Experience, 'experiences'), (Project, 'projects')):
+            diff = attrs.get(key) or {}
+            ids = {item['id'] for item in diff.get('update') or []}
+            if not ids:
+                continue
+            # Rows deleted by the same diff cannot be updated either
+            owned = set(
+                model.objects.filter(profile=self.instance, pk__in=ids)
+                .exclude(pk__in=diff.get('delete') or [])
+                .values_list('pk', flat=True)
+            )
+            unknown = ids - owned
+            if unknown:
+                raise serializers.ValidationError({key: f"Unknown id: {min(unknown)}"})
+        return attrs
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            user = instance.user
+            user_fields = [f for f in self.USER_FIELDS if f in validated_data]
+            for field in user_fields:
+                setattr(user, field, validated_data[field])
+            if user_fields:
+                user.save(update_fields=user_fields)
+
+            profile_fields = [f for f in self.PROFILE_FIELDS if f in validated_data]
+            for field in profile_fields:
+                setattr(instance, field, validated_data[field])
+            if profile_fields:
+                instance.save(update_fields=profile_fields)
+
+            if 'skills' in validated_data:
+                self._apply_skills(instance, validated_data['skills'])
+            if 'experiences' in validated_data:
+                self._apply_rows(Experience, instance, validated_data['experiences'], 'experiences')
+            if 'projects' in validated_data:
+                self._apply_rows(Project, instance, validated_data['projects'], 'projects')
+            if 'portfolio' in validated_data:
+                self._apply_portfolio(instance, validated_data['portfolio'])
+        return instance
+
+    def _apply_skills(self, profile, diff):
+        remove = diff.get('remove') or []
+        if remove:
+            ProfileSkill.objects.filter(profile=profile, skill_id__in=remove).delete()
+
+        upserts = diff.get('upsert') or []
+        if not upserts:
+            return
+
+        # Resolve every referenced skill in a couple of queries
+        ids = {item['skill_id'] for item in upserts if item.get('skill_id')}
+        names = {item['name'] for item in upserts if not item.get('skill_id')}
+        skills_by_id = Skill.objects.in_bulk(ids)
+        missing_ids = ids - set(skills_by_id)
+        if missing_ids:
+            raise serializers.ValidationError({'skills': f"Unknown skill ids: {sorted(missing_ids)}"})
+        # Names resolve through the taxonomy so aliases and other spellings reuse the canonical skill
+        skills_by_name = resolve_or_create_skills(names) if names else {}
+
+        existing = {ps.skill_id: ps for ps in ProfileSkill.objects.filter(profile=profile)}
+        to_create, to_update = {}, {}
+        for item in upserts:
+            skill = skills_by_id[item['skill_id']] if item.get('skill_id') else skills_by_name[item['name']]
+            level = item.get('level')
+            current = existing.get(skill.id)
+            if current is None:
+                pending = to_create.setdefault(skill.id, ProfileSkill(profile=profile, skill=skill))
+                if level:
+                    pending.level = level
+            elif level and current.level != level:
+                current.level = level
+                to_update[skill.id] = current
+
+        if to_update:
+            ProfileSkill.objects.bulk_update(list(to_update.values()), ['level'])
+        if to_create:
+            ProfileSkill.objects.bulk_create(list(to_create.values()))
+            record_additions(to_create.values())
+            record_bulk_added(to_create.values())
+
+    def _apply_rows(self, model, profile, diff, key):
+        delete = diff.get('delete') or []
+        if delete:
+            model.objects.filter(profile=profile, id__in=delete).delete()
+
+        updates = diff.get('update') or []
+        if updates:
+            rows = model.objects.in_bulk([item['id'] for item in updates])
+            rows = {pk: row for pk, row in rows.items() if row.profile_id == profile.id}
+            fields = set()
+            for item in updates:
+                row = rows.get(item['id'])
+                if row is None:
+                    raise serializers.ValidationError({key: f"Unknown id: {item['id']}"})
+                for field, value in item.items():
+                    if field != 'id':
+                        setattr(row, field, value)
+                        fields.add(field)
+            if fields:
+                model.objects.bulk_update(list(rows.values()), sorted(fields))
+
+        creates = diff.get('create') or []
+        if creates:
+            model.objects.bulk_create([model(profile=profile, **item) for item in creates])
+
+    def _apply_portfolio(self, profile, diff):
+        remove = diff.get('remove') or []
+        if remove:
+            PortfolioLink.objects.filter(profile=profile, url__in=remove).delete()
+
+        add = list(dict.fromkeys(diff.get('add') or []))
+        if add:
+            existing = set(
+                PortfolioLink.objects.filter(profile=profile, url__in=add).values_list('url', flat=True)
+            )
+            PortfolioLink.objects.bulk_create(
+                [PortfolioLink(profile=profile, url=url) for url in add if url not in existing]
+            )
+
 class UserSerializer(serializers.ModelSerializer):
     # This serializer is used for Auth response which might need to include profile data inline
     # structure: { token: ..., user: { ...profile_data... } }
@@ -144,3 +364,63 @@ class UserSerializer(serializers.ModelSerializer):
             # Remove redundant fields if any
             if 'user_id' in ret: del ret['user_id']
         return ret
+
+
+class BatchSubrequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=['GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'], default='GET')
+    path = serializers.CharField(max_length=2000)
+    body = serializers.JSONField(required=False)
+    headers = serializers.DictField(child=serializers.CharField(), required=False)
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict) and isinstance(data.get('method'), str):
+            data = {**data, 'method': data['method'].upper()}
+        return super().to_internal_value(data)
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    skill_name = serializers.CharField(write_only=True, required=False)
+    skill_label = serializers.ReadOnlyField(source='skill.name', default=None)
+
+    class Meta:
+        model = SavedSearch
+        fields = ['id', 'name', 'skill', 'skill_name', 'skill_label', 'min_level', 'prodi', 'entry_year', 'created_at']
+
+    def validate(self, attrs):
+        skill_name = attrs.pop('skill_name', None)
+        if skill_name:
+            skill = resolve_skill(skill_name)
+            if skill is None:
+                raise serializers.ValidationError({'skill_name': f"Unknown skill: {skill_name}"})
+            attrs['skill'] = skill
+
+        def current(field, default):
+            return attrs[field] if field in attrs else getattr(self.instance, field, default)
+
+        if current('min_level', '') and current('skill', None) is None:
+            raise serializers.ValidationError({'min_level': "A minimum level needs a skill."})
+        if current('skill', None) is None and not current('prodi', '').strip() and current('entry_year', None) is None:
+            raise serializers.ValidationError({'detail': "Set at least one of skill, prodi or entry_year."})
+        if 'prodi' in attrs:
+            attrs['prodi'] = attrs['prodi'].strip()
+            attrs['prodi_key'] = normalize(attrs['prodi'])
+        return attrs
+
+
+class ArchivedProfileSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedProfile
+        fields = ['profile_id', 'user_id', 'name', 'prodi', 'entry_year', 'reason', 'archived_at']
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchSubrequestSerializer(many=True)
+    atomic = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        limit = settings.BATCH_MAX_REQUESTS
+        if not value:
+            raise serializers.ValidationError("Provide at least one subrequest.")
+        if len(value) > limit:
+            raise serializers.ValidationError(f"At most {limit} subrequests per batch.")
+        return value
@@ -0,0 +1,207 @@
+"""
+Keeps Profile.content_version / updated_at, the ranking columns, the change feed and the
+materialized profile documents (api/documents.py) in step with everything ProfileSerializer renders.
+
+Endorsements and added skills are also counted into the trending rollups (api/trending.py),
+profile skills into the skill co-occurrence counts (api/cooccurrence.py), and profile /
+skill changes re-match the profile against saved searches (api/percolator.py).
+
+Code paths that bypass model signals (bulk_create, bulk_update, queryset.update) must call
+touch_profile() themselves, record_additions() and record_bulk_added() for new profile
+skills and percolate_profile() when skills, prodi or entry year change.
+"""
+from __future__ import annotations
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import cooccurrence
+from .change_feed import record_profile_change
+from .documents import schedule_rebuild
+from .percolator import percolate_profile
+from .models import Experience, PortfolioLink, Profile, ProfileSkill, Project, Skill, SkillAlias, SkillEndorsement, User
+from .pubsub import get_broker
+from .ranking import refresh_profile_ranking
+from .search import bump_search_index, refresh_search_name
+from .taxonomy import bump_taxonomy_version, skill_key
+from .trending import record_activity
+
+# User fields that show up in the profile payload
+RENDERED_USER_FIELDS = {"first_name", "last_name", "email", "role", "photo_profile"}
+
+
+def touch_profile(profile_id=None, user_id=None, profile_skill_id=None):
+    """Bump the content version and sort keys of one profile, identified by any of its keys."""
+    if profile_id is None:
+        if user_id is not None:
+            lookup = {"user_id": user_id}
+        elif profile_skill_id is not None:
+            lookup = {"profile_skills__id": profile_skill_id}
+        else:
+            return
+        profile_id = Profile.objects.filter(**lookup).values_list("pk", flat=True).first()
+        if profile_id is None:
+            return
+
+    Profile.objects.filter(pk=profile_id).update(
+        content_version=F("content_version") + 1,
+        updated_at=timezone.now(),
+    )
+    refresh_profile_ranking(profile_id)
+    record_profile_change(profile_id)
+    schedule_rebuild(profile_id)
+    bump_search_index()
+
+
+@receiver(post_save, sender=Profile)
+def profile_saved(sender, instance, created, update_fields=None, **kwargs):
+    percolate_profile(instance.pk)
+    if created:
+        refresh_search_name(instance.pk)
+        record_profile_change(instance.pk, kind="created", user_id=instance.user_id)
+        schedule_rebuild(instance.pk)
+        return
+    touch_profile(profile_id=instance.pk)
+
+
+@receiver(post_delete, sender=Profile)
+def profile_deleted(sender, instance, **kwargs):
+    record_profile_change(instance.pk, kind="deleted", user_id=instance.user_id)
+    bump_search_index()
+
+
+@receiver(post_save, sender=ProfileSkill)
+@receiver(post_delete, sender=ProfileSkill)
+@receiver(post_save, sender=Experience)
+@receiver(post_delete, sender=Experience)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=PortfolioLink)
+@receiver(post_delete, sender=PortfolioLink)
+def profile_child_changed(sender, instance, **kwargs):
+    touch_profile(profile_id=instance.profile_id)
+
+
+@receiver(post_save, sender=ProfileSkill)
+def profile_skill_added(sender, instance, created, **kwargs):
+    if created:
+        record_activity(instance.skill_id, instance.created_at, additions=1)
+        cooccurrence.record_added(instance.profile_id, [instance.skill_id])
+    percolate_profile(instance.profile_id)
+
+
+@receiver(pre_delete, sender=ProfileSkill)
+def profile_skill_removing(sender, instance, **kwargs):
+    cooccurrence.record_removing(instance.profile_id, instance.skill_id)
+
+
+@receiver(post_delete, sender=ProfileSkill)
+def profile_skill_removed(sender, instance, **kwargs):
+    record_activity(instance.skill_id, instance.created_at, additions=-1)
+    cooccurrence.record_removed(instance.profile_id, instance.skill_id)
+    # Losing a skill never adds matches, and the profile itself may be mid-deletion
+    percolate_profile(instance.profile_id, allow_new=False)
+
+
+def endorsement_channel(profile_id):
+    return f"endorsements:{profile_id}"
+
+
+def endorsement_counts(profile_id):
+    """(skill id, endorsement count) for every skill of the profile; the stream's snapshot."""
+    return (
+        ProfileSkill.objects.filter(profile_id=profile_id)
+        .annotate(endorsements_count=Count("endorsements"))
+        .values_list("skill_id", "endorsements_count")
+        .order_by("skill_id")
+    )
+
+
+def publish_endorsement_count(profile_skill_id):
+    """Push the skill's current endorsement count to live subscribers of its profile."""
+    row = (
+        ProfileSkill.objects.filter(pk=profile_skill_id)
+        .annotate(endorsements_count=Count("endorsements"))
+        .values("profile_id", "skill_id", "endorsements_count")
+        .first()
+    )
+    if row is None:
+        return
+    get_broker().publish(
+        endorsement_channel(row["profile_id"]),
+        {"id": row["skill_id"], "endorsements_count": row["endorsements_count"]},
+    )
+
+
+@receiver(post_save, sender=SkillEndorsement)
+@receiver(post_delete, sender=SkillEndorsement)
+def endorsement_changed(sender, instance, **kwargs):
+    touch_profile(profile_skill_id=instance.profile_skill_id)
+    transaction.on_commit(partial(publish_endorsement_count, instance.profile_skill_id))
+
+
+def _record_endorsement(endorsement, delta):
+    skill_id = ProfileSkill.objects.filter(pk=endorsement.profile_skill_id).values_list("skill_id", flat=True).first()
+    if skill_id is not None:
+        record_activity(skill_id, endorsement.created_at, endorsements=delta)
+
+
+@receiver(post_save, sender=SkillEndorsement)
+def endorsement_added(sender, instance, created, **kwargs):
+    if created:
+        _record_endorsement(instance, 1)
+
+
+@receiver(post_delete, sender=SkillEndorsement)
+def endorsement_removed(sender, instance, **kwargs):
+    _record_endorsement(instance, -1)
+
+
+@receiver(pre_save, sender=Skill)
+@receiver(pre_save, sender=SkillAlias)
+def skill_saving(sender, instance, **kwargs):
+    instance.key = skill_key(instance.name)
+
+
+@receiver(pre_save, sender=Skill)
+def skill_renaming(sender, instance, **kwargs):
+    instance._renamed = (
+        instance.pk is not None
+        and Skill.objects.filter(pk=instance.pk).exclude(name=instance.name).exists()
+    )
+
+
+@receiver(post_save, sender=Skill)
+def skill_renamed(sender, instance, created, **kwargs):
+    # Profiles render the skill name, so their versions and documents must move on
+    if getattr(instance, "_renamed", False):
+        for profile_id in ProfileSkill.objects.filter(skill=instance).values_list("profile_id", flat=True):
+            touch_profile(profile_id=profile_id)
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=SkillAlias)
+@receiver(post_delete, sender=SkillAlias)
+def taxonomy_changed(sender, **kwargs):
+    bump_taxonomy_version()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    if update_fields is not None and not RENDERED_USER_FIELDS.intersection(update_fields):
+        return
+    profile_id = Profile.objects.filter(user_id=instance.pk).values_list("pk", flat=True).first()
+    if profile_id is None:
+        return
+    refresh_search_name(profile_id)
+    touch_profile(profile_id=profile_id)
+    if update_fields is None or "role" in update_fields:
+        percolate_profile(profile_id)
@@ -0,0 +1,307 @@
+"""
+Canonical skill taxonomy.
+
+Every Skill is a canonical entry; SkillAlias maps other spellings to it. Names and
+aliases are compared by skill_key(), so "JavaScript", "javascript" and "Java Script"
+share one key, and "JS" reaches the same skill through an alias.
+
+Writes resolve names through SkillResolver, an in-process key -> skill id map, so new
+ProfileSkill rows point at the canonical skill instead of creating near-duplicates.
+The map is reloaded when the taxonomy version in the cache is bumped (on commit of any
+Skill or SkillAlias change, see api/signals.py) or after RESOLVER_TTL seconds, which bounds
+staleness across processes when the cache is per-process. merge_skills() folds
+existing duplicates into one canonical skill.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, Q, When
+from rest_framework.filters import BaseFilterBackend, SearchFilter
+
+from .cooccurrence import refresh_skill
+from .models import ProfileSkill, SavedSearch, Skill, SkillActivity, SkillAlias, SkillEndorsement
+from .search import normalize
+
+TAXONOMY_VERSION_KEY = "skill-taxonomy-version"
+RESOLVER_TTL = 60
+
+# Well-known spellings, applied whenever the canonical skill exists (SkillAlias rows take precedence)
+BUILTIN_ALIASES = {
+    "JavaScript": ["JS", "ECMAScript", "ES6"],
+    "TypeScript": ["TS"],
+    "Node.js": ["Node"],
+    "React": ["ReactJS"],
+    "Vue.js": ["Vue"],
+    "PostgreSQL": ["Postgres", "psql"],
+    "Tailwind CSS": ["Tailwind"],
+    "Python": ["py"],
+    "Kubernetes": ["k8s"],
+    "Machine Learning": ["ML"],
+    # No two-letter forms: on a CS platform "AI" and "PS" mean other things far more often
+    "Adobe Illustrator": ["Illustrator"],
+    "Adobe Photoshop": ["Photoshop"],
+}
+
+_KEY_SEPARATORS = re.compile(r"[\s._\-]+")
+
+
+def skill_key(name):
+    """Comparison key: lowercase, accents stripped, spaces, dots, dashes and underscores removed."""
+    return _KEY_SEPARATORS.sub("", normalize(name))
+
+
+# alias key -> canonical key
+_BUILTIN_KEYS = {
+    skill_key(alias): skill_key(canonical) for canonical, aliases in BUILTIN_ALIASES.items() for alias in aliases
+}
+
+
+def bump_taxonomy_version():
+    """Make every process reload its resolver, once the current transaction commits."""
+    # Bumping earlier would let other workers reload the old rows and keep them for RESOLVER_TTL
+    transaction.on_commit(lambda: cache.set(TAXONOMY_VERSION_KEY, time.time_ns(), None))
+
+
+class SkillResolver:
+    """Per-process map from skill_key() to the canonical skill id."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded_at = 0.0
+        self._keys = {}
+
+    def _load(self):
+        keys = {}
+        # Duplicates that have not been merged yet resolve to the oldest row
+        for pk, key in Skill.objects.order_by("-pk").values_list("pk", "key"):
+            keys[key] = pk
+        for key, skill_id in SkillAlias.objects.values_list("key", "skill_id"):
+            keys.setdefault(key, skill_id)
+        for alias_key, canonical_key in _BUILTIN_KEYS.items():
+            if canonical_key in keys:
+                keys.setdefault(alias_key, keys[canonical_key])
+        return keys
+
+    def keys(self):
+        version = cache.get(TAXONOMY_VERSION_KEY)
+        with self._lock:
+            if version != self._version or time.monotonic() - self._loaded_at > RESOLVER_TTL:
+                self._keys = self._load()
+                self._version = version
+                self._loaded_at = time.monotonic()
+            return self._keys
+
+    def resolve(self, name):
+        """Canonical skill id for a name or alias, or None."""
+        return self.keys().get(skill_key(name))
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+
+resolver = SkillResolver()
+
+
+def resolve_skill(name):
+    """Canonical Skill for a name or alias, or None (falls back to the DB if the map is stale)."""
+    skill_id = resolver.resolve(name)
+    if skill_id is None:
+        key = skill_key(name)
+        alias = SkillAlias.objects.filter(key=key).values_list("skill_id", flat=True).first()
+        skill_id = alias or (
+            Skill.objects.filter(key__in=[key, _BUILTIN_KEYS.get(key, key)])
+            .order_by(Case(When(key=key, then=0), default=1), "pk")
+            .values_list("pk", flat=True).first()
+        )
+        if skill_id is None:
+            return None
+        resolver.invalidate()
+    return Skill.objects.filter(pk=skill_id).first()
+
+
+def resolve_or_create_skill(name):
+    """Canonical Skill for the name, creating it (as typed) when nothing matches."""
+    name = " ".join(name.split())
+    skill = resolve_skill(name)
+    if skill is not None:
+        return skill
+    try:
+        with transaction.atomic():
+            return Skill.objects.create(name=name)
+    except IntegrityError:
+        return resolve_skill(name) or Skill.objects.get(name=name)
+
+
+def resolve_or_create_skills(names):
+    """{name: Skill} for several names, creating the unknown ones."""
+    keys = resolver.keys()
+    ids = {name: keys.get(skill_key(name)) for name in names}
+    skills = Skill.objects.in_bulk([pk for pk in ids.values() if pk is not None])
+    result = {}
+    for name, pk in ids.items():
+        skill = skills.get(pk)
+        result[name] = skill if skill is not None else resolve_or_create_skill(name)
+    return result
+
+
+def add_alias(alias, skill):
+    """Point an alias at a canonical skill; returns the SkillAlias."""
+    key = skill_key(alias)
+    if Skill.objects.filter(key=key).exclude(pk=skill.pk).exists():
+        raise ValueError(f'"{alias}" is the name of another skill; merge the skills instead.')
+    alias_row, _ = SkillAlias.objects.update_or_create(key=key, defaults={"skill": skill, "name": alias})
+    return alias_row
+
+
+def _merge_activity(target_id, source_ids):
+    totals = defaultdict(lambda: [0, 0])
+    for period, bucket_start, endorsements, additions in SkillActivity.objects.filter(
+        skill_id__in=source_ids
+    ).values_list("period", "bucket_start", "endorsements", "additions"):
+        totals[period, bucket_start][0] += endorsements
+        totals[period, bucket_start][1] += additions
+    existing = {
+        (row.period, row.bucket_start): row
+        for row in SkillActivity.objects.filter(skill_id=target_id, period__in={p for p, _ in totals})
+    }
+    creates, updates = [], []
+    for (period, bucket_start), (endorsements, additions) in totals.items():
+        row = existing.get((period, bucket_start))
+        if row is None:
+            creates.append(SkillActivity(
+                skill_id=target_id, period=period, bucket_start=bucket_start,
+                endorsements=endorsements, additions=additions,
+            ))
+        else:
+            row.endorsements += endorsements
+            row.additions += additions
+            updates.append(row)
+    SkillActivity.objects.filter(skill_id__in=source_ids).delete()
+    SkillActivity.objects.bulk_update(updates, ["endorsements", "additions"], batch_size=1000)
+    SkillActivity.objects.bulk_create(creates, batch_size=1000)
+
+
+def merge_skills(target, sources):
+    """
+    Fold the source skills into target and delete them; returns the affected profile ids.
+
+    ProfileSkill rows are re-pointed with one UPDATE. Where a profile already has the
+    target (or several of the sources), the rows are combined: endorsements move to the
+    kept row unless the endorser already endorsed it, and the higher level wins.
+    Source names become aliases of the target.
+    """
+    from .percolator import LEVELS, percolate_profile, refresh_search
+    from .signals import touch_profile
+
+    source_ids = [skill.pk for skill in sources if skill.pk != target.pk]
+    if not source_ids:
+        return set()
+
+    with transaction.atomic():
+        rows = list(ProfileSkill.objects.filter(skill_id__in=[target.pk, *source_ids]).order_by("pk"))
+        by_profile = defaultdict(list)
+        for row in rows:
+            by_profile[row.profile_id].append(row)
+
+        repoint, combined = [], []
+        for profile_rows in by_profile.values():
+            keep = next((row for row in profile_rows if row.skill_id == target.pk), profile_rows[0])
+            if keep.skill_id != target.pk:
+                repoint.append(keep.pk)
+            for row in profile_rows:
+                if row is keep:
+                    continue
+                SkillEndorsement.objects.filter(profile_skill=row).exclude(
+                    endorser__in=SkillEndorsement.objects.filter(profile_skill=keep).values("endorser")
+                ).update(profile_skill=keep)
+                if LEVELS.index(row.level) > LEVELS.index(keep.level):
+                    keep.level = row.level
+                    ProfileSkill.objects.filter(pk=keep.pk).update(level=keep.level)
+                combined.append(row.pk)
+
+        # Leftover duplicates go first (their signals still see the source skill), then the bulk re-point
+        ProfileSkill.objects.filter(pk__in=combined).delete()
+        ProfileSkill.objects.filter(pk__in=repoint).update(skill=target)
+        _merge_activity(target.pk, source_ids)
+        # The re-point sends no signals; the source skills' pairs go with them below
+        refresh_skill(target.pk)
+
+        SkillAlias.objects.filter(skill_id__in=source_ids).update(skill=target)
+        searches = list(SavedSearch.objects.filter(skill_id__in=source_ids))
+        SavedSearch.objects.filter(skill_id__in=source_ids).update(skill=target)
+
+        source_names = list(Skill.objects.filter(pk__in=source_ids).values_list("name", flat=True))
+        Skill.objects.filter(pk__in=source_ids).delete()
+        for name in source_names:
+            if skill_key(name) != target.key:
+                SkillAlias.objects.update_or_create(key=skill_key(name), defaults={"skill": target, "name": name})
+
+        # The bulk writes above skip the version, ranking and saved-search signals
+        affected = {
+            profile_id for profile_id, profile_rows in by_profile.items()
+            if any(row.skill_id != target.pk for row in profile_rows)
+        }
+        for profile_id in affected:
+            touch_profile(profile_id=profile_id)
+            percolate_profile(profile_id)
+        for search in searches:
+            search.skill = target
+            refresh_search(search)
+        bump_taxonomy_version()
+    return affected
+
+
+def rank_by_usage(skills):
+    """Skills ordered most used first (ties: oldest first), the usual pick for a merge target."""
+    skills = list(skills)
+    usage = dict(
+        ProfileSkill.objects.filter(skill_id__in=[skill.pk for skill in skills]).values("skill_id")
+        .annotate(count=Count("pk")).values_list("skill_id", "count")
+    )
+    return sorted(skills, key=lambda skill: (-usage.get(skill.pk, 0), skill.pk))
+
+
+def duplicate_groups():
+    """Lists of skills sharing a key, most used first: candidates for merge_skills()."""
+    groups = defaultdict(list)
+    for skill in Skill.objects.order_by("pk"):
+        groups[skill.key].append(skill)
+    return [rank_by_usage(group) for group in groups.values() if len(group) > 1]
+
+
+def _profiles_with_skill(skill_id):
+    return ProfileSkill.objects.filter(skill_id=skill_id).values("profile_id")
+
+
+class SkillFilter(BaseFilterBackend):
+    """?skill=<name or alias>[,<name>...]: profiles having every listed skill, resolved through the taxonomy."""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = [term for term in request.query_params.get("skill", "").split(",") if term.strip()]
+        keys = resolver.keys() if terms else {}
+        for term in terms:
+            skill_id = keys.get(skill_key(term))
+            if skill_id is None:
+                return queryset.none()
+            queryset = queryset.filter(pk__in=_profiles_with_skill(skill_id))
+        return queryset
+
+
+class TalentSearchFilter(SearchFilter):
+    """SearchFilter that also matches profiles having the skill the whole ?search= term names."""
+
+    def filter_queryset(self, request, queryset, view):
+        filtered = super().filter_queryset(request, queryset, view)
+        term = request.query_params.get(self.search_param, "").strip()
+        skill_id = resolver.resolve(term) if term else None
+        if skill_id is None:
+            return filtered
+        return queryset.filter(Q(pk__in=filtered.values("pk")) | Q(pk__in=_profiles_with_skill(skill_id)))
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from api.models import (
+    Experience,
+    PortfolioLink,
+    Profile,
+    ProfileSkill,
+    Project,
+    Skill,
+    SkillEndorsement,
+    User,
+)
+
+
+def seed_scale_data(scale):
+    """Synthetic profiles with skills, endorsements and related rows, for plans and query counts at scale."""
+    Skill.objects.bulk_create([Skill(name=f"Bench Skill {i}") for i in range(100)], ignore_conflicts=True)
+    skills = list(Skill.objects.filter(name__startswith="Bench Skill "))
+    User.objects.bulk_create(
+        [
+            User(email=f"bench{i}@bench.invalid", username=f"bench{i}@bench.invalid", password="!")
+            for i in range(scale)
+        ],
+        batch_size=1000,
+    )
+    users = list(User.objects.filter(email__endswith="@bench.invalid").order_by("pk"))
+    Profile.objects.bulk_create(
+        [
+            Profile(user=user, prodi="Informatika", entry_year=2020 + i % 5, is_active=i % 10 != 0)
+            for i, user in enumerate(users)
+        ],
+        batch_size=1000,
+    )
+    profiles = list(Profile.objects.filter(user__in=users).order_by("pk"))
+
+    ProfileSkill.objects.bulk_create(
+        [
+            ProfileSkill(profile=profile, skill=skills[(i + offset) % len(skills)])
+            for i, profile in enumerate(profiles)
+            for offset in range(4)
+        ],
+        batch_size=1000,
+    )
+    Experience.objects.bulk_create(
+        [Experience(profile=profile, title="Engineer", company="Bench") for profile in profiles],
+        batch_size=1000,
+    )
+    Project.objects.bulk_create(
+        [Project(profile=profile, title="Bench project") for profile in profiles],
+        batch_size=1000,
+    )
+    PortfolioLink.objects.bulk_create(
+        [PortfolioLink(profile=profile, url="https://example.com") for profile in profiles],
+        batch_size=1000,
+    )
+    profile_skills = list(ProfileSkill.objects.filter(profile__in=profiles).values_list("pk", flat=True))
+    SkillEndorsement.objects.bulk_create(
+        [
+            SkillEndorsement(profile_skill_id=ps_id, endorser=users[(i * 7 + j) % len(users)])
+            for i, ps_id in enumerate(profile_skills[::2])
+            for j in range(2)
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from datetime import date
+
+from django.contrib import admin
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.archive import archive_profile
+from api.models import Profile, User
+from api.profile_views import write_counts
+
+from .scale import seed_scale_data
+
+MAX_QUERIES = 10
+
+
+class AdminQueryCountTests(TestCase):
+    """Every changelist and autocomplete stays within a fixed query budget, however many rows it shows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # More profiles than a changelist page, so every list is full
+        seed_scale_data(60)
+        profile_ids = list(Profile.objects.order_by("pk").values_list("pk", flat=True))
+        write_counts({(profile_id, date(2026, 1, day)): 1 for profile_id in profile_ids[:30] for day in (1, 2)})
+        for profile_id in profile_ids[-3:]:
+            archive_profile(profile_id)
+        Group.objects.bulk_create([Group(name="Staff"), Group(name="Reviewers")])
+        cls.superuser = User.objects.create_superuser(email="admin@example.com", password="pw")
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def count_queries(self, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, data or {})
+        self.assertEqual(response.status_code, 200, url)
+        return len(queries)
+
+    def registered(self):
+        return sorted(admin.site._registry.items(), key=lambda item: item[0]._meta.label)
+
+    def test_changelists(self):
+        for model, model_admin in self.registered():
+            with self.subTest(model._meta.label):
+                self.assertGreaterEqual(model.objects.count(), 2, "per-row queries need at least two rows")
+                url = reverse(f"admin:{model._meta.app_label}_{model._meta.model_name}_changelist")
+                # The first render warms per-process caches (content types, permissions)
+                self.count_queries(url)
+                full_page = self.count_queries(url)
+                original = model_admin.list_per_page
+                model_admin.list_per_page = 1
+                try:
+                    one_row = self.count_queries(url)
+                finally:
+                    model_admin.list_per_page = original
+                self.assertLessEqual(full_page, MAX_QUERIES)
+                self.assertEqual(full_page, one_row, "queries grow with the rows shown")
+
+    def test_changelist_search(self):
+        for model, model_admin in self.registered():
+            if not model_admin.search_fields:
+                continue
+            with self.subTest(model._meta.label):
+                url = reverse(f"admin:{model._meta.app_label}_{model._meta.model_name}_changelist")
+                self.assertLessEqual(self.count_queries(url, {"q": "bench"}), MAX_QUERIES)
+
+    def test_autocomplete(self):
+        for source_model, source_admin in self.registered():
+            for field_name in source_admin.autocomplete_fields:
+                with self.subTest(f"{source_model._meta.label}.{field_name}"):
+                    queries = self.count_queries(reverse("admin:autocomplete"), {
+                        "app_label": source_model._meta.app_label,
+                        "model_name": source_model._meta.model_name,
+                        "field_name": field_name,
+                        "term": "",
+                    })
+                    self.assertLessEqual(queries, MAX_QUERIES)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.archive import archive_candidates, archive_profile
+from api.management.commands.gc_storage_objects import referenced_keys
+from api.models import ArchivedProfile, Profile, Project, User
+
+
+class ArchivedProfileTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="alumni@example.com", password="pw", first_name="Alumni")
+        profile, _ = Profile.objects.get_or_create(user=self.user)
+        Project.objects.create(profile=profile, title="Thesis", image="projects/thesis.png")
+        self.profile_id = profile.pk
+        archive_profile(profile.pk)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_get_me_does_not_restore(self):
+        response = self.client.get("/api/profiles/me/")
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(response.json()["archived"])
+        self.assertFalse(Profile.objects.filter(user=self.user).exists())
+        self.assertTrue(ArchivedProfile.objects.filter(user=self.user).exists())
+
+    def test_explicit_restore(self):
+        response = self.client.post("/api/profiles/me/restore/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], self.profile_id)
+        self.assertFalse(ArchivedProfile.objects.filter(user=self.user).exists())
+        self.assertEqual(self.client.get("/api/profiles/me/").status_code, 200)
+
+    def test_restored_profile_is_not_archived_again_as_graduated(self):
+        graduate = User.objects.create_user(email="graduate@example.com", password="pw")
+        never_archived, _ = Profile.objects.get_or_create(user=graduate, defaults={"entry_year": 2000})
+        self.assertEqual(self.client.post("/api/profiles/me/restore/").status_code, 200)
+        profile = Profile.objects.get(pk=self.profile_id)
+        self.assertIsNotNone(profile.restored_at)
+        Profile.objects.filter(pk__in=[profile.pk, never_archived.pk]).update(entry_year=2000)
+        self.assertEqual(archive_candidates(inactive_days=30, graduated_years=5), [(never_archived.pk, "graduated")])
+
+        # Once the student deactivates it and it goes stale, the inactive rule applies again
+        Profile.objects.filter(pk=profile.pk).update(is_active=False, updated_at=timezone.now() - timedelta(days=31))
+        self.assertEqual(
+            archive_candidates(inactive_days=30, graduated_years=5),
+            [(profile.pk, "inactive"), (never_archived.pk, "graduated")],
+        )
+
+    def test_archived_project_images_stay_referenced(self):
+        self.assertFalse(Project.objects.exists())
+        self.assertIn("projects/thesis.png", referenced_keys())
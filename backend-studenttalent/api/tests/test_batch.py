@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+from api.models import Experience, Profile, User
+from api.views import AdminStudentsView
+
+
+class BatchViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="batch@example.com", password="pw", first_name="Batch")
+        self.profile, _ = Profile.objects.get_or_create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def batch(self, *requests, atomic=False, client=None):
+        response = (client or self.client).post("/api/batch/", {"requests": list(requests), "atomic": atomic}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["responses"]
+
+    def experience(self, title):
+        return {"method": "POST", "path": "/api/experiences/", "body": {"title": title, "company": "Kampus"}}
+
+    def test_subrequests_run_in_order(self):
+        responses = self.batch(self.experience("Asisten"), {"method": "GET", "path": "/api/experiences/"})
+        self.assertEqual([response["status"] for response in responses], [201, 200])
+        self.assertEqual([item["title"] for item in responses[1]["body"]["results"]], ["Asisten"])
+
+    def test_atomic_batch_rolls_back_and_skips_the_rest(self):
+        responses = self.batch(
+            self.experience("Asisten"),
+            {"method": "POST", "path": "/api/experiences/", "body": {"company": "No title"}},
+            self.experience("Magang"),
+            atomic=True,
+        )
+        self.assertEqual([response["status"] for response in responses], [201, 400, 424])
+        self.assertFalse(Experience.objects.exists())
+
+    def test_failures_do_not_roll_back_a_plain_batch(self):
+        responses = self.batch(
+            {"method": "POST", "path": "/api/experiences/", "body": {"company": "No title"}},
+            self.experience("Magang"),
+        )
+        self.assertEqual([response["status"] for response in responses], [400, 201])
+        self.assertEqual(Experience.objects.get().title, "Magang")
+
+    def test_nested_batches_are_rejected(self):
+        nested = {"method": "POST", "path": "/api/batch/", "body": {"requests": [self.experience("Asisten")]}}
+        [response] = self.batch(nested)
+        self.assertEqual(response["status"], 400)
+        self.assertFalse(Experience.objects.exists())
+
+    def test_paths_outside_the_api_are_rejected(self):
+        responses = self.batch({"method": "GET", "path": "/admin/"}, {"method": "GET", "path": "/api/nowhere/"})
+        self.assertEqual([response["status"] for response in responses], [400, 404])
+
+    def test_streaming_responses_are_rejected(self):
+        streaming = StreamingHttpResponse(iter([b"[]"]), content_type="application/json")
+        with mock.patch.object(AdminStudentsView, "get", return_value=streaming):
+            self.user.role = "admin"
+            self.user.save()
+            [response] = self.batch({"method": "GET", "path": "/api/admin/students/"})
+        self.assertEqual(response["status"], 400)
+
+    def test_permissions_apply_per_subrequest(self):
+        responses = self.batch({"method": "GET", "path": "/api/admin/metrics/"}, {"method": "GET", "path": "/api/experiences/"})
+        self.assertEqual([response["status"] for response in responses], [403, 200])
+
+        anonymous = self.batch(
+            {"method": "GET", "path": "/api/experiences/"},
+            {"method": "GET", "path": f"/api/profiles/{self.profile.pk}/"},
+            client=APIClient(),
+        )
+        self.assertEqual([response["status"] for response in anonymous], [401, 200])
+
+    def test_throttles_apply_per_subrequest(self):
+        profile = {"method": "GET", "path": f"/api/profiles/{self.profile.pk}/"}
+        with mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, {"profiles": "2/min"}):
+            responses = self.batch(profile, profile, profile)
+        self.assertEqual([response["status"] for response in responses], [200, 200, 429])
+        self.assertIn("Retry-After", responses[2]["headers"])
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import threading
+import unittest
+
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from api.change_feed import changes_page, record_profile_change
+from api.models import Profile, ProfileChange, User
+
+
+class RecordProfileChangeTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile = Profile.objects.create(user=User.objects.create_user(email="feed@example.com", password="pw"))
+
+    def test_change_moves_row_past_every_cursor(self):
+        first = ProfileChange.objects.get(profile_id=self.profile.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            record_profile_change(self.profile.pk)
+            record_profile_change(self.profile.pk, kind="deleted", user_id=self.profile.user_id)
+
+        change = ProfileChange.objects.get(profile_id=self.profile.pk)
+        self.assertGreater(change.id, first.id)
+        self.assertEqual(change.kind, "deleted")
+        self.assertEqual(change.user_id, self.profile.user_id)
+
+    def test_written_on_commit_only(self):
+        first = ProfileChange.objects.get(profile_id=self.profile.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.profile.about = "Rolled back"
+                self.profile.save()
+                transaction.set_rollback(True)
+        self.assertEqual(ProfileChange.objects.get(profile_id=self.profile.pk), first)
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "row locking is checked on PostgreSQL")
+class ConcurrentChangeTests(TransactionTestCase):
+    def test_concurrent_touches_of_one_profile(self):
+        profile = Profile.objects.create(user=User.objects.create_user(email="race@example.com", password="pw"))
+        ProfileChange.objects.filter(profile_id=profile.pk).delete()
+        barrier = threading.Barrier(4)
+        errors = []
+
+        def touch():
+            try:
+                barrier.wait()
+                record_profile_change(profile.pk)
+            except Exception as exc:  # noqa: BLE001 - reported below
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=touch) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(ProfileChange.objects.filter(profile_id=profile.pk).count(), 1)
+
+    @override_settings(CHANGE_FEED_SETTLE_SECONDS=0)
+    def test_long_transaction_is_not_skipped(self):
+        slow = Profile.objects.create(user=User.objects.create_user(email="slow@example.com", password="pw"))
+        quick = Profile.objects.create(user=User.objects.create_user(email="quick@example.com", password="pw"))
+        _, cursor, _ = changes_page(Profile.objects.all())
+        touched, release = threading.Event(), threading.Event()
+        errors = []
+
+        def long_transaction():
+            try:
+                with transaction.atomic():
+                    Profile.objects.filter(pk=slow.pk).update(about="Merged skills")
+                    record_profile_change(slow.pk)
+                    touched.set()
+                    release.wait(10)
+            except Exception as exc:  # noqa: BLE001 - reported below
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=long_transaction)
+        thread.start()
+        touched.wait(10)
+        # Another profile changes and a consumer reads it while the long transaction is open
+        record_profile_change(quick.pk)
+        changes, cursor, _ = changes_page(Profile.objects.all(), cursor=cursor)
+        self.assertEqual([change["profile_id"] for change in changes], [quick.pk])
+        release.set()
+        thread.join()
+
+        self.assertEqual(errors, [])
+        changes, _, _ = changes_page(Profile.objects.all(), cursor=cursor)
+        self.assertEqual([change["profile_id"] for change in changes], [slow.pk])
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from api.utils import circuit_breaker
+from api.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from api.utils.supabase_storage import (
+    SPOOL_REJECTED_DIR,
+    replay_spool,
+    spooled_uploads,
+    storage_breaker,
+    upload_profile_photo,
+)
+
+
+@override_settings(
+    TEST_BREAKER_FAILURE_RATE=0.5,
+    TEST_BREAKER_SLOW_CALL_SECONDS=2,
+    TEST_BREAKER_MIN_CALLS=4,
+    TEST_BREAKER_WINDOW_SECONDS=60,
+    TEST_BREAKER_OPEN_SECONDS=30,
+)
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = SimpleNamespace(time=lambda: self.now, monotonic=lambda: self.now)
+        self.now = 1000.0
+        patcher = mock.patch.object(circuit_breaker, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker("test", "TEST_BREAKER")
+
+    def call(self, ok=True, seconds=0.1):
+        probe = self.breaker.before_call()
+        self.breaker.record(ok, seconds, probe)
+        return probe
+
+    def test_opens_at_the_failure_rate(self):
+        self.call()
+        self.call()
+        self.call(ok=False)
+        # Three calls are below MIN_CALLS
+        self.assertEqual(self.breaker.state()["state"], "closed")
+        self.call(ok=False)
+        with self.assertRaises(CircuitOpenError) as raised:
+            self.breaker.before_call()
+        self.assertEqual(raised.exception.retry_after, 30)
+
+        # The state is shared through the cache with every worker's breaker
+        with self.assertRaises(CircuitOpenError):
+            CircuitBreaker("test", "TEST_BREAKER").before_call()
+
+    def test_slow_calls_count_as_failures(self):
+        for _ in range(4):
+            self.call(seconds=2)
+        self.assertEqual(self.breaker.state()["state"], "open")
+
+    def test_calls_outside_the_window_are_forgotten(self):
+        self.call(ok=False)
+        self.call(ok=False)
+        self.call(ok=False)
+        self.now += 61
+        self.call(ok=False)
+        self.assertEqual(self.breaker.state()["window_calls"], 1)
+        self.assertEqual(self.breaker.state()["state"], "closed")
+
+    def test_half_open_probe_closes_the_circuit(self):
+        for _ in range(4):
+            self.call(ok=False)
+        self.now += 31
+        self.assertEqual(self.breaker.state()["state"], "half_open")
+        self.assertTrue(self.breaker.before_call())
+        # One probe across all workers; the rest keep failing fast
+        with self.assertRaises(CircuitOpenError) as raised:
+            CircuitBreaker("test", "TEST_BREAKER").before_call()
+        self.assertEqual(raised.exception.retry_after, 1)
+
+        self.breaker.record(True, 0.1, probe=True)
+        self.assertEqual(self.breaker.state()["state"], "closed")
+        self.assertFalse(self.call())
+
+    def test_failed_probe_opens_again(self):
+        for _ in range(4):
+            self.call(ok=False)
+        self.now += 31
+        self.assertTrue(self.call(ok=False))
+        with self.assertRaises(CircuitOpenError) as raised:
+            self.breaker.before_call()
+        self.assertEqual(raised.exception.retry_after, 30)
+
+
+def response(status_code):
+    return SimpleNamespace(status_code=status_code, text="", json=lambda: {}, reason="")
+
+
+class Upload(BytesIO):
+    name = "photo.png"
+    content_type = "image/png"
+
+
+class SpoolTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        storage_breaker.reset()
+        self.addCleanup(storage_breaker.reset)
+        self.spool_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.spool_dir)
+        settings = override_settings(
+            STORAGE_SPOOL_DIR=str(self.spool_dir),
+            SUPABASE_STORAGE_URL="https://supabase.test/storage/v1",
+            SUPABASE_SERVICE_ROLE_KEY="service-key",
+            SUPABASE_PUBLIC_STORAGE_URL="https://cdn.test/talent",
+            SUPABASE_PROFILE_BUCKET="talent",
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def spool(self, content):
+        with mock.patch("requests.request", return_value=response(503)):
+            return upload_profile_photo(Upload(content))
+
+    def test_outage_spools_and_replay_uploads(self):
+        url = self.spool(b"first")
+        self.assertTrue(url.startswith("https://cdn.test/talent/profile-photos/"))
+        self.assertEqual(len(spooled_uploads()), 1)
+
+        with mock.patch("requests.request", return_value=response(200)) as request:
+            self.assertEqual(replay_spool(), (1, 0, 0))
+        self.assertEqual(request.call_args.kwargs["data"], b"first")
+        self.assertEqual(spooled_uploads(), [])
+
+    def test_refused_upload_does_not_block_the_rest(self):
+        self.spool(b"refused")
+        self.spool(b"fine")
+        refused, fine = [entry["key"] for entry in spooled_uploads()]
+
+        def storage(method, url, **kwargs):
+            return response(400 if kwargs["data"] == b"refused" else 200)
+
+        with mock.patch("requests.request", side_effect=storage):
+            self.assertEqual(replay_spool(), (1, 1, 0))
+        self.assertEqual(spooled_uploads(), [])
+        rejected = {path.name for path in (self.spool_dir / SPOOL_REJECTED_DIR).iterdir()}
+        self.assertIn(refused.replace("/", "__"), rejected)
+        self.assertNotIn(fine.replace("/", "__"), rejected)
+
+    def test_server_errors_stay_spooled(self):
+        self.spool(b"later")
+        with mock.patch("requests.request", return_value=response(502)):
+            self.assertEqual(replay_spool(), (0, 0, 1))
+        self.assertEqual(len(spooled_uploads()), 1)
+
+    def test_open_circuit_stops_the_replay(self):
+        self.spool(b"waiting")
+        for _ in range(10):
+            storage_breaker.record(False, 0.1)
+        with mock.patch("requests.request") as request:
+            self.assertEqual(replay_spool(), (0, 0, 1))
+        request.assert_not_called()
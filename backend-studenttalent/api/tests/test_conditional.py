@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from datetime import date
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Profile, User
+from api.profile_views import write_counts
+
+
+class ViewCountValidatorTests(TestCase):
+    """A view count flush must invalidate cached profile payloads, though it leaves updated_at alone."""
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(email="student@example.com", password="pw", first_name="Student")
+        self.profile, _ = Profile.objects.get_or_create(user=user)
+        self.client = APIClient()
+
+    def flush_views(self, count):
+        write_counts({(self.profile.pk, date(2026, 1, 1)): count})
+
+    def assertRevalidates(self, url):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        etag, last_modified = first["ETag"], first["Last-Modified"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.flush_views(5)
+        after_flush = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(after_flush.status_code, 200)
+        self.assertNotEqual(after_flush["ETag"], etag)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+        return after_flush.json()
+
+    def test_detail(self):
+        payload = self.assertRevalidates(f"/api/profiles/{self.profile.pk}/")
+        self.assertEqual(payload["views"], 5)
+
+    def test_list(self):
+        payload = self.assertRevalidates("/api/profiles/")
+        self.assertEqual(payload["results"][0]["views"], 5)
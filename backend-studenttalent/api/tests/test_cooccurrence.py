@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from api.archive import archive_profile, restore_profile
+from api.cooccurrence import rebuild_cooccurrence, record_bulk_added
+from api.models import ArchivedProfile, Profile, ProfileSkill, Skill, SkillCooccurrence, User
+from api.taxonomy import merge_skills
+
+
+class IncrementalCooccurrenceTests(TestCase):
+    """Every write path must leave the same counts a full rebuild_cooccurrence() produces."""
+
+    def setUp(self):
+        cache.clear()
+        self.python, self.django, self.sql, self.react = (
+            Skill.objects.create(name=name) for name in ("Python", "Django", "SQL", "React")
+        )
+        self.ana = self.student("ana", self.python, self.django, self.sql)
+        self.budi = self.student("budi", self.python, self.sql)
+        self.citra = self.student("citra", self.django, self.react)
+
+    def student(self, name, *skills):
+        user = User.objects.create_user(email=f"{name}@example.com", password="pw")
+        profile, _ = Profile.objects.get_or_create(user=user)
+        for skill in skills:
+            ProfileSkill.objects.create(profile=profile, skill=skill)
+        return profile
+
+    def counts(self):
+        # Incremental updates may leave zero rows behind; the rebuild does not write them
+        rows = SkillCooccurrence.objects.exclude(profiles=0).values_list("skill_id", "related_id", "profiles")
+        return {(skill_id, related_id): profiles for skill_id, related_id, profiles in rows}
+
+    def assertMatchesRebuild(self):
+        incremental = self.counts()
+        rebuild_cooccurrence()
+        self.assertEqual(incremental, self.counts())
+        return incremental
+
+    def test_create(self):
+        counts = self.assertMatchesRebuild()
+        self.assertEqual(counts[self.python.pk, self.python.pk], 2)
+        self.assertEqual(counts[self.python.pk, self.sql.pk], 2)
+        self.assertEqual(counts[self.sql.pk, self.python.pk], 2)
+        self.assertEqual(counts[self.django.pk, self.react.pk], 1)
+        self.assertNotIn((self.python.pk, self.react.pk), counts)
+
+    def test_bulk_create(self):
+        rows = ProfileSkill.objects.bulk_create([
+            ProfileSkill(profile=self.budi, skill=self.react),
+            ProfileSkill(profile=self.citra, skill=self.sql),
+        ])
+        record_bulk_added(rows)
+        self.assertMatchesRebuild()
+
+    def test_single_delete(self):
+        ProfileSkill.objects.get(profile=self.ana, skill=self.django).delete()
+        counts = self.assertMatchesRebuild()
+        self.assertNotIn((self.python.pk, self.django.pk), counts)
+
+    def test_queryset_delete(self):
+        ProfileSkill.objects.filter(profile=self.ana, skill__in=[self.python, self.sql]).delete()
+        counts = self.assertMatchesRebuild()
+        self.assertEqual(counts[self.python.pk, self.sql.pk], 1)
+
+    def test_profile_cascade(self):
+        self.ana.delete()
+        self.assertMatchesRebuild()
+
+    def test_user_cascade(self):
+        self.ana.user.delete()
+        counts = self.assertMatchesRebuild()
+        self.assertEqual(counts[self.django.pk, self.django.pk], 1)
+
+    def test_archive_and_restore(self):
+        archive_profile(self.ana.pk)
+        counts = self.assertMatchesRebuild()
+        self.assertEqual(counts[self.python.pk, self.sql.pk], 1)
+
+        restore_profile(ArchivedProfile.objects.get(profile_id=self.ana.pk))
+        counts = self.assertMatchesRebuild()
+        self.assertEqual(counts[self.python.pk, self.sql.pk], 2)
+
+    def test_merge(self):
+        # ana has both skills, so her rows are combined; citra's is re-pointed
+        merge_skills(self.python, [self.django])
+        counts = self.assertMatchesRebuild()
+        self.assertFalse(SkillCooccurrence.objects.filter(skill_id=self.django.pk).exists())
+        self.assertEqual(counts[self.python.pk, self.python.pk], 3)
+        self.assertEqual(counts[self.python.pk, self.react.pk], 1)
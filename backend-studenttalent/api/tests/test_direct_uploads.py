@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import base64
+import json
+from types import SimpleNamespace
+from unittest import mock
+
+import boto3
+from botocore.config import Config
+from botocore.stub import Stubber
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.models import Profile, Project, User
+from api.utils.direct_upload import S3Backend, get_backend
+from api.utils.supabase_storage import IMMUTABLE_CACHE_CONTROL, SupabaseStorageError
+
+MAX_BYTES = 1024
+
+
+class MemoryBackend:
+    """Stands in for the bucket: the test plays the browser by writing to ``objects``."""
+
+    def __init__(self, name="s3"):
+        self.name = name
+        self.objects = {}
+        self.deleted = []
+
+    def sign(self, key, content_type, max_bytes, expires):
+        return {"method": "PUT", "url": f"https://storage.test/{key}", "fields": {}, "headers": {"Content-Type": content_type}}
+
+    def stat(self, key):
+        return self.objects.get(key)
+
+    def delete(self, key):
+        self.objects.pop(key, None)
+        self.deleted.append(key)
+
+    def public_url(self, key):
+        return f"https://cdn.test/{key}"
+
+
+@override_settings(DIRECT_UPLOAD_MAX_BYTES=MAX_BYTES)
+class DirectUploadTests(TestCase):
+    def setUp(self):
+        self.backend = MemoryBackend()
+        patcher = mock.patch("api.utils.direct_upload.get_backend", return_value=self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(email="uploader@example.com", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sign(self, **data):
+        return self.client.post("/api/uploads/sign/", {"content_type": "image/png", "size": 100, **data}, format="json")
+
+    def confirm(self, upload_id, client=None):
+        return (client or self.client).post("/api/uploads/confirm/", {"upload_id": upload_id}, format="json")
+
+    def test_photo_flow(self):
+        upload = self.sign().json()
+        self.assertTrue(upload["key"].startswith("profile-photos/"))
+        self.assertEqual(self.confirm(upload["upload_id"]).status_code, 400, "confirmed before the upload")
+
+        self.backend.objects[upload["key"]] = (100, "image/png")
+        response = self.confirm(upload["upload_id"])
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.photo_profile, f"https://cdn.test/{upload['key']}")
+
+    def test_signing_limits(self):
+        self.assertEqual(self.sign(content_type="text/html").status_code, 400)
+        self.assertEqual(self.sign(size=MAX_BYTES + 1).status_code, 400)
+        self.assertEqual(self.sign(target="avatar").status_code, 400)
+
+    def test_upload_id_is_bound_to_its_user(self):
+        upload = self.sign().json()
+        self.backend.objects[upload["key"]] = (100, "image/png")
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(email="other@example.com", password="pw"))
+        self.assertEqual(self.confirm(upload["upload_id"], other).status_code, 400)
+        self.assertEqual(self.confirm("tampered").status_code, 400)
+
+    def test_objects_breaking_the_limits_are_deleted(self):
+        for stat in ((MAX_BYTES + 1, "image/png"), (100, "text/html")):
+            upload = self.sign().json()
+            self.backend.objects[upload["key"]] = stat
+            self.assertEqual(self.confirm(upload["upload_id"]).status_code, 400)
+            self.assertIn(upload["key"], self.backend.deleted)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.photo_profile)
+
+    def test_project_image(self):
+        profile, _ = Profile.objects.get_or_create(user=self.user)
+        project = Project.objects.create(profile=profile, title="Portfolio site")
+        upload = self.sign(target="project_image", project_id=project.pk).json()
+        self.assertTrue(upload["key"].startswith("projects/"))
+        self.backend.objects[upload["key"]] = (100, "image/png")
+
+        self.assertEqual(self.confirm(upload["upload_id"]).status_code, 200)
+        project.refresh_from_db()
+        self.assertEqual(project.image.name, upload["key"])
+
+    def test_project_image_needs_s3(self):
+        self.backend.name = "supabase"
+        profile, _ = Profile.objects.get_or_create(user=self.user)
+        project = Project.objects.create(profile=profile, title="Portfolio site")
+        self.assertEqual(self.sign(target="project_image", project_id=project.pk).status_code, 400)
+
+    def test_other_users_project_is_not_found(self):
+        owner = User.objects.create_user(email="owner@example.com", password="pw")
+        profile, _ = Profile.objects.get_or_create(user=owner)
+        project = Project.objects.create(profile=profile, title="Not yours")
+        self.assertEqual(self.sign(target="project_image", project_id=project.pk).status_code, 404)
+
+
+@override_settings(
+    USE_SUPABASE_STORAGE=True,
+    DIRECT_UPLOAD_MAX_BYTES=MAX_BYTES,
+    AWS_DEFAULT_ACL="public-read",
+    SUPABASE_PUBLIC_STORAGE_URL="https://cdn.test/object/public/talent",
+)
+class S3BackendTests(TestCase):
+    """The real S3Backend against a boto3 client whose responses are stubbed (no network)."""
+
+    def setUp(self):
+        cache.clear()
+        client = boto3.client(
+            "s3",
+            region_name="ap-southeast-1",
+            endpoint_url="https://storage.test",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+            config=Config(signature_version="s3v4"),
+        )
+        self.stubber = Stubber(client)
+        self.stubber.activate()
+        self.addCleanup(self.stubber.deactivate)
+        storage = SimpleNamespace(connection=SimpleNamespace(meta=SimpleNamespace(client=client)), bucket_name="talent")
+        patcher = mock.patch("django.core.files.storage.storages", {"default": storage})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.backend = get_backend()
+
+    def head(self, key, **response):
+        self.stubber.add_response("head_object", response, {"Bucket": "talent", "Key": key})
+
+    def test_presigned_post_policy(self):
+        self.assertIsInstance(self.backend, S3Backend)
+        upload = self.backend.sign("projects/a.png", "image/png", MAX_BYTES, 600)
+        self.assertEqual(upload["method"], "POST")
+        self.assertEqual(upload["url"], "https://storage.test/talent")
+        fields = upload["fields"]
+        self.assertEqual(fields["key"], "projects/a.png")
+        self.assertEqual(fields["acl"], "public-read")
+        self.assertEqual(fields["x-amz-algorithm"], "AWS4-HMAC-SHA256")
+        self.assertIn("x-amz-signature", fields)
+
+        conditions = json.loads(base64.b64decode(fields["policy"]))["conditions"]
+        self.assertIn(["content-length-range", 1, MAX_BYTES], conditions)
+        self.assertIn({"Content-Type": "image/png"}, conditions)
+        self.assertIn({"Cache-Control": IMMUTABLE_CACHE_CONTROL}, conditions)
+        self.assertIn({"acl": "public-read"}, conditions)
+        self.assertIn({"key": "projects/a.png"}, conditions)
+        self.assertIn({"bucket": "talent"}, conditions)
+
+    def test_stat(self):
+        self.head("projects/a.png", ContentLength=100, ContentType="image/png")
+        self.assertEqual(self.backend.stat("projects/a.png"), (100, "image/png"))
+        for code, status in (("404", 404), ("NoSuchKey", 404)):
+            self.stubber.add_client_error("head_object", service_error_code=code, http_status_code=status)
+            self.assertIsNone(self.backend.stat("projects/missing.png"))
+        self.stubber.assert_no_pending_responses()
+
+    def test_stat_errors_become_storage_errors(self):
+        self.stubber.add_client_error("head_object", service_error_code="AccessDenied", http_status_code=403)
+        with self.assertRaises(SupabaseStorageError):
+            self.backend.stat("projects/a.png")
+        self.stubber.add_client_error("head_object", service_error_code="InternalError", http_status_code=500)
+        with self.assertRaises(SupabaseStorageError):
+            self.backend.stat("projects/a.png")
+
+    def test_project_image_flow(self):
+        user = User.objects.create_user(email="s3@example.com", password="pw")
+        profile, _ = Profile.objects.get_or_create(user=user)
+        project = Project.objects.create(profile=profile, title="Portfolio site")
+        client = APIClient()
+        client.force_authenticate(user)
+
+        upload = client.post(
+            "/api/uploads/sign/",
+            {"content_type": "image/png", "size": 100, "target": "project_image", "project_id": project.pk},
+            format="json",
+        ).json()
+        self.assertEqual(upload["method"], "POST")
+        self.head(upload["key"], ContentLength=100, ContentType="image/png")
+        response = client.post("/api/uploads/confirm/", {"upload_id": upload["upload_id"]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        project.refresh_from_db()
+        self.assertEqual(project.image.name, upload["key"])
+
+        # An object over the limit (the policy should have refused it) is deleted
+        upload = client.post("/api/uploads/sign/", {"content_type": "image/png", "size": 100}, format="json").json()
+        self.head(upload["key"], ContentLength=MAX_BYTES + 1, ContentType="image/png")
+        self.stubber.add_response("delete_object", {}, {"Bucket": "talent", "Key": upload["key"]})
+        response = client.post("/api/uploads/confirm/", {"upload_id": upload["upload_id"]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.stubber.assert_no_pending_responses()
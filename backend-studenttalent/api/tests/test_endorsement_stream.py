@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.async_views import endorsement_stream
+from api.models import Profile, ProfileSkill, Skill, SkillEndorsement, User
+
+
+def parse_event(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+class EndorsementStreamTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.profile, _ = Profile.objects.get_or_create(
+            user=User.objects.create_user(email="student@example.com", password="pw")
+        )
+        self.python, self.sql = Skill.objects.create(name="Python"), Skill.objects.create(name="SQL")
+        self.python_skill = ProfileSkill.objects.create(profile=self.profile, skill=self.python)
+        ProfileSkill.objects.create(profile=self.profile, skill=self.sql)
+        self.endorse(self.python_skill, "first@example.com")
+
+    def endorse(self, profile_skill, email):
+        # The count is published once the endorsement commits
+        with self.captureOnCommitCallbacks(execute=True):
+            SkillEndorsement.objects.create(
+                profile_skill=profile_skill,
+                endorser=User.objects.create_user(email=email, password="pw"),
+            )
+
+    def snapshot(self, counts):
+        return [
+            {"id": self.python.pk, "endorsements_count": counts[0]},
+            {"id": self.sql.pk, "endorsements_count": counts[1]},
+        ]
+
+
+@override_settings(SSE_RETRY_MS=5000, SSE_HEARTBEAT_SECONDS=5)
+class EndorsementStreamTests(EndorsementStreamTestCase):
+    async def test_snapshot_then_published_update(self):
+        request = AsyncRequestFactory().get(f"/api/profiles/{self.profile.pk}/endorsements/stream/")
+        response = await endorsement_stream(request, self.profile.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        chunks = response.streaming_content
+        try:
+            self.assertEqual(await anext(chunks), b"retry: 5000\n")
+            self.assertEqual(parse_event(await anext(chunks)), ("snapshot", self.snapshot([1, 0])))
+
+            await sync_to_async(self.endorse)(self.python_skill, "second@example.com")
+            update = await asyncio.wait_for(anext(chunks), 5)
+            self.assertEqual(parse_event(update), ("endorsements", {"id": self.python.pk, "endorsements_count": 2}))
+        finally:
+            await chunks.aclose()
+
+    async def test_unknown_profile(self):
+        request = AsyncRequestFactory().get("/api/profiles/0/endorsements/stream/")
+        self.assertEqual((await endorsement_stream(request, 0)).status_code, 404)
+
+
+@override_settings(SSE_FALLBACK_RETRY_MS=30000)
+class EndorsementSnapshotFallbackTests(EndorsementStreamTestCase):
+    def test_wsgi_route_serves_a_snapshot(self):
+        response = APIClient().get(
+            f"/api/profiles/{self.profile.pk}/endorsements/stream/", HTTP_ACCEPT="text/event-stream"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        retry, event = response.content.split(b"\n", 1)
+        self.assertEqual(retry, b"retry: 30000")
+        self.assertEqual(parse_event(event), ("snapshot", self.snapshot([1, 0])))
+
+    def test_unknown_profile(self):
+        response = APIClient().get("/api/profiles/0/endorsements/stream/", HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import datetime
+import json
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from api.json_engine import PAYLOAD_COLUMN, with_payload
+from api.models import Experience, PortfolioLink, Profile, ProfileSkill, Project, Skill, SkillEndorsement, User
+from api.serializers import ProfileSerializer
+from api.views import PROFILE_PREFETCH
+
+from .scale import seed_scale_data
+
+SCALE = 200
+
+
+def seed_edge_cases():
+    """A profile with the values most likely to render differently in SQL: blanks, nulls, dates, quotes, unicode."""
+    user = User.objects.create_user(
+        email="json-engine@example.com", password=None,
+        first_name="  Siti \"Nur\"\t", last_name="Ḥasanah  ", photo_profile="https://cdn.example.com/a b.png",
+    )
+    profile = Profile.objects.create(user=user, prodi="Teknik \\ Sipil", entry_year=None, about="Line 1\nLine 2 ✓")
+    skill, _ = Skill.objects.get_or_create(name="JSON Engine Skill")
+    profile_skill = ProfileSkill.objects.create(profile=profile, skill=skill, level="Expert")
+    SkillEndorsement.objects.create(profile_skill=profile_skill, endorser=User.objects.exclude(pk=user.pk).first())
+    Experience.objects.create(
+        profile=profile, title="Intern", company="PT \"Quote\"",
+        start_date=datetime.date(2023, 2, 1), end_date=datetime.date(2023, 11, 30),
+    )
+    Experience.objects.create(profile=profile, title="Engineer", company="Acme", start_date=datetime.date(2024, 1, 1), is_current=True)
+    Project.objects.create(profile=profile, title="With image", image="projects/shot.png", link="https://example.com/p")
+    Project.objects.create(profile=profile, title="No image")
+    PortfolioLink.objects.create(profile=profile, url="https://example.com/~siti?tab=1&x=%20")
+    return profile
+
+
+def python_payloads(queryset):
+    profiles = queryset.select_related("user").prefetch_related(*PROFILE_PREFETCH)
+    return json.loads(JSONRenderer().render(ProfileSerializer(profiles, many=True).data))
+
+
+def sql_payloads(queryset):
+    return [json.loads(text) for text in with_payload(queryset).values_list(PAYLOAD_COLUMN, flat=True)]
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "the SQL payload engine needs PostgreSQL")
+class PayloadParityTests(TestCase):
+    """PROFILE_JSON_ENGINE=postgres must render every profile exactly like ProfileSerializer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_scale_data(SCALE)
+        cls.edge_case = seed_edge_cases()
+
+    def assertSamePayloads(self, queryset):
+        expected = python_payloads(queryset)
+        actual = sql_payloads(queryset)
+        self.assertEqual([payload["id"] for payload in actual], [payload["id"] for payload in expected])
+        for python_payload, sql_payload in zip(expected, actual):
+            with self.subTest(profile=python_payload["id"]):
+                self.assertEqual(sql_payload, python_payload)
+
+    def test_edge_cases(self):
+        self.assertSamePayloads(Profile.objects.filter(pk=self.edge_case.pk))
+
+    def test_every_profile(self):
+        self.assertSamePayloads(Profile.objects.exclude(user__role="admin").order_by("pk"))
+
+    def test_single_query(self):
+        queryset = Profile.objects.order_by("pk")[:20]
+        with self.assertNumQueries(1):
+            sql_payloads(queryset)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Profile, ProfileSkill, SavedSearch, Skill, User
+from api.percolator import matching_searches
+
+
+class PercolatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.recruiter = User.objects.create_user(email="recruiter@example.com", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.recruiter)
+        self.python = Skill.objects.create(name="Python")
+
+    def student(self, name, **fields):
+        user = User.objects.create_user(email=f"{name}@example.com", password="pw", first_name=name.title())
+        profile, _ = Profile.objects.get_or_create(user=user)
+        for field, value in fields.items():
+            setattr(profile, field, value)
+        profile.save()
+        return profile
+
+    def save_search(self, **predicates):
+        response = self.client.post("/api/saved-searches/", {"name": "Search", **predicates}, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        return SavedSearch.objects.get(pk=response.json()["id"])
+
+    def matched(self, search):
+        return set(search.matches.values_list("profile_id", flat=True))
+
+    def test_skill_and_level(self):
+        search = self.save_search(skill=self.python.pk, min_level="Intermediate")
+        any_level = self.save_search(skill_name="python")
+        ana, budi = self.student("ana"), self.student("budi")
+
+        beginner = ProfileSkill.objects.create(profile=ana, skill=self.python, level="Beginner")
+        ProfileSkill.objects.create(profile=budi, skill=self.python, level="Expert")
+        self.assertEqual(self.matched(search), {budi.pk})
+        self.assertEqual(self.matched(any_level), {ana.pk, budi.pk})
+
+        beginner.level = "Advanced"
+        beginner.save()
+        self.assertEqual(self.matched(search), {ana.pk, budi.pk})
+
+    def test_prodi_and_year(self):
+        search = self.save_search(prodi="Teknik  Informatika", entry_year=2022)
+        match = self.student("ana", prodi="teknik informatika", entry_year=2022)
+        self.student("budi", prodi="Teknik Informatika", entry_year=2021)
+        self.student("citra", prodi="Sistem Informasi", entry_year=2022)
+        self.assertEqual(self.matched(search), {match.pk})
+        self.assertEqual(matching_searches(match.pk), {search.pk})
+
+    def test_created_search_matches_existing_profiles(self):
+        ana = self.student("ana", prodi="Teknik Informatika", entry_year=2022)
+        ProfileSkill.objects.create(profile=ana, skill=self.python, level="Advanced")
+        self.student("budi", prodi="Teknik Informatika", entry_year=2022)
+        search = self.save_search(skill=self.python.pk, prodi="teknik informatika")
+        self.assertEqual(self.matched(search), {ana.pk})
+        # Running forwards and in reverse agree
+        self.assertEqual(matching_searches(ana.pk), {search.pk})
+
+    def test_match_removed_when_profile_stops_matching(self):
+        search = self.save_search(skill=self.python.pk, min_level="Advanced", entry_year=2022)
+        ana = self.student("ana", entry_year=2022)
+        skill = ProfileSkill.objects.create(profile=ana, skill=self.python, level="Expert")
+        self.assertEqual(self.matched(search), {ana.pk})
+
+        skill.level = "Intermediate"
+        skill.save()
+        self.assertEqual(self.matched(search), set())
+
+        skill.level = "Expert"
+        skill.save()
+        ana.entry_year = 2023
+        ana.save()
+        self.assertEqual(self.matched(search), set())
+
+        ana.entry_year = 2022
+        ana.save()
+        skill.delete()
+        self.assertEqual(self.matched(search), set())
+
+        ProfileSkill.objects.create(profile=ana, skill=self.python, level="Expert")
+        ana.is_active = False
+        ana.save()
+        self.assertEqual(self.matched(search), set())
+
+    def test_matches_feed(self):
+        search = self.save_search(entry_year=2022)
+        first, second = self.student("ana", entry_year=2022), self.student("budi", entry_year=2022)
+        url = f"/api/saved-searches/{search.pk}/matches/"
+
+        page = self.client.get(url, {"limit": 1}).json()
+        self.assertEqual([row["profile_id"] for row in page["results"]], [first.pk])
+        self.assertTrue(page["has_more"])
+        page = self.client.get(url, {"limit": 1, "cursor": page["next_cursor"]}).json()
+        self.assertEqual([row["profile_id"] for row in page["results"]], [second.pk])
+        self.assertFalse(page["has_more"])
+        cursor = page["next_cursor"]
+
+        # Nothing new, and the cursor stays put
+        page = self.client.get(url, {"cursor": cursor}).json()
+        self.assertEqual((page["results"], page["next_cursor"]), ([], cursor))
+
+        # A profile that stops and starts matching again comes back after the cursor
+        first.entry_year = 2021
+        first.save()
+        first.entry_year = 2022
+        first.save()
+        page = self.client.get(url, {"cursor": cursor}).json()
+        self.assertEqual([row["profile_id"] for row in page["results"]], [first.pk])
+        self.assertEqual(page["results"][0]["name"], "Ana")
+
+        self.assertEqual(self.client.get(url, {"cursor": "x"}).status_code, 400)
+
+    def test_other_users_cannot_read_the_feed(self):
+        search = self.save_search(entry_year=2022)
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(email="other@example.com", password="pw"))
+        self.assertEqual(other.get(f"/api/saved-searches/{search.pk}/matches/").status_code, 404)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from api import profile_views
+from api.models import Profile, ProfileViewDaily, User
+from api.profile_views import CacheBuffer, ProcessBuffer, flush_views, record_view
+
+BROWSER = "Mozilla/5.0 (X11; Linux x86_64) Firefox/131.0"
+DAY = date(2026, 1, 1)
+
+
+@override_settings(PROFILE_VIEW_FLUSH_SECONDS=0)
+class RecordViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.buffer = ProcessBuffer()
+        patcher = mock.patch.object(profile_views, "_buffer", self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.owner = User.objects.create_user(email="owner@example.com", password="pw")
+        self.profile, _ = Profile.objects.get_or_create(user=self.owner)
+
+    def view(self, user=None, **headers):
+        request = RequestFactory().get(f"/api/profiles/{self.profile.pk}/", **{"HTTP_USER_AGENT": BROWSER, **headers})
+        request.user = user or AnonymousUser()
+        return record_view(request, self.profile.pk, self.owner.pk)
+
+    def test_bots_and_prefetches_are_not_counted(self):
+        self.assertFalse(self.view(HTTP_USER_AGENT="curl/8.5.0"))
+        self.assertFalse(self.view(HTTP_USER_AGENT="Googlebot/2.1"))
+        self.assertFalse(self.view(HTTP_USER_AGENT=""))
+        self.assertFalse(self.view(HTTP_SEC_PURPOSE="prefetch"))
+        self.assertFalse(self.buffer.drain())
+
+    def test_owner_is_not_counted(self):
+        self.assertFalse(self.view(self.owner))
+
+    def test_viewer_counts_once_per_dedup_window(self):
+        viewer = User.objects.create_user(email="viewer@example.com", password="pw")
+        self.assertTrue(self.view())
+        self.assertFalse(self.view())
+        self.assertTrue(self.view(viewer))
+        self.assertFalse(self.view(viewer))
+        self.assertEqual(sum(self.buffer.drain().values()), 2)
+
+
+class ProcessBufferTests(TestCase):
+    def test_drain_empties_and_restore_adds_back(self):
+        buffer = ProcessBuffer()
+        buffer.add(1, DAY)
+        buffer.add(1, DAY, 2)
+        self.assertEqual(buffer.drain(), Counter({(1, DAY): 3}))
+        self.assertFalse(buffer.drain())
+        buffer.add(1, DAY)
+        buffer.restore(Counter({(1, DAY): 3}))
+        self.assertEqual(buffer.drain(), Counter({(1, DAY): 4}))
+
+
+@override_settings(PROFILE_VIEW_FLUSH_SECONDS=60)
+class CacheBufferTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.buffer = CacheBuffer()
+        self.bucket = 1_000_000
+        patcher = mock.patch.object(CacheBuffer, "_bucket", side_effect=lambda: self.bucket)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # First flush: no cursor yet, so every bucket a key can outlive is scanned
+        self.buffer.drain()
+
+    def drain_later(self):
+        self.bucket += 2
+        return self.buffer.drain()
+
+    def test_open_buckets_wait_for_the_next_flush(self):
+        self.buffer.add(1, DAY)
+        self.assertFalse(self.buffer.drain())
+        self.assertEqual(self.drain_later(), Counter({(1, DAY): 1}))
+
+    def test_drain_reads_only_what_changed(self):
+        self.buffer.add(1, DAY)
+        self.buffer.add(1, DAY, 2)
+        self.buffer.add(2, DAY)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.drain_later(), Counter({(1, DAY): 3, (2, DAY): 1}))
+        self.assertFalse(self.drain_later())
+
+        # A drained key is back at zero and gets indexed again
+        self.buffer.add(1, DAY)
+        self.assertEqual(self.drain_later(), Counter({(1, DAY): 1}))
+
+    def test_views_added_during_drain_stay_buffered(self):
+        self.buffer.add(1, DAY)
+        self.bucket += 2
+        decr = cache.decr
+
+        def decr_after_a_view(key, delta):
+            self.buffer.add(1, DAY, 5)
+            return decr(key, delta)
+
+        with mock.patch.object(cache, "decr", side_effect=decr_after_a_view):
+            self.assertEqual(self.buffer.drain(), Counter({(1, DAY): 1}))
+        self.assertEqual(self.drain_later(), Counter({(1, DAY): 5}))
+
+    def test_concurrent_drain_is_skipped(self):
+        self.buffer.add(1, DAY)
+        cache.add(CacheBuffer.LOCK_KEY, 1)
+        self.assertFalse(self.drain_later())
+        cache.delete(CacheBuffer.LOCK_KEY)
+        self.assertEqual(self.buffer.drain(), Counter({(1, DAY): 1}))
+
+
+class FlushViewsTests(TestCase):
+    def setUp(self):
+        self.buffer = ProcessBuffer()
+        patcher = mock.patch.object(profile_views, "_buffer", self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.profile, _ = Profile.objects.get_or_create(
+            user=User.objects.create_user(email="student@example.com", password="pw")
+        )
+
+    def test_writes_daily_rows_and_totals(self):
+        self.buffer.add(self.profile.pk, DAY, 2)
+        self.buffer.add(self.profile.pk, date(2026, 1, 2))
+        # Views of a profile deleted meanwhile are dropped
+        self.buffer.add(self.profile.pk + 1000, DAY)
+        self.assertEqual(flush_views(), 3)
+        self.assertEqual(flush_views(), 0)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.views_total, 3)
+        self.assertEqual(
+            list(ProfileViewDaily.objects.order_by("day").values_list("day", "views")),
+            [(DAY, 2), (date(2026, 1, 2), 1)],
+        )
+
+        self.buffer.add(self.profile.pk, DAY)
+        flush_views()
+        self.assertEqual(ProfileViewDaily.objects.get(day=DAY).views, 3)
+
+    def test_failed_write_keeps_the_counts(self):
+        self.buffer.add(self.profile.pk, DAY, 2)
+        with mock.patch.object(profile_views, "write_counts", side_effect=RuntimeError("database down")):
+            with self.assertRaises(RuntimeError):
+                flush_views()
+        self.assertEqual(flush_views(), 2)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import re
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+
+from api.models import (
+    Experience,
+    PortfolioLink,
+    Profile,
+    ProfileSkill,
+    Project,
+    Skill,
+    SkillEndorsement,
+    User,
+)
+from api.ranking import PROFILE_ORDERINGS
+
+from .scale import seed_scale_data
+
+SCALE = 2000
+# The planner may scan a table this small in full whatever the indexes
+SMALL_TABLE_ROWS = 1000
+SEQ_SCAN = re.compile(r"Seq Scan on (\w+)")
+# A SCAN that walks an index (in index order, for ORDER BY ... LIMIT) is fine; a bare table SCAN is not
+SQLITE_TABLE_SCAN = re.compile(r"\bSCAN (\w+)(?! USING (?:COVERING )?INDEX)\b")
+
+
+class HotQueryPlans:
+    """Every lookup behind a public page must stay an index scan at scale."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_scale_data(SCALE)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        cls.profile_skill = ProfileSkill.objects.order_by("-pk").first()
+        cls.profile = cls.profile_skill.profile
+        cls.page_ids = list(Profile.objects.order_by("pk").values_list("pk", flat=True)[:20])
+        models = (User, Profile, Skill, ProfileSkill, SkillEndorsement, Experience, Project, PortfolioLink)
+        cls.small_tables = {model._meta.db_table for model in models if model.objects.count() <= SMALL_TABLE_ROWS}
+
+    def hot_queries(self):
+        user_id = self.profile.user_id
+        profile_skill_id = self.profile_skill.pk
+        public = Profile.objects.select_related("user").exclude(user__role="admin").filter(is_active=True)
+        sorted_pages = [
+            (f"profile list page ?ordering={name}", public.order_by(*ordering)[:20])
+            for name, ordering in PROFILE_ORDERINGS.items()
+        ]
+        return sorted_pages + [
+            ("profile list page", public.order_by("pk")[:20]),
+            ("profile detail", public.filter(pk=self.profile.pk)),
+            ("profile by user (me)", Profile.objects.filter(user_id=user_id)),
+            ("admin student detail", Profile.objects.select_related("user").filter(user__id=user_id, user__role="mahasiswa")),
+            ("prefetch profile skills", ProfileSkill.objects.filter(profile_id__in=self.page_ids)),
+            ("prefetch experiences", Experience.objects.filter(profile_id__in=self.page_ids)),
+            ("prefetch projects", Project.objects.filter(profile_id__in=self.page_ids)),
+            ("prefetch portfolio links", PortfolioLink.objects.filter(profile_id__in=self.page_ids)),
+            (
+                "profile skill duplicate check",
+                ProfileSkill.objects.filter(profile_id=self.profile.pk, skill_id=self.profile_skill.skill_id),
+            ),
+            ("endorsement count", SkillEndorsement.objects.filter(profile_skill_id=profile_skill_id)),
+            ("endorsed by me", SkillEndorsement.objects.filter(profile_skill_id=profile_skill_id, endorser_id=user_id)),
+            ("endorsements by endorser", SkillEndorsement.objects.filter(endorser_id=user_id)),
+            ("skill by name", Skill.objects.filter(name="Bench Skill 1")),
+        ]
+
+    def test_no_full_table_scans(self):
+        for name, queryset in self.hot_queries():
+            with self.subTest(name):
+                plan = queryset.explain()
+                scans = sorted(self.full_scans(queryset, plan) - self.small_tables)
+                self.assertEqual(scans, [], f"{name} scans {', '.join(scans)}:\n{plan}")
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "EXPLAIN output is PostgreSQL's")
+class PostgresQueryPlanTests(HotQueryPlans, TestCase):
+    def full_scans(self, queryset, plan):
+        return set(SEQ_SCAN.findall(plan))
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN output is SQLite's")
+class SqliteQueryPlanTests(HotQueryPlans, TestCase):
+    def full_scans(self, queryset, plan):
+        scans = set(SQLITE_TABLE_SCAN.findall(plan))
+        if queryset.query.high_mark is not None and queryset.query.order_by == ("pk",) and "TEMP B-TREE" not in plan:
+            # A walk in rowid order that stops at the LIMIT: PostgreSQL's primary key index scan
+            scans.discard(queryset.model._meta.db_table)
+        return scans
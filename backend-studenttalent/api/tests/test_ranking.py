@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase
+
+from api.models import Experience, Profile, User
+from api.ranking import experience_months, refresh_open_ended_rankings
+
+
+class ExperienceMonthsTests(TestCase):
+    def test_overlaps_count_once(self):
+        ranges = [
+            (date(2023, 1, 1), date(2023, 7, 1), False),
+            (date(2023, 4, 1), date(2023, 10, 1), False),
+        ]
+        self.assertEqual(experience_months(ranges, date(2025, 1, 1)), 9)
+
+    def test_open_ended_runs_to_today(self):
+        ranges = [(date(2024, 1, 1), None, True)]
+        self.assertEqual(experience_months(ranges, date(2024, 6, 15)), 5)
+        self.assertEqual(experience_months(ranges, date(2024, 7, 1)), 6)
+
+    def test_open_ended_left_out_without_today(self):
+        ranges = [(date(2022, 1, 1), date(2022, 3, 1), False), (date(2024, 1, 1), None, True)]
+        self.assertEqual(experience_months(ranges, None), 2)
+
+
+class OpenEndedRefreshTests(TestCase):
+    def setUp(self):
+        self.current = Profile.objects.create(user=User.objects.create_user(email="current@example.com", password="pw"))
+        self.finished = Profile.objects.create(user=User.objects.create_user(email="finished@example.com", password="pw"))
+        with mock.patch("api.ranking.timezone.localdate", return_value=date(2024, 6, 15)):
+            Experience.objects.create(
+                profile=self.current, title="Engineer", company="Acme", start_date=date(2024, 1, 1), is_current=True
+            )
+            Experience.objects.create(
+                profile=self.finished, title="Intern", company="Acme",
+                start_date=date(2023, 1, 1), end_date=date(2023, 6, 1),
+            )
+
+    def test_refresh_counts_current_jobs_up_to_today(self):
+        self.current.refresh_from_db()
+        self.assertEqual(self.current.experience_months, 5)
+        score = self.current.ranking_score
+
+        with mock.patch("api.ranking.timezone.localdate", return_value=date(2024, 9, 1)):
+            self.assertEqual(refresh_open_ended_rankings(), 1)
+
+        self.current.refresh_from_db()
+        self.assertEqual(self.current.experience_months, 8)
+        self.assertGreater(self.current.ranking_score, score)
+        self.finished.refresh_from_db()
+        self.assertEqual(self.finished.experience_months, 5)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Profile, User
+from api.search import MIN_SIMILARITY, TrigramIndex, word_similarity
+
+
+def make_profile(email, first_name, last_name, nim, role="mahasiswa"):
+    user = User.objects.create_user(email=email, password="pw", first_name=first_name, last_name=last_name, role=role)
+    profile, _ = Profile.objects.get_or_create(user=user)
+    Profile.objects.filter(pk=profile.pk).update(nim=nim)
+    return profile
+
+
+class WordSimilarityTests(TestCase):
+    def test_matches_pg_trgm(self):
+        # Values from the pg_trgm documentation and SELECT word_similarity(...)
+        self.assertAlmostEqual(word_similarity("word", "two words"), 0.8)
+        self.assertAlmostEqual(word_similarity("pu", "putri ayu"), 2 / 3)
+        self.assertEqual(word_similarity("putri", "putri ayu"), 1.0)
+
+    def test_short_prefix_clears_the_threshold(self):
+        self.assertGreaterEqual(word_similarity("pu", "putri"), MIN_SIMILARITY)
+        self.assertLess(word_similarity("zz", "putri"), MIN_SIMILARITY)
+
+
+class TypeaheadTests(TestCase):
+    def setUp(self):
+        # Committing bumps the version, so the in-memory index used without pg_trgm rebuilds
+        with self.captureOnCommitCallbacks(execute=True):
+            self.putri = make_profile("putri@example.com", "Putri", "Ayu", "2201001")
+        self.client = APIClient()
+
+    def get(self, query):
+        return self.client.get("/api/profiles/typeahead/", {"q": query}, HTTP_USER_AGENT="Mozilla/5.0")
+
+    def test_nim_prefix_hidden_from_anonymous_callers(self):
+        response = self.get("2201")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"], [])
+
+    def test_nim_prefix_matches_for_admins(self):
+        self.client.force_authenticate(User.objects.create_user(email="admin@example.com", password="pw", role="admin"))
+        results = self.get("2201").json()["results"]
+        self.assertEqual([(row["id"], row["matched"], row["nim"]) for row in results], [(self.putri.pk, "nim", "2201001")])
+        self.assertEqual(self.get("2201")["Cache-Control"], "private, max-age=30")
+
+    def test_name_prefix_matches(self):
+        results = self.get("pu").json()["results"]
+        self.assertEqual([row["id"] for row in results], [self.putri.pk])
+        self.assertNotIn("nim", results[0])
+
+
+class TrigramIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.index = TrigramIndex()
+        self.putri = make_profile("putri@example.com", "Putri", "Ayu", "2201001")
+
+    def test_nim_needs_match_nim(self):
+        self.assertEqual(self.index.search("2201", 8), [])
+        self.assertEqual(self.index.search("2201", 8, match_nim=True), [(self.putri.pk, 1.0, "nim")])
+
+    def test_rebuilds_only_after_a_change(self):
+        self.assertEqual([pk for pk, _, _ in self.index.search("pu", 8)], [self.putri.pk])
+        with self.assertNumQueries(0):
+            # Only the version key in the cache is checked per keystroke
+            self.index.search("ay", 8)
+        self.assertEqual(self.index.search("bima", 8), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bima = make_profile("bima@example.com", "Bima", "Sakti", "2201002")
+        self.assertEqual([pk for pk, _, _ in self.index.search("bima", 8)], [bima.pk])
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+
+from api.models import Skill, SkillAlias
+from api.taxonomy import TAXONOMY_VERSION_KEY, resolve_or_create_skill
+
+
+class BuiltinAliasTests(TestCase):
+    def test_ambiguous_abbreviations_are_their_own_skills(self):
+        illustrator = Skill.objects.create(name="Adobe Illustrator")
+        Skill.objects.create(name="Adobe Photoshop")
+        self.assertEqual(resolve_or_create_skill("Illustrator"), illustrator)
+        self.assertNotEqual(resolve_or_create_skill("AI"), illustrator)
+        self.assertEqual(resolve_or_create_skill("PS").name, "PS")
+
+
+class TaxonomyVersionTests(TestCase):
+    def setUp(self):
+        cache.delete(TAXONOMY_VERSION_KEY)
+
+    def test_version_bumped_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            skill = Skill.objects.create(name="Django")
+            SkillAlias.objects.create(name="DRF", skill=skill)
+            self.assertIsNone(cache.get(TAXONOMY_VERSION_KEY))
+        self.assertIsNotNone(cache.get(TAXONOMY_VERSION_KEY))
+
+    def test_rolled_back_change_keeps_the_version(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Skill.objects.create(name="Flask")
+                transaction.set_rollback(True)
+        self.assertIsNone(cache.get(TAXONOMY_VERSION_KEY))
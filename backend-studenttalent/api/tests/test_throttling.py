@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+from api.middleware import ConcurrencyLimitMiddleware
+from api.throttling import AnonTokenBucketThrottle, ScopedWindowThrottle
+
+
+class ScopedView:
+    throttle_scope = "auth"
+
+
+class ThrottleTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 6000.0
+        self.request = RequestFactory().get("/api/auth/login/", REMOTE_ADDR="203.0.113.7")
+        self.request.user = None
+        # ScopedRateThrottle looks its rate up on every request
+        patcher = mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def throttle(self, throttle_class, rate):
+        SimpleRateThrottle.THROTTLE_RATES.update(auth=rate, anon=rate)
+        throttle = throttle_class()
+        throttle.timer = lambda: self.now
+        return throttle
+
+    def allowed(self, throttle_class, rate, times):
+        results = []
+        for _ in range(times):
+            throttle = self.throttle(throttle_class, rate)
+            results.append(throttle.allow_request(self.request, ScopedView()))
+        return results, throttle
+
+
+class TokenBucketTests(ThrottleTestCase):
+    def test_refill(self):
+        results, throttle = self.allowed(AnonTokenBucketThrottle, "2/min", 3)
+        self.assertEqual(results, [True, True, False])
+        self.assertAlmostEqual(throttle.wait(), 30)
+        self.now += 30
+        self.assertEqual(self.allowed(AnonTokenBucketThrottle, "2/min", 2)[0], [True, False])
+
+
+class WindowCounterTests(ThrottleTestCase):
+    def test_limit_holds_under_a_parallel_burst(self):
+        barrier = threading.Barrier(20)
+        results = []
+
+        def attempt():
+            throttle = self.throttle(ScopedWindowThrottle, "5/min")
+            barrier.wait()
+            results.append(throttle.allow_request(self.request, ScopedView()))
+
+        threads = [threading.Thread(target=attempt) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 5)
+
+    def test_previous_window_slides_out(self):
+        results, throttle = self.allowed(ScopedWindowThrottle, "4/min", 5)
+        self.assertEqual(results, [True] * 4 + [False])
+        self.assertAlmostEqual(throttle.wait(), 60)
+
+        # Halfway through the next minute half of the previous count still applies
+        self.now += 90
+        results, throttle = self.allowed(ScopedWindowThrottle, "4/min", 3)
+        self.assertEqual(results, [True, True, False])
+        # The next request fits once three quarters of the previous minute have slid out
+        self.assertAlmostEqual(throttle.wait(), 15)
+
+    def test_refusals_are_not_counted(self):
+        self.allowed(ScopedWindowThrottle, "2/min", 10)
+        self.now += 120
+        self.assertEqual(self.allowed(ScopedWindowThrottle, "2/min", 3)[0], [True, True, False])
+
+
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_429_with_retry_after(self):
+        client = APIClient()
+        with mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, {"auth": "3/min"}):
+            statuses = [
+                client.post("/api/auth/login/", {"email": "nobody@example.com", "password": "wrong"}, format="json")
+                for _ in range(4)
+            ]
+        self.assertEqual([response.status_code for response in statuses[:3]], [401] * 3)
+        self.assertEqual(statuses[3].status_code, 429)
+        self.assertGreaterEqual(int(statuses[3]["Retry-After"]), 1)
+
+
+@override_settings(MAX_CONCURRENT_REQUESTS=1, REQUEST_QUEUE_TIMEOUT=0.05, LOAD_SHEDDING_EXEMPT_PATHS=["/static/"])
+class ConcurrencyLimitTests(SimpleTestCase):
+    def setUp(self):
+        self.entered, self.release = threading.Event(), threading.Event()
+
+        def slow_view(request):
+            if request.path == "/api/slow/":
+                self.entered.set()
+                self.release.wait(5)
+            return HttpResponse("ok")
+
+        self.middleware = ConcurrencyLimitMiddleware(slow_view)
+        self.busy = threading.Thread(target=self.middleware, args=(RequestFactory().get("/api/slow/"),))
+        self.busy.start()
+        self.entered.wait(5)
+        self.addCleanup(self.busy.join)
+        self.addCleanup(self.release.set)
+
+    def test_503_when_no_slot_frees_up(self):
+        response = self.middleware(RequestFactory().get("/api/profiles/"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_exempt_paths_bypass_the_limit(self):
+        self.assertEqual(self.middleware(RequestFactory().get("/static/app.css")).status_code, 200)
+
+    def test_slot_is_released(self):
+        self.release.set()
+        self.busy.join()
+        self.assertEqual(self.middleware(RequestFactory().get("/api/profiles/")).status_code, 200)
+
+    @override_settings(MAX_CONCURRENT_REQUESTS=0)
+    def test_disabled_without_a_limit(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ConcurrencyLimitMiddleware(lambda request: HttpResponse())
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import Profile, ProfileSkill, Skill, SkillActivity, SkillEndorsement, User
+from api.trending import rebuild_skill_activity, trending_window
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class TrendingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.python, self.django, self.sql = (Skill.objects.create(name=name) for name in ("Python", "Django", "SQL"))
+        self.student = self.user("student")
+        self.profile, _ = Profile.objects.get_or_create(user=self.student)
+
+    def user(self, name):
+        return User.objects.create_user(email=f"{name}@example.com", password="pw")
+
+    def add_skill(self, skill, at):
+        return ProfileSkill.objects.create(profile=self.profile, skill=skill, created_at=at)
+
+    def endorse(self, profile_skill, endorser, at):
+        # created_at is auto_now_add
+        with mock.patch("django.utils.timezone.now", return_value=at):
+            return SkillEndorsement.objects.create(profile_skill=profile_skill, endorser=endorser)
+
+
+class RecordActivityTests(TrendingTestCase):
+    def buckets(self):
+        # Decrements leave empty buckets behind; the rebuild does not write them
+        rows = SkillActivity.objects.exclude(endorsements=0, additions=0)
+        return {
+            (row.skill_id, row.period, row.bucket_start): (row.endorsements, row.additions)
+            for row in rows
+        }
+
+    def test_incremental_buckets_match_rebuild(self):
+        # 17:30 UTC on Sunday is already Monday in Asia/Jakarta, the first day of a new week
+        sunday_evening = utc(2026, 3, 8, 17, 30)
+        python = self.add_skill(self.python, utc(2026, 3, 2, 9))
+        django = self.add_skill(self.django, sunday_evening)
+        sql = self.add_skill(self.sql, utc(2026, 3, 4, 9))
+        endorsers = [self.user(f"endorser{i}") for i in range(3)]
+        self.endorse(python, endorsers[0], utc(2026, 3, 3, 9))
+        self.endorse(python, endorsers[1], sunday_evening)
+        dropped = self.endorse(python, endorsers[2], utc(2026, 3, 10, 9))
+        self.endorse(django, endorsers[0], utc(2026, 3, 10, 9))
+        self.endorse(sql, endorsers[1], utc(2026, 3, 5, 9))
+
+        dropped.delete()
+        sql.delete()
+
+        incremental = self.buckets()
+        self.assertEqual(incremental[self.python.pk, "week", date(2026, 3, 2)], (1, 1))
+        self.assertEqual(incremental[self.python.pk, "week", date(2026, 3, 9)], (1, 0))
+        self.assertEqual(incremental[self.django.pk, "day", date(2026, 3, 9)], (0, 1))
+        self.assertFalse(any(skill_id == self.sql.pk for skill_id, _, _ in incremental))
+
+        rebuild_skill_activity()
+        self.assertEqual(self.buckets(), incremental)
+
+
+class TrendingWindowTests(TestCase):
+    @mock.patch("django.utils.timezone.localdate", return_value=date(2026, 3, 12))
+    def test_daily_buckets_up_to_31_days(self, localdate):
+        self.assertEqual(trending_window(7), ("day", date(2026, 3, 6), date(2026, 2, 27)))
+        self.assertEqual(trending_window(31), ("day", date(2026, 2, 10), date(2026, 1, 10)))
+
+    @mock.patch("django.utils.timezone.localdate", return_value=date(2026, 3, 12))
+    def test_weekly_buckets_beyond_31_days(self, localdate):
+        # Five whole weeks ending with the current one, which started on Monday 9 March
+        self.assertEqual(trending_window(32), ("week", date(2026, 2, 9), date(2026, 1, 5)))
+        self.assertEqual(trending_window(35), ("week", date(2026, 2, 9), date(2026, 1, 5)))
+        self.assertEqual(trending_window(36)[1], date(2026, 2, 2))
+
+
+class TrendingViewTests(TrendingTestCase):
+    def test_trending_response(self):
+        now = timezone.now()
+        python = self.add_skill(self.python, now)
+        django = self.add_skill(self.django, now)
+        self.add_skill(self.sql, now - timedelta(days=40))
+        first, second, third = (self.user(f"endorser{i}") for i in range(3))
+        self.endorse(python, first, now)
+        self.endorse(python, second, now)
+        self.endorse(python, third, now - timedelta(days=8))
+        self.endorse(django, first, now)
+
+        response = APIClient().get("/api/skills/trending/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "public, max-age=60")
+        payload = response.json()
+        self.assertEqual((payload["days"], payload["period"]), (7, "day"))
+        self.assertEqual(payload["since"], str(timezone.localdate() - timedelta(days=6)))
+        self.assertEqual(payload["results"], [
+            {"id": self.python.pk, "name": "Python", "endorsements": 2, "additions": 1, "previous_endorsements": 1},
+            {"id": self.django.pk, "name": "Django", "endorsements": 1, "additions": 1, "previous_endorsements": 0},
+        ])
+
+        payload = APIClient().get("/api/skills/trending/", {"days": 60, "limit": 5}).json()
+        self.assertEqual(payload["period"], "week")
+        self.assertEqual([row["name"] for row in payload["results"]], ["Python", "Django", "SQL"])
+        self.assertEqual(payload["results"][0]["endorsements"], 3)
+
+        self.assertEqual(APIClient().get("/api/skills/trending/", {"days": "week"}).status_code, 400)
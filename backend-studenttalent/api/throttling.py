@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from rest_framework.throttling import AnonRateThrottle, ScopedRateThrottle, SimpleRateThrottle, UserRateThrottle
+
+from . import metrics
+
+
+class MeteredThrottle(SimpleRateThrottle):
+    """Counts refusals per scope and reports the computed wait as Retry-After."""
+
+    def throttle_failure(self):
+        metrics.incr(f"throttled.{self.scope}")
+        return False
+
+    def wait(self):
+        return getattr(self, "wait_seconds", None)
+
+
+class TokenBucketThrottle(MeteredThrottle):
+    """
+    Token bucket variant of DRF's SimpleRateThrottle.
+
+    A rate of "N/period" gives a bucket of N tokens refilled continuously over the period.
+    Each client costs one small (tokens, timestamp) cache entry instead of a request history
+    list. The read-modify-write is not atomic, so a concurrent burst may let a few extra
+    requests through; fine for the broad per-client limits, not for the scoped ones
+    (see WindowCounterThrottle).
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        refill_per_second = self.num_requests / self.duration
+        tokens, stamp = self.cache.get(self.key, (self.num_requests, self.now))
+        tokens = min(self.num_requests, tokens + (self.now - stamp) * refill_per_second)
+
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) / refill_per_second
+            return self.throttle_failure()
+
+        self.cache.set(self.key, (tokens - 1, self.now), self.duration)
+        return True
+
+
+class WindowCounterThrottle(MeteredThrottle):
+    """
+    Sliding window counter kept with cache.add() and cache.incr() only.
+
+    Both are atomic in Redis and in the local-memory cache, so parallel requests each get
+    their own count and no more than N of them pass, however they are timed. The previous
+    window's count is weighted by how much of it still overlaps the last period. A refused
+    request is taken back off the count, so clients recover once they slow down.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, offset = divmod(self.now, self.duration)
+        elapsed = offset / self.duration
+        current_key = f"{self.key}:{int(window)}"
+        # Kept for the next window too, where it is the previous count
+        self.cache.add(current_key, 0, self.duration * 2)
+        try:
+            count = self.cache.incr(current_key)
+        except ValueError:
+            # Evicted between add() and incr()
+            self.cache.add(current_key, 1, self.duration * 2)
+            count = 1
+        previous = self.cache.get(f"{self.key}:{int(window) - 1}", 0)
+
+        if previous * (1 - elapsed) + count > self.num_requests:
+            self.cache.decr(current_key)
+            count -= 1
+            if previous and count < self.num_requests:
+                # Until enough of the previous window has slid out
+                self.wait_seconds = ((1 - (self.num_requests - count - 1) / previous) - elapsed) * self.duration
+            else:
+                self.wait_seconds = (1 - elapsed) * self.duration
+            self.wait_seconds = max(self.wait_seconds, 0)
+            return self.throttle_failure()
+        return True
+
+
+class AnonTokenBucketThrottle(AnonRateThrottle, TokenBucketThrottle):
+    """Per-IP limit for unauthenticated clients."""
+
+
+class UserTokenBucketThrottle(UserRateThrottle, TokenBucketThrottle):
+    """Per-user limit for authenticated clients (falls back to IP)."""
+
+
+class ScopedWindowThrottle(ScopedRateThrottle, WindowCounterThrottle):
+    """
+    Per-endpoint limit for views that declare a ``throttle_scope``. Exact under parallel
+    bursts, which is what the auth and register limits are for (credential stuffing).
+    """
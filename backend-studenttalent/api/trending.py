@@ -0,0 +1,139 @@
+"""
+Per-skill activity rollups backing /api/skills/trending/.
+
+SkillActivity keeps, per skill and per day / week, how many endorsements were given
+and how many profiles added the skill. api/signals.py updates the buckets as rows are
+inserted or deleted; rebuild_skill_activity() recomputes them from
+SkillEndorsement.created_at and ProfileSkill.created_at.
+"""
+from __future__ import annotations
+
+import math
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncWeek
+from django.utils import timezone
+
+from .models import ProfileSkill, Skill, SkillActivity, SkillEndorsement
+
+TRENDING_DAYS = 7
+MAX_TRENDING_DAYS = 365
+TRENDING_LIMIT = 10
+MAX_TRENDING_LIMIT = 50
+DAILY_BUCKET_MAX_DAYS = 31  # longer windows read weekly buckets
+
+
+def bucket_starts(at):
+    """(period, bucket_start) pairs a timestamp falls into."""
+    day = timezone.localdate(at)
+    return ("day", day), ("week", day - timedelta(days=day.weekday()))
+
+
+def record_activity(skill_id, at, endorsements=0, additions=0):
+    """Add to (or, with negative counts, take from) the skill's buckets for the time ``at``."""
+    if at is None or not (endorsements or additions):
+        return
+    for period, bucket_start in bucket_starts(at):
+        bucket = SkillActivity.objects.filter(skill_id=skill_id, period=period, bucket_start=bucket_start)
+        changes = {"endorsements": F("endorsements") + endorsements, "additions": F("additions") + additions}
+        if bucket.update(**changes) or (endorsements <= 0 and additions <= 0):
+            # Nothing to take from a bucket that does not exist (e.g. its skill is being deleted)
+            continue
+        try:
+            with transaction.atomic():
+                SkillActivity.objects.create(
+                    skill_id=skill_id,
+                    period=period,
+                    bucket_start=bucket_start,
+                    endorsements=endorsements,
+                    additions=additions,
+                )
+        except IntegrityError:
+            # Another writer created the bucket first
+            bucket.update(**changes)
+
+
+def record_additions(profile_skills):
+    """Count ProfileSkill rows inserted with bulk_create, which sends no signals."""
+    counts = Counter()
+    for profile_skill in profile_skills:
+        if profile_skill.created_at is not None:
+            counts[profile_skill.skill_id, profile_skill.created_at] += 1
+    for (skill_id, at), count in counts.items():
+        record_activity(skill_id, at, additions=count)
+
+
+def rebuild_skill_activity():
+    """Recompute every bucket from the source tables; returns the number of rows written."""
+    counts = Counter()
+    sources = (
+        ("endorsements", SkillEndorsement.objects.values(skill_id=F("profile_skill__skill_id"))),
+        ("additions", ProfileSkill.objects.filter(created_at__isnull=False).values("skill_id")),
+    )
+    for field, rows in sources:
+        for period, trunc in (("day", TruncDate), ("week", TruncWeek)):
+            grouped = rows.annotate(bucket=trunc("created_at")).values("skill_id", "bucket").annotate(count=Count("pk"))
+            for row in grouped.order_by().iterator():
+                bucket = row["bucket"]
+                bucket_start = bucket.date() if hasattr(bucket, "date") else bucket
+                counts[row["skill_id"], period, bucket_start, field] += row["count"]
+
+    buckets = {}
+    for (skill_id, period, bucket_start, field), count in counts.items():
+        bucket = buckets.setdefault(
+            (skill_id, period, bucket_start),
+            SkillActivity(skill_id=skill_id, period=period, bucket_start=bucket_start),
+        )
+        setattr(bucket, field, count)
+
+    with transaction.atomic():
+        SkillActivity.objects.all().delete()
+        SkillActivity.objects.bulk_create(buckets.values(), batch_size=1000)
+    return len(buckets)
+
+
+def trending_window(days, today=None):
+    """(period, start, previous_start) for the last ``days`` days, today included."""
+    today = today or timezone.localdate()
+    if days <= DAILY_BUCKET_MAX_DAYS:
+        start = today - timedelta(days=days - 1)
+        return "day", start, start - timedelta(days=days)
+    # Weekly buckets cover whole weeks, so the window is rounded up to them
+    weeks = math.ceil(days / 7)
+    start = today - timedelta(days=today.weekday()) - timedelta(weeks=weeks - 1)
+    return "week", start, start - timedelta(weeks=weeks)
+
+
+def trending_skills(days=TRENDING_DAYS, limit=TRENDING_LIMIT):
+    """Skills with the most endorsements (then additions) in the window, with the previous window's counts."""
+    days = max(1, min(days, MAX_TRENDING_DAYS))
+    limit = max(1, min(limit, MAX_TRENDING_LIMIT))
+    period, start, previous_start = trending_window(days)
+
+    current = Q(bucket_start__gte=start)
+    rows = list(
+        SkillActivity.objects.filter(period=period, bucket_start__gte=previous_start)
+        .values("skill_id")
+        .annotate(
+            window_endorsements=Coalesce(Sum("endorsements", filter=current), 0, output_field=IntegerField()),
+            window_additions=Coalesce(Sum("additions", filter=current), 0, output_field=IntegerField()),
+            previous_endorsements=Coalesce(Sum("endorsements", filter=~current), 0, output_field=IntegerField()),
+        )
+        .filter(Q(window_endorsements__gt=0) | Q(window_additions__gt=0))
+        .order_by("-window_endorsements", "-window_additions", "skill_id")[:limit]
+    )
+    names = dict(Skill.objects.filter(pk__in=[row["skill_id"] for row in rows]).values_list("pk", "name"))
+    results = [
+        {
+            "id": row["skill_id"],
+            "name": names.get(row["skill_id"], ""),
+            "endorsements": row["window_endorsements"],
+            "additions": row["window_additions"],
+            "previous_endorsements": row["previous_endorsements"],
+        }
+        for row in rows
+    ]
+    return {"days": days, "period": period, "since": start, "results": results}
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
@@ -7,13 +8,25 @@ from .views import (
     ProfileSkillViewSet,
     ExperienceViewSet,
     CustomTokenObtainPairView,
+    ThrottledTokenRefreshView,
     RegisterView,
     AdminStudentsView,
+    AdminStudentChangesView,
     AdminStudentDetailView,
     ProfilePhotoUploadView,
+    DirectUploadSignView,
+    DirectUploadConfirmView,
     SkillEndorsementView,
+    EndorsementSnapshotView,
+    MetricsView,
+    BatchView,
+    AdminProfileReportView,
+    SkillTrendingView,
+    SkillRelatedView,
+    SavedSearchViewSet,
+    AdminArchiveView,
+    AdminArchivedProfileView,
 )
-from rest_framework_simplejwt.views import TokenRefreshView
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
@@ -21,16 +34,40 @@ router.register(r'profiles', ProfileViewSet) # Public Talents accessible here
 router.register(r'skills', ProfileSkillViewSet, basename='user-skill') # User's skills
 router.register(r'all-skills', SkillViewSet) # List of all skills
 router.register(r'experiences', ExperienceViewSet)
+router.register(r'saved-searches', SavedSearchViewSet, basename='saved-search')
 
 urlpatterns = [
+    path('batch/', BatchView.as_view(), name='batch'),
+    path('profiles/<int:pk>/endorsements/stream/', EndorsementSnapshotView.as_view(), name='profile-endorsement-stream'),
     path('skills/endorse/', SkillEndorsementView.as_view(), name='skill-endorse'),
+    path('skills/trending/', SkillTrendingView.as_view(), name='skill-trending'),
+    path('skills/<int:skill_id>/related/', SkillRelatedView.as_view(), name='skill-related'),
     path('auth/login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('auth/refresh/', ThrottledTokenRefreshView.as_view(), name='token_refresh'),
     path('auth/register/', RegisterView.as_view(), name='auth_register'),
     # Admin endpoints
     path('admin/students/', AdminStudentsView.as_view(), name='admin-students'),
+    path('admin/students/changes/', AdminStudentChangesView.as_view(), name='admin-student-changes'),
     path('admin/students/<int:user_id>/', AdminStudentDetailView.as_view(), name='admin-student-detail'),
+    path('admin/archive/', AdminArchiveView.as_view(), name='admin-archive'),
+    path('admin/archive/<int:profile_id>/', AdminArchivedProfileView.as_view(), name='admin-archived-profile'),
+    path('admin/metrics/', MetricsView.as_view(), name='admin-metrics'),
+    path('admin/profiles/<str:report_id>/', AdminProfileReportView.as_view(), name='admin-profile-report'),
     path('users/me/photo/', ProfilePhotoUploadView.as_view(), name='user-photo-upload'),
     path('profiles/upload-photo/', ProfilePhotoUploadView.as_view(), name='profile-photo-upload'),
+    path('uploads/sign/', DirectUploadSignView.as_view(), name='upload-sign'),
+    path('uploads/confirm/', DirectUploadConfirmView.as_view(), name='upload-confirm'),
     path('', include(router.urls)),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    # ASGI mode: async handlers take precedence for the public reads and the photo upload
+    from . import async_views
+
+    urlpatterns = [
+        path('profiles/', async_views.profile_list, name='profile-list-async'),
+        path('profiles/<int:pk>/', async_views.profile_detail, name='profile-detail-async'),
+        path('profiles/<int:pk>/endorsements/stream/', async_views.endorsement_stream, name='profile-endorsement-stream-async'),
+        path('users/me/photo/', async_views.photo_upload, name='user-photo-upload-async'),
+        path('profiles/upload-photo/', async_views.photo_upload, name='profile-photo-upload-async'),
+    ] + urlpatterns
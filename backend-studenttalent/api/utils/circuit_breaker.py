@@ -0,0 +1,131 @@
+"""
+Circuit breaker for slow or failing external dependencies.
+
+Each worker keeps a rolling window of recent calls. When at least <PREFIX>_MIN_CALLS calls
+were made in the last <PREFIX>_WINDOW_SECONDS and the share of failed or slow ones
+(slower than <PREFIX>_SLOW_CALL_SECONDS) reaches <PREFIX>_FAILURE_RATE, the circuit opens.
+The open state lives in the cache, so one worker tripping it makes every worker fail fast
+for <PREFIX>_OPEN_SECONDS. After that a single call across all workers is let through as a
+half-open probe: success closes the circuit, failure opens it again.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .. import metrics
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the dependency while its circuit is open."""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"{name} is unavailable; retry in {retry_after}s.")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, settings_prefix: str):
+        self.name = name
+        self.settings_prefix = settings_prefix
+        self._key = f"circuit:{name}"
+        self._probe_key = f"circuit:{name}:probe"
+        self._calls: deque[tuple[float, bool]] = deque()
+        self._lock = threading.Lock()
+
+    def _setting(self, name):
+        return getattr(settings, f"{self.settings_prefix}_{name}")
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpenError while open; returns True if this call is the half-open probe."""
+        state = cache.get(self._key)
+        if not state or state["state"] != OPEN:
+            return False
+        remaining = state["until"] - time.time()
+        if remaining > 0:
+            metrics.incr(f"circuit.{self.name}.rejected")
+            raise CircuitOpenError(self.name, max(int(remaining), 1))
+        # The probe slot expires on its own if the probing worker dies mid-call
+        if not cache.add(self._probe_key, 1, timeout=int(self._setting("OPEN_SECONDS")) or 1):
+            metrics.incr(f"circuit.{self.name}.rejected")
+            raise CircuitOpenError(self.name, 1)
+        return True
+
+    def record(self, ok: bool, seconds: float, probe: bool = False) -> None:
+        """Report the outcome of a call that before_call() let through."""
+        failed = not ok or seconds >= self._setting("SLOW_CALL_SECONDS")
+        if probe:
+            cache.delete(self._probe_key)
+            if failed:
+                self._open("half-open probe failed")
+            else:
+                self._close()
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            self._calls.append((now, failed))
+            while self._calls and self._calls[0][0] < now - self._setting("WINDOW_SECONDS"):
+                self._calls.popleft()
+            calls = len(self._calls)
+            failures = sum(1 for _, call_failed in self._calls if call_failed)
+        if failed and calls >= self._setting("MIN_CALLS") and failures / calls >= self._setting("FAILURE_RATE"):
+            self._open(f"{failures}/{calls} calls failed or were slow")
+
+    def _open(self, reason):
+        now = time.time()
+        with self._lock:
+            self._calls.clear()
+        cache.set(self._key, {
+            "state": OPEN,
+            "since": now,
+            "until": now + self._setting("OPEN_SECONDS"),
+            "reason": reason,
+        }, timeout=None)
+        metrics.incr(f"circuit.{self.name}.opened")
+
+    def _close(self):
+        with self._lock:
+            self._calls.clear()
+        cache.set(self._key, {"state": CLOSED, "since": time.time()}, timeout=None)
+        metrics.incr(f"circuit.{self.name}.closed")
+
+    def state(self) -> dict:
+        """Shared state for metrics: closed, open (with the remaining seconds) or half_open."""
+        state = dict(cache.get(self._key) or {"state": CLOSED, "since": None})
+        if state["state"] == OPEN:
+            remaining = state.pop("until") - time.time()
+            if remaining <= 0:
+                state["state"] = HALF_OPEN
+            else:
+                state["retry_after"] = max(int(remaining), 1)
+        with self._lock:
+            state["window_calls"] = len(self._calls)
+            state["window_failures"] = sum(1 for _, failed in self._calls if failed)
+        return state
+
+    def reset(self) -> None:
+        cache.delete_many([self._key, self._probe_key])
+        with self._lock:
+            self._calls.clear()
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str, settings_prefix: str) -> CircuitBreaker:
+    """Process-wide breaker for a dependency, created on first use."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers.setdefault(name, CircuitBreaker(name, settings_prefix))
+    return breaker
+
+
+def breaker_states() -> dict[str, dict]:
+    return {name: breaker.state() for name, breaker in sorted(_breakers.items())}
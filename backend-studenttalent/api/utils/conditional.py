@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+
+from django.db.models import Count, Max, Sum
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+# Aggregates that change whenever any profile in a listing changes, appears or disappears
+LIST_VALIDATOR_AGGREGATES = {
+    "rows": Count("pk"),
+    "max_pk": Max("pk"),
+    "versions": Sum("content_version"),
+    # Flushed view counts are in the payload but do not bump content_version or updated_at
+    "views": Sum("views_total"),
+    "last_modified": Max("updated_at"),
+}
+
+
+def _viewer(request):
+    user = getattr(request, "user", None)
+    # endorsed_by_me makes the payload viewer specific
+    return f"u{user.pk}" if user is not None and user.is_authenticated else "anon"
+
+
+def detail_validators(request, profile_id, content_version, updated_at, views_total):
+    etag = quote_etag(f"{profile_id}-{content_version}-{views_total}-{_viewer(request)}")
+    return etag, updated_at
+
+
+def list_validators(request, aggregates):
+    fingerprint = "|".join(
+        str(part)
+        for part in (
+            aggregates["rows"],
+            aggregates["max_pk"],
+            aggregates["versions"],
+            aggregates["views"],
+            aggregates["last_modified"],
+            request.META.get("QUERY_STRING", ""),
+            _viewer(request),
+        )
+    )
+    etag = quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+    return etag, aggregates["last_modified"]
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_vary_headers(response, ("Authorization",))
+    return response
+
+
+def not_modified_response(request, etag, last_modified):
+    """Return a 304 (or 412) response if the client's ETag still matches, else None.
+
+    Last-Modified is sent but If-Modified-Since is not honoured: a view count flush changes
+    the payload without moving updated_at, so only the ETag notices it.
+    """
+    validators = set_validators(HttpResponse(), etag, last_modified)
+    response = get_conditional_response(request, etag=etag, response=validators)
+    # get_conditional_response hands back the response it was given when nothing matched
+    return None if response is validators else response
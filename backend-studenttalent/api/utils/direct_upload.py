@@ -0,0 +1,195 @@
+"""
+Direct-to-storage uploads: the client sends file bytes straight to the bucket.
+
+sign_upload() hands out a short-lived upload target plus a signed upload id;
+confirm_upload() checks that the object exists and meets the size / content-type limits
+before the caller records it. Two backends are supported:
+
+* S3 (USE_SUPABASE_STORAGE, i.e. the S3-compatible endpoint behind django-storages):
+  a presigned POST whose policy enforces key, content type and size at the storage.
+* Supabase Storage REST: a signed upload URL for a PUT. Supabase cannot bind size or
+  content type to the URL, so confirm_upload() enforces them and deletes offenders.
+
+Objects that are uploaded but never confirmed are collected by gc_storage_objects.
+"""
+from __future__ import annotations
+
+import time
+import uuid
+
+from django.conf import settings
+from django.core import signing
+
+from .supabase_storage import (
+    IMMUTABLE_CACHE_CONTROL,
+    PHOTO_PREFIX,
+    SupabaseStorageError,
+    _auth_headers,
+    _guard,
+    _require_configuration,
+    storage_breaker,
+    storage_request,
+)
+
+UPLOAD_ID_SALT = "api.direct-upload"
+PROJECT_PREFIX = "projects/"
+EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/gif": ".gif"}
+
+
+class DirectUploadError(SupabaseStorageError):
+    """Raised for uploads the client got wrong; storage failures raise SupabaseStorageError."""
+
+
+class S3Backend:
+    name = "s3"
+
+    def __init__(self):
+        from django.core.files.storage import storages
+
+        self.storage = storages["default"]
+        self.client = self.storage.connection.meta.client
+        self.bucket = self.storage.bucket_name
+
+    def sign(self, key, content_type, max_bytes, expires):
+        fields = {"Content-Type": content_type, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+        conditions = [
+            {"Content-Type": content_type},
+            {"Cache-Control": IMMUTABLE_CACHE_CONTROL},
+            ["content-length-range", 1, max_bytes],
+        ]
+        acl = getattr(settings, "AWS_DEFAULT_ACL", None)
+        if acl:
+            fields["acl"] = acl
+            conditions.append({"acl": acl})
+        post = self.client.generate_presigned_post(
+            Bucket=self.bucket, Key=key, Fields=fields, Conditions=conditions, ExpiresIn=expires
+        )
+        return {"method": "POST", "url": post["url"], "fields": post["fields"], "headers": {}}
+
+    def stat(self, key):
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        probe = _guard()
+        started = time.monotonic()
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as exc:
+            status_code = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 500)
+            storage_breaker.record(status_code < 500, time.monotonic() - started, probe)
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise SupabaseStorageError(f"Storage check failed: {exc}") from exc
+        except BotoCoreError as exc:
+            storage_breaker.record(False, time.monotonic() - started, probe)
+            raise SupabaseStorageError(f"Storage check failed: {exc}") from exc
+        storage_breaker.record(True, time.monotonic() - started, probe)
+        return head["ContentLength"], head.get("ContentType", "")
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def public_url(self, key):
+        if settings.SUPABASE_PUBLIC_STORAGE_URL:
+            return f"{settings.SUPABASE_PUBLIC_STORAGE_URL}/{key}"
+        return self.storage.url(key)
+
+
+class SupabaseBackend:
+    name = "supabase"
+
+    def __init__(self):
+        _require_configuration()
+        self.bucket = settings.SUPABASE_PROFILE_BUCKET
+
+    def _object_url(self, key):
+        return f"{settings.SUPABASE_STORAGE_URL}/object/{self.bucket}/{key}"
+
+    def sign(self, key, content_type, max_bytes, expires):
+        response = storage_request(
+            "POST",
+            f"{settings.SUPABASE_STORAGE_URL}/object/upload/sign/{self.bucket}/{key}",
+            headers=_auth_headers(),
+        )
+        if response.status_code >= 400:
+            raise SupabaseStorageError(f"Supabase signing failed ({response.status_code}): {response.text.strip()}")
+        return {
+            "method": "PUT",
+            "url": f"{settings.SUPABASE_STORAGE_URL}{response.json()['url']}",
+            "fields": {},
+            "headers": {"Content-Type": content_type, "Cache-Control": IMMUTABLE_CACHE_CONTROL},
+        }
+
+    def stat(self, key):
+        response = storage_request("HEAD", self._object_url(key), headers=_auth_headers())
+        if response.status_code in (400, 404):
+            return None
+        if response.status_code >= 400:
+            raise SupabaseStorageError(f"Supabase check failed ({response.status_code})")
+        return int(response.headers.get("Content-Length", 0)), response.headers.get("Content-Type", "")
+
+    def delete(self, key):
+        from .supabase_storage import delete_objects
+
+        delete_objects([key])
+
+    def public_url(self, key):
+        return f"{settings.SUPABASE_PUBLIC_STORAGE_URL}/{key}"
+
+
+def get_backend():
+    if settings.USE_SUPABASE_STORAGE:
+        return S3Backend()
+    return SupabaseBackend()
+
+
+def sign_upload(user_id, target, content_type, size, project_id=None):
+    """Upload instructions for the client: {upload_id, method, url, fields, headers, ...}."""
+    if content_type not in settings.DIRECT_UPLOAD_CONTENT_TYPES:
+        raise DirectUploadError(f"Unsupported content type {content_type!r}.")
+    max_bytes = settings.DIRECT_UPLOAD_MAX_BYTES
+    if size is not None and not 0 < size <= max_bytes:
+        raise DirectUploadError(f"Files must be between 1 byte and {max_bytes} bytes.")
+
+    backend = get_backend()
+    if target == "project_image" and backend.name != "s3":
+        # Project.image is a FileField on the default storage, which is only the bucket in S3 mode
+        raise DirectUploadError("Direct project image uploads need S3 storage (USE_SUPABASE_STORAGE).")
+    prefix = PHOTO_PREFIX if target == "photo" else PROJECT_PREFIX
+    # Random keys are never rewritten, so the immutable Cache-Control still holds
+    key = f"{prefix}{uuid.uuid4().hex}{EXTENSIONS.get(content_type, '')}"
+    expires = settings.DIRECT_UPLOAD_URL_TTL
+    instructions = backend.sign(key, content_type, max_bytes, expires)
+    upload_id = signing.dumps(
+        {"u": user_id, "t": target, "p": project_id, "k": key, "c": content_type, "b": backend.name},
+        salt=UPLOAD_ID_SALT,
+        compress=True,
+    )
+    return {"upload_id": upload_id, "key": key, "expires_in": expires, "max_bytes": max_bytes, **instructions}
+
+
+def load_upload_id(upload_id, user_id):
+    """The signed upload description, if it is valid, unexpired and belongs to user_id."""
+    try:
+        # Confirming may take a little longer than the upload URL lives
+        upload = signing.loads(upload_id, salt=UPLOAD_ID_SALT, max_age=settings.DIRECT_UPLOAD_URL_TTL * 2)
+    except signing.BadSignature:
+        raise DirectUploadError("Invalid or expired upload id.")
+    if upload["u"] != user_id:
+        raise DirectUploadError("Invalid or expired upload id.")
+    return upload
+
+
+def confirm_upload(upload):
+    """Check the uploaded object against the signed limits; returns its public URL / storage key."""
+    backend = get_backend()
+    if backend.name != upload["b"]:
+        raise DirectUploadError("Storage backend changed since the upload was signed.")
+    key = upload["k"]
+    stat = backend.stat(key)
+    if stat is None:
+        raise DirectUploadError("The file has not been uploaded yet.")
+    size, content_type = stat
+    if size > settings.DIRECT_UPLOAD_MAX_BYTES or content_type.split(";")[0].strip() != upload["c"]:
+        backend.delete(key)
+        raise DirectUploadError("The uploaded file does not match the signed size or content type.")
+    return backend.public_url(key), key
@@ -1,52 +1,305 @@
 from __future__ import annotations
 
-import uuid
+import hashlib
+import json
+import logging
+import os
+import time
 from pathlib import Path
 from typing import IO
 
-import requests
 from django.conf import settings
 
+from .. import metrics
+from .circuit_breaker import CircuitOpenError, get_breaker
 
-class SupabaseUploadError(Exception):
+logger = logging.getLogger(__name__)
+
+
+class SupabaseStorageError(Exception):
+    """Raised when a Supabase Storage request fails."""
+
+
+class SupabaseUploadError(SupabaseStorageError):
     """Raised when Supabase Storage upload fails."""
 
 
-def _build_target_path(filename: str) -> str:
-    extension = Path(filename).suffix
-    return f"profile-photos/{uuid.uuid4().hex}{extension}"
+class StorageUnavailableError(SupabaseUploadError):
+    """Raised without calling Supabase while the storage circuit is open."""
 
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
 
-def upload_profile_photo(file_obj: IO[bytes]) -> str:
-    """Upload file to Supabase Storage using the service-role key."""
+
+# Every Supabase Storage call goes through this breaker (see circuit_breaker.py)
+storage_breaker = get_breaker("storage", "STORAGE_BREAKER")
+
+
+PHOTO_PREFIX = "profile-photos/"
+# Keys are content hashes, so an object never changes once written
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _build_target_path(filename: str, data: bytes) -> str:
+    extension = Path(filename).suffix.lower()
+    return f"{PHOTO_PREFIX}{hashlib.sha256(data).hexdigest()}{extension}"
+
+
+def _require_configuration():
     if not settings.SUPABASE_STORAGE_URL or not settings.SUPABASE_SERVICE_ROLE_KEY:
         raise SupabaseUploadError(
             "Supabase storage is not configured. Please set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY."
         )
 
-    bucket = settings.SUPABASE_PROFILE_BUCKET
-    key = _build_target_path(file_obj.name)
-    upload_url = f"{settings.SUPABASE_STORAGE_URL}/object/{bucket}/{key}"
-    headers = {
+
+def _auth_headers() -> dict:
+    return {
         "apikey": settings.SUPABASE_SERVICE_ROLE_KEY,
         "Authorization": f"Bearer {settings.SUPABASE_SERVICE_ROLE_KEY}",
-        "Content-Type": getattr(file_obj, "content_type", "application/octet-stream"),
     }
+
+
+def _timeout() -> tuple[float, float]:
+    return settings.STORAGE_CONNECT_TIMEOUT, settings.STORAGE_READ_TIMEOUT
+
+
+def _guard() -> bool:
+    try:
+        return storage_breaker.before_call()
+    except CircuitOpenError as exc:
+        raise StorageUnavailableError(f"Storage is temporarily unavailable; {exc}", exc.retry_after) from exc
+
+
+def storage_request(method: str, url: str, **kwargs):
+    """requests call to Supabase Storage through the circuit breaker; 5xx and slow responses count as failures."""
+    import requests
+
+    probe = _guard()
+    started = time.monotonic()
+    try:
+        response = requests.request(method, url, timeout=_timeout(), **kwargs)
+    except requests.RequestException as exc:
+        storage_breaker.record(False, time.monotonic() - started, probe)
+        raise SupabaseStorageError(f"Supabase request failed: {exc}") from exc
+    storage_breaker.record(response.status_code < 500, time.monotonic() - started, probe)
+    return response
+
+
+async def storage_request_async(method: str, url: str, **kwargs):
+    """httpx variant of storage_request() for the ASGI views."""
+    import httpx
+
+    probe = _guard()
+    started = time.monotonic()
+    connect, read = _timeout()
+    try:
+        async with httpx.AsyncClient(timeout=httpx.Timeout(read, connect=connect)) as client:
+            response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError as exc:
+        storage_breaker.record(False, time.monotonic() - started, probe)
+        raise SupabaseStorageError(f"Supabase request failed: {exc}") from exc
+    storage_breaker.record(response.status_code < 500, time.monotonic() - started, probe)
+    return response
+
+
+def _upload_request(key: str, content_type: str) -> tuple[str, str, dict, dict]:
+    _require_configuration()
+    upload_url = f"{settings.SUPABASE_STORAGE_URL}/object/{settings.SUPABASE_PROFILE_BUCKET}/{key}"
+    headers = {
+        **_auth_headers(),
+        "Content-Type": content_type,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+    }
+    # Re-uploading identical bytes rewrites the same object, which also refreshes its
+    # updated_at so gc_storage_objects does not collect it while it is being reused
     params = {
-        "cacheControl": "3600",
-        "upsert": "false",
+        "cacheControl": "31536000",
+        "upsert": "true",
     }
+    return key, upload_url, headers, params
+
+
+def _prepare_upload(file_obj: IO[bytes]) -> tuple[str, str, dict, dict, bytes]:
+    _require_configuration()
+    data = file_obj.read()
+    key = _build_target_path(file_obj.name, data)
+    _, upload_url, headers, params = _upload_request(key, getattr(file_obj, "content_type", "application/octet-stream"))
+    return key, upload_url, headers, params, data
 
-    response = requests.post(upload_url, headers=headers, params=params, data=file_obj.read(), timeout=30)
-    if not response.ok:
+
+def _public_url(key: str, response) -> str:
+    if response.status_code >= 400:
         detail = ""
         try:
             detail = response.json()
         except ValueError:
-            detail = response.text.strip() or response.reason
+            detail = response.text.strip() or getattr(response, "reason", None) or getattr(response, "reason_phrase", "")
         raise SupabaseUploadError(f"Supabase upload failed ({response.status_code}): {detail}")
 
     if not settings.SUPABASE_PUBLIC_STORAGE_URL:
         raise SupabaseUploadError("Supabase public storage URL is not configured.")
 
     return f"{settings.SUPABASE_PUBLIC_STORAGE_URL}/{key}"
+
+
+def storage_key_from_url(url: str | None) -> str | None:
+    """Object key of a public URL in the profile bucket, or None for anything else."""
+    prefix = f"{settings.SUPABASE_PUBLIC_STORAGE_URL}/"
+    if not url or not settings.SUPABASE_PUBLIC_STORAGE_URL or not url.startswith(prefix):
+        return None
+    return url[len(prefix):].split("?", 1)[0]
+
+
+def list_objects(prefix: str, page_size: int = 1000):
+    """Yield (key, updated_at) for every object under ``prefix`` in the profile bucket."""
+    _require_configuration()
+    folder = prefix.rstrip("/")
+    list_url = f"{settings.SUPABASE_STORAGE_URL}/object/list/{settings.SUPABASE_PROFILE_BUCKET}"
+    offset = 0
+    while True:
+        response = storage_request(
+            "POST",
+            list_url,
+            headers=_auth_headers(),
+            json={"prefix": folder, "limit": page_size, "offset": offset, "sortBy": {"column": "name", "order": "asc"}},
+        )
+        if response.status_code >= 400:
+            raise SupabaseStorageError(f"Supabase list failed ({response.status_code}): {response.text.strip()}")
+        entries = response.json()
+        for entry in entries:
+            # Folders come back without an id
+            if entry.get("id"):
+                yield f"{folder}/{entry['name']}", entry.get("updated_at") or entry.get("created_at")
+        if len(entries) < page_size:
+            return
+        offset += page_size
+
+
+def delete_objects(keys: list[str]) -> None:
+    _require_configuration()
+    response = storage_request(
+        "DELETE",
+        f"{settings.SUPABASE_STORAGE_URL}/object/{settings.SUPABASE_PROFILE_BUCKET}",
+        headers=_auth_headers(),
+        json={"prefixes": keys},
+    )
+    if response.status_code >= 400:
+        raise SupabaseStorageError(f"Supabase delete failed ({response.status_code}): {response.text.strip()}")
+
+
+# Spooled uploads that Supabase refused (4xx) are moved here for a person to look at
+SPOOL_REJECTED_DIR = "rejected"
+
+
+def _spool_paths(key: str) -> tuple[Path, Path]:
+    data_path = Path(settings.STORAGE_SPOOL_DIR) / key.replace("/", "__")
+    return data_path, data_path.with_name(f"{data_path.name}.json")
+
+
+def _reject_spooled(data_path: Path, meta_path: Path) -> None:
+    rejected = data_path.parent / SPOOL_REJECTED_DIR
+    rejected.mkdir(exist_ok=True)
+    # Metadata last: spooled_uploads() lists those, so the entry leaves the spool in one rename
+    if data_path.exists():
+        os.replace(data_path, rejected / data_path.name)
+    os.replace(meta_path, rejected / meta_path.name)
+
+
+def spool_upload(key: str, content_type: str, data: bytes) -> None:
+    """Keep an upload on local disk until replay_spool() can send it."""
+    data_path, meta_path = _spool_paths(key)
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+    for path, content in ((data_path, data), (meta_path, json.dumps({"key": key, "content_type": content_type}).encode())):
+        # The metadata file is written last, so replay never picks up a half-written upload
+        partial = path.with_name(f"{path.name}.partial")
+        partial.write_bytes(content)
+        os.replace(partial, path)
+    metrics.incr("storage.spooled")
+
+
+def spooled_uploads() -> list[dict]:
+    """Spooled uploads waiting for replay, oldest first."""
+    directory = Path(settings.STORAGE_SPOOL_DIR or "")
+    if not settings.STORAGE_SPOOL_DIR or not directory.is_dir():
+        return []
+    entries = []
+    for meta_path in sorted(directory.glob("*.json"), key=lambda path: path.stat().st_mtime):
+        entries.append(json.loads(meta_path.read_text()))
+    return entries
+
+
+def replay_spool(limit: int | None = None) -> tuple[int, int, int]:
+    """
+    Upload spooled files to Supabase; returns (replayed, rejected, still spooled).
+
+    Stops while the circuit is open. Uploads Supabase refuses with a 4xx would fail on every
+    run, so they are moved to the rejected/ folder instead of blocking the ones behind them;
+    5xx responses and network errors leave the upload spooled for the next run.
+    """
+    entries = spooled_uploads()
+    replayed = rejected = 0
+    for entry in entries[:limit]:
+        data_path, meta_path = _spool_paths(entry["key"])
+        if not data_path.exists():
+            logger.error("Spooled upload %s has no data file; moved to %s/", entry["key"], SPOOL_REJECTED_DIR)
+            _reject_spooled(data_path, meta_path)
+            rejected += 1
+            continue
+        _, upload_url, headers, params = _upload_request(entry["key"], entry["content_type"])
+        try:
+            response = storage_request("POST", upload_url, headers=headers, params=params, data=data_path.read_bytes())
+        except StorageUnavailableError:
+            break
+        except SupabaseStorageError as exc:
+            logger.warning("Replaying spooled upload %s failed: %s", entry["key"], exc)
+            continue
+        if response.status_code >= 500:
+            logger.warning("Replaying spooled upload %s failed (%s)", entry["key"], response.status_code)
+            continue
+        if response.status_code >= 400:
+            logger.error("Supabase refused spooled upload %s (%s); moved to %s/", entry["key"], response.status_code, SPOOL_REJECTED_DIR)
+            _reject_spooled(data_path, meta_path)
+            rejected += 1
+            metrics.incr("storage.spool_rejected")
+            continue
+        meta_path.unlink()
+        data_path.unlink(missing_ok=True)
+        replayed += 1
+        metrics.incr("storage.spool_replayed")
+    return replayed, rejected, len(entries) - replayed - rejected
+
+
+def _finish_upload(key: str, headers: dict, data: bytes, response=None, error: Exception | None = None) -> str:
+    """Public URL for a finished upload; storage failures are spooled when STORAGE_SPOOL_DIR is set."""
+    if response is not None and response.status_code < 500:
+        return _public_url(key, response)
+    if settings.STORAGE_SPOOL_DIR and settings.SUPABASE_PUBLIC_STORAGE_URL:
+        # The key is a content hash, so the final URL is known before the object exists
+        spool_upload(key, headers["Content-Type"], data)
+        return f"{settings.SUPABASE_PUBLIC_STORAGE_URL}/{key}"
+    if isinstance(error, SupabaseUploadError):
+        raise error
+    if error is not None:
+        raise SupabaseUploadError(str(error)) from error
+    return _public_url(key, response)
+
+
+def upload_profile_photo(file_obj: IO[bytes]) -> str:
+    """Upload file to Supabase Storage using the service-role key."""
+    key, upload_url, headers, params, data = _prepare_upload(file_obj)
+    try:
+        response = storage_request("POST", upload_url, headers=headers, params=params, data=data)
+    except SupabaseStorageError as exc:
+        return _finish_upload(key, headers, data, error=exc)
+    return _finish_upload(key, headers, data, response)
+
+
+async def upload_profile_photo_async(file_obj: IO[bytes]) -> str:
+    """Async variant for the ASGI views; the worker keeps serving other requests during the round-trip."""
+    key, upload_url, headers, params, data = _prepare_upload(file_obj)
+    try:
+        response = await storage_request_async("POST", upload_url, headers=headers, params=params, content=data)
+    except SupabaseStorageError as exc:
+        return _finish_upload(key, headers, data, error=exc)
+    return _finish_upload(key, headers, data, response)
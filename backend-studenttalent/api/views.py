@@ -1,13 +1,128 @@
-from rest_framework import viewsets, permissions, filters, status, serializers
+import json
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from rest_framework import generics, viewsets, permissions, status, serializers
 from rest_framework.decorators import action
+from rest_framework.renderers import BaseRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import User, Profile, Skill, ProfileSkill, Experience, Project, SkillEndorsement
-from .serializers import UserSerializer, ProfileSerializer, SkillSerializer, ProfileSkillSerializer, ExperienceSerializer, ProjectSerializer, CustomTokenObtainPairSerializer
-from .utils.supabase_storage import SupabaseUploadError, upload_profile_photo
+from .models import User, Profile, Skill, ProfileSkill, Experience, Project, SkillEndorsement, SavedSearch, ArchivedProfile
+from .serializers import UserSerializer, ProfileSerializer, ProfileEditSerializer, SkillSerializer, ProfileSkillSerializer, ExperienceSerializer, ProjectSerializer, CustomTokenObtainPairSerializer, BatchSerializer, SavedSearchSerializer, ArchivedProfileSerializer
+from . import metrics
+from .archive import ArchiveError, archive_profile, archived_detail, get_or_restore_profile, restore_profile
+from .batch import run_subrequest
+from .change_feed import feed_response_data
+from .cooccurrence import RELATED_LIMIT, related_skills
+from .documents import document_rows, render_documents
+from .json_engine import engine_enabled, stream_payloads
+from .percolator import MATCH_PAGE_LIMIT, matches_page, percolate_profile, refresh_search
+from .profile_views import daily_views, record_view
+from .profiling import load_report
+from .db_router import replica_reads
+from .ranking import PROFILE_ORDERINGS
+from .search import TYPEAHEAD_LIMIT, typeahead
+from .signals import endorsement_counts, touch_profile
+from .taxonomy import SkillFilter, TalentSearchFilter, resolve_or_create_skill
+from .trending import TRENDING_DAYS, TRENDING_LIMIT, trending_skills
+from .utils.conditional import (
+    LIST_VALIDATOR_AGGREGATES,
+    detail_validators,
+    list_validators,
+    not_modified_response,
+    set_validators,
+)
+from .utils.direct_upload import DirectUploadError, confirm_upload, load_upload_id, sign_upload
+from .utils.circuit_breaker import breaker_states
+from .utils.supabase_storage import (
+    StorageUnavailableError,
+    SupabaseStorageError,
+    SupabaseUploadError,
+    delete_objects,
+    storage_key_from_url,
+    upload_profile_photo,
+)
+
+logger = logging.getLogger(__name__)
+
+
+PHOTO_FIELDS = ("file", "photo", "avatar", "photo_profile")
+EDITOR_DIFF_FIELDS = ("skills", "experiences", "projects", "portfolio")
+FEATURED_TALENTS_LIMIT = 6
+PROFILE_VIEW_STATS_DAYS = 30
+PROFILE_PREFETCH = (
+    'profile_skills__skill',
+    'profile_skills__endorsements',
+    'experiences',
+    'projects',
+    'portfolio_links',
+)
+
+
+def public_profile_queryset(ordering=None):
+    """Active student profiles with everything ProfileSerializer renders prefetched."""
+    return (
+        Profile.objects.select_related('user')
+        .prefetch_related(*PROFILE_PREFETCH)
+        .exclude(user__role='admin')
+        .filter(is_active=True)
+        .order_by(*PROFILE_ORDERINGS.get(ordering, ('pk',)))
+    )
+
+
+def storage_error_response(exc):
+    """502 for a failed storage call; 503 with Retry-After while the storage circuit is open."""
+    if isinstance(exc, StorageUnavailableError):
+        return Response(
+            {"detail": str(exc)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    return Response({"detail": str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
+
+
+def discard_unreferenced_photo(url):
+    """Delete an uploaded photo whose profile write failed, unless another user already uses the same object."""
+    key = storage_key_from_url(url)
+    if key is None or User.objects.filter(photo_profile=url).exists():
+        return
+    try:
+        delete_objects([key])
+    except SupabaseStorageError:
+        # gc_storage_objects collects it later
+        logger.warning("Could not delete orphaned upload %s", key, exc_info=True)
+
+
+def sse_event(event, data):
+    """One Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class ReplicaReadMixin:
+    """Serve safe reads of the listed actions from a read replica (see api/db_router.py)."""
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        # Authentication above still reads from the primary
+        super().initial(request, *args, **kwargs)
+        self._replica_scope = ExitStack()
+        action = getattr(self, 'action', None)
+        if request.method in permissions.SAFE_METHODS and (action is None or action in self.replica_actions):
+            self._replica_scope.enter_context(replica_reads())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        scope = getattr(self, '_replica_scope', None)
+        if scope is not None:
+            scope.close()
+        return super().finalize_response(request, response, *args, **kwargs)
 
 
 class IsAdmin(permissions.BasePermission):
@@ -17,9 +132,14 @@ class IsAdmin(permissions.BasePermission):
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_scope = 'auth'
+
+class ThrottledTokenRefreshView(TokenRefreshView):
+    throttle_scope = 'auth'
 
 class RegisterView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'register'
 
     def post(self, request, *args, **kwargs):
         serializer = UserSerializer(data=request.data)
@@ -38,6 +158,11 @@ class UserViewSet(viewsets.ModelViewSet):
     serializer_class = UserSerializer
     permission_classes = [permissions.AllowAny]
 
+    def get_throttles(self):
+        # Sign-ups through POST /users/ share the register limit
+        self.throttle_scope = 'register' if self.action == 'create' else None
+        return super().get_throttles()
+
     def create(self, request, *args, **kwargs):
         # Register View
         serializer = self.get_serializer(data=request.data)
@@ -45,42 +170,240 @@ class UserViewSet(viewsets.ModelViewSet):
         self.perform_create(serializer)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-class ProfileViewSet(viewsets.ModelViewSet):
+class ProfileViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
-    filter_backends = [filters.SearchFilter]
+    # ?search= also matches a skill name or alias; ?skill= filters by skills through the taxonomy
+    filter_backends = [TalentSearchFilter, SkillFilter]
     search_fields = ['user__first_name', 'prodi', 'about'] # Updated search fields
+    throttle_scope = 'profiles'
 
     def get_queryset(self):
-        queryset = Profile.objects.select_related('user')
-        queryset = queryset.exclude(user__role='admin')
-        return queryset.filter(is_active=True)
+        # ?ordering=featured|endorsements|experience|recent, each backed by an index
+        return public_profile_queryset(self.request.query_params.get('ordering'))
 
-    @action(detail=False, methods=['GET', 'PUT'], permission_classes=[permissions.IsAuthenticated])
+    @action(detail=False, methods=['GET'])
+    def featured(self, request):
+        """Top-ranked talents for the Home page (stable order, single index scan)."""
+        try:
+            limit = min(int(request.query_params.get('limit', FEATURED_TALENTS_LIMIT)), 50)
+        except ValueError:
+            limit = FEATURED_TALENTS_LIMIT
+        rows = document_rows(public_profile_queryset('featured'))[:max(limit, 1)]
+        return Response(self._render(list(rows)))
+
+    @action(detail=False, methods=['GET'], throttle_scope='typeahead')
+    def typeahead(self, request):
+        """Fuzzy name / NIM suggestions for the search box; cheap enough for every keystroke."""
+        try:
+            limit = int(request.query_params.get('limit', TYPEAHEAD_LIMIT))
+        except ValueError:
+            limit = TYPEAHEAD_LIMIT
+        # NIMs are admin-only: nobody else may find a profile by one
+        show_nim = IsAdmin().has_permission(request, self)
+        matches = typeahead(request.query_params.get('q', ''), limit, match_nim=show_nim)
+        profiles = Profile.objects.select_related('user').in_bulk([pk for pk, _, _ in matches])
+        results = []
+        for pk, score, matched in matches:
+            profile = profiles.get(pk)
+            if profile is None:
+                continue
+            result = {
+                'id': profile.pk,
+                'name': profile.user.get_full_name(),
+                'major': profile.prodi,
+                'avatar': profile.user.photo_profile,
+                'score': score,
+                'matched': matched,
+            }
+            if show_nim:
+                result['nim'] = profile.nim
+            results.append(result)
+        response = Response({'results': results})
+        response['Cache-Control'] = 'private, max-age=30' if show_nim else 'public, max-age=30'
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    @action(detail=False, methods=['GET'])
+    def changes(self, request):
+        """Incremental sync: profiles changed after ?cursor= (or ?updated_since=), with tombstones."""
+        return Response(feed_response_data(request, public_profile_queryset(), self.get_serializer_class()))
+
+    def _render(self, rows):
+        # Stored profile documents with this viewer's fields merged in (see api/documents.py)
+        return render_documents(rows, self.request.user, self.request.build_absolute_uri)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        aggregates = queryset.order_by().aggregate(**LIST_VALIDATOR_AGGREGATES)
+        etag, last_modified = list_validators(request, aggregates)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        rows = self.paginate_queryset(document_rows(queryset))
+        if rows is None:
+            response = Response(self._render(list(document_rows(queryset))))
+        else:
+            response = self.get_paginated_response(self._render(rows))
+        return set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        # One row carries the validators and the stored document, no related tables are read
+        row = document_rows(self.get_queryset().order_by().filter(pk=kwargs[self.lookup_field])).first()
+        if row is None:
+            return super().retrieve(request, *args, **kwargs)
+        # Counted before the 304 check, so revalidations count as views too
+        record_view(request, row.pk, row.user_id)
+        etag, last_modified = detail_validators(request, row.pk, row.content_version, row.updated_at, row.views_total)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        documents = self._render([row])
+        if not documents:
+            return super().retrieve(request, *args, **kwargs)
+        return set_validators(Response(documents[0]), etag, last_modified)
+
+    @action(detail=True, methods=['GET'], url_path='views', permission_classes=[permissions.IsAuthenticated])
+    def view_stats(self, request, pk=None):
+        """Daily views of a profile for ?days= (default 30, at most 365); its owner and admins only."""
+        profile = Profile.objects.only('pk', 'user_id', 'views_total').filter(pk=pk).first()
+        if profile is None:
+            return Response({'detail': 'Profile not found.'}, status=status.HTTP_404_NOT_FOUND)
+        if profile.user_id != request.user.pk and not IsAdmin().has_permission(request, self):
+            return Response({'detail': 'You do not have permission to perform this action.'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            days = min(max(int(request.query_params.get('days', PROFILE_VIEW_STATS_DAYS)), 1), 365)
+        except ValueError:
+            return Response({'detail': 'days must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'total': profile.views_total, 'days': daily_views(profile.pk, days)})
+
+    @action(detail=False, methods=['GET', 'PUT', 'PATCH'], permission_classes=[permissions.IsAuthenticated])
     def me(self, request):
-        profile, created = Profile.objects.get_or_create(user=request.user)
         if request.method == 'GET':
+            profile = Profile.objects.filter(user=request.user).first()
+            if profile is None:
+                # Reads never restore an archived profile; the client asks for it with POST me/restore/
+                if ArchivedProfile.objects.filter(user=request.user).exists():
+                    return Response(
+                        {'detail': 'Your profile is archived.', 'archived': True},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+                profile, _ = Profile.objects.get_or_create(user=request.user)
             serializer = self.get_serializer(profile)
             return Response(serializer.data)
-        elif request.method == 'PUT':
+        # Saving is an explicit action, so it brings an archived profile back
+        profile = get_or_restore_profile(request.user)
+        if request.method == 'PUT':
             data = request.data.copy()
-            data.pop("file", None)
-            data.pop("photo", None)
-            data.pop("avatar", None)
-            data.pop("photo_profile", None)
+            for field in PHOTO_FIELDS:
+                data.pop(field, None)
             serializer = self.get_serializer(profile, data=data, partial=True)
             serializer.is_valid(raise_exception=True)
             serializer.save()
             return Response(serializer.data)
+        return self._edit_me(request, profile)
+
+    @action(detail=False, methods=['POST'], url_path='me/restore', permission_classes=[permissions.IsAuthenticated])
+    def restore_me(self, request):
+        """Bring the current user's archived profile back to the live tables."""
+        archived = ArchivedProfile.objects.filter(user=request.user).first()
+        if archived is None:
+            profile = Profile.objects.filter(user=request.user).first()
+            if profile is None:
+                return Response({'detail': 'No archived profile.'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(self.get_serializer(profile).data)
+        try:
+            profile = restore_profile(archived)
+        except ArchiveError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response(self.get_serializer(profile).data)
+
+    def _edit_me(self, request, profile):
+        """Apply a whole Dashboard "Save" (user, profile, photo and relation diffs) at once."""
+        data = self._editor_payload(request.data)
+        serializer = ProfileEditSerializer(profile, data=data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
 
-class SkillViewSet(viewsets.ModelViewSet):
+        # Upload once the payload is valid, and before opening the transaction so the storage
+        # round-trip never holds locks
+        photo_file = request.FILES.get("file") or request.FILES.get("photo") or request.FILES.get("avatar")
+        public_url = None
+        if photo_file:
+            try:
+                public_url = upload_profile_photo(photo_file)
+            except SupabaseUploadError as exc:
+                return storage_error_response(exc)
+
+        previous_url = request.user.photo_profile
+        try:
+            with transaction.atomic():
+                if public_url:
+                    request.user.photo_profile = public_url
+                    request.user.save(update_fields=["photo_profile"])
+                serializer.save()
+                # The editor writes with bulk queries, which skip the version and saved-search signals
+                touch_profile(profile_id=profile.pk)
+                percolate_profile(profile.pk)
+        except Exception:
+            if public_url:
+                request.user.photo_profile = previous_url
+                discard_unreferenced_photo(public_url)
+            raise
+        profile = Profile.objects.select_related('user').prefetch_related(*PROFILE_PREFETCH).get(pk=profile.pk)
+        return Response(self.get_serializer(profile).data)
+
+    @staticmethod
+    def _editor_payload(data):
+        # Multipart requests carry the relation diffs as JSON-encoded strings
+        if not hasattr(data, 'getlist'):
+            return data
+        payload = {key: data.get(key) for key in data.keys() if key not in PHOTO_FIELDS}
+        for key in EDITOR_DIFF_FIELDS:
+            if isinstance(payload.get(key), str):
+                try:
+                    payload[key] = json.loads(payload[key])
+                except ValueError:
+                    raise serializers.ValidationError({key: "Must be a JSON object."})
+        return payload
+
+class SkillViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     # Public list of all available skills for autocomplete potentially
     queryset = Skill.objects.all()
     serializer_class = SkillSerializer
     permission_classes = [permissions.AllowAny]
 
+class SkillTrendingView(ReplicaReadMixin, APIView):
+    """Skills gaining endorsements: ?days= window (default 7) and ?limit=, read from the rollups"""
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        try:
+            days = int(request.query_params.get('days', TRENDING_DAYS))
+            limit = int(request.query_params.get('limit', TRENDING_LIMIT))
+        except ValueError:
+            return Response({'detail': 'days and limit must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        response = Response(trending_skills(days, limit))
+        response['Cache-Control'] = 'public, max-age=60'
+        return response
+
+class SkillRelatedView(ReplicaReadMixin, APIView):
+    """Skills students often have together with this one (?limit=, default 5), from the co-occurrence counts"""
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, skill_id):
+        try:
+            limit = int(request.query_params.get('limit', RELATED_LIMIT))
+        except ValueError:
+            return Response({'detail': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        skill = Skill.objects.only('pk', 'name').filter(pk=skill_id).first()
+        if skill is None:
+            return Response({'detail': 'Skill not found.'}, status=status.HTTP_404_NOT_FOUND)
+        response = Response({'skill': {'id': skill.pk, 'name': skill.name}, 'results': related_skills(skill.pk, limit)})
+        response['Cache-Control'] = 'public, max-age=300'
+        return response
+
 class ProfileSkillViewSet(viewsets.ModelViewSet):
     # Manage SKILLS OF THE CURRENT USER
     serializer_class = ProfileSkillSerializer
@@ -104,7 +427,7 @@ class ProfileSkillViewSet(viewsets.ModelViewSet):
         return ProfileSkill.objects.filter(profile__user=self.request.user)
 
     def perform_create(self, serializer):
-        profile, _ = Profile.objects.get_or_create(user=self.request.user)
+        profile = get_or_restore_profile(self.request.user)
         skill_name = serializer.validated_data.pop('skill_name', None) or self.request.data.get('name')
         skill_id = serializer.validated_data.pop('skill_id', None) or self.request.data.get('id')
 
@@ -116,7 +439,7 @@ class ProfileSkillViewSet(viewsets.ModelViewSet):
                 skill = None
 
         if not skill and skill_name:
-            skill, _ = Skill.objects.get_or_create(name=skill_name)
+            skill = resolve_or_create_skill(skill_name)
 
         if not skill:
             raise serializers.ValidationError({"name": "Skill name or valid ID required."})
@@ -150,21 +473,139 @@ class ExperienceViewSet(viewsets.ModelViewSet):
         return Experience.objects.filter(profile__user=self.request.user)
 
     def perform_create(self, serializer):
-        profile, _ = Profile.objects.get_or_create(user=self.request.user)
+        profile = get_or_restore_profile(self.request.user)
         serializer.save(profile=profile)
 
 
-class AdminStudentsView(APIView):
+class SavedSearchViewSet(viewsets.ModelViewSet):
+    """The current user's saved talent searches; new matches arrive on each search's /matches/ feed"""
+    serializer_class = SavedSearchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return SavedSearch.objects.filter(owner=self.request.user).select_related('skill').order_by('-id')
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            refresh_search(serializer.save(owner=self.request.user))
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            refresh_search(serializer.save())
+
+    @action(detail=True, methods=['GET'])
+    def matches(self, request, pk=None):
+        """Profiles matched since ?cursor= (the next_cursor of the previous page), oldest first."""
+        search = self.get_object()
+        params = request.query_params
+        try:
+            cursor = int(params['cursor']) if params.get('cursor') not in (None, '') else None
+            limit = int(params.get('limit', MATCH_PAGE_LIMIT))
+        except ValueError:
+            raise serializers.ValidationError({'detail': 'cursor and limit must be integers.'})
+        rows, next_cursor, has_more = matches_page(search, cursor, limit)
+        results = [
+            {
+                'cursor': match.id,
+                'matched_at': match.matched_at,
+                'profile_id': match.profile_id,
+                'name': match.profile.user.get_full_name(),
+                'major': match.profile.prodi,
+                'year': match.profile.entry_year,
+                'avatar': match.profile.user.photo_profile,
+            }
+            for match in rows
+        ]
+        return Response({'results': results, 'next_cursor': next_cursor, 'has_more': has_more})
+
+
+class BatchView(APIView):
+    """
+    Run several API calls in one round-trip: {"requests": [{"method", "path", "body"?, "headers"?}], "atomic"?}.
+
+    Subrequests run in order with the caller's credentials and come back as
+    {"responses": [{"status", "headers", "body"}]}. With "atomic": true the writes share
+    one transaction that is rolled back at the first failed subrequest; the rest are
+    reported as 424.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        subrequests = serializer.validated_data['requests']
+        api_prefix = reverse('batch').removesuffix('batch/')
+
+        if all(spec['method'] in permissions.SAFE_METHODS for spec in subrequests):
+            # Read-only batches should not pin the client to the primary (ReplicaPinningMiddleware)
+            request._request.read_only = True
+
+        if not serializer.validated_data['atomic']:
+            return Response({'responses': [run_subrequest(request, spec, api_prefix, BatchView) for spec in subrequests]})
+
+        responses = []
+        with transaction.atomic():
+            for spec in subrequests:
+                result = run_subrequest(request, spec, api_prefix, BatchView)
+                responses.append(result)
+                if result['status'] >= 400:
+                    transaction.set_rollback(True)
+                    break
+        skipped = {'status': 424, 'headers': {}, 'body': {'detail': 'Skipped after an earlier subrequest failed.'}}
+        responses += [skipped] * (len(subrequests) - len(responses))
+        return Response({'responses': responses})
+
+
+class MetricsView(APIView):
+    """Admin API exposing shared counters (shed requests, throttled requests per scope) and circuit breaker states"""
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return Response({'counters': metrics.counters(), 'circuit_breakers': breaker_states()})
+
+
+class AdminProfileReportView(APIView):
+    """Admin API returning a stored request profile (see RequestProfilerMiddleware)"""
+    permission_classes = [IsAdmin]
+
+    def get(self, request, report_id):
+        stored = load_report(report_id)
+        if stored is None:
+            return Response({'detail': 'Profile report not found or expired.'}, status=status.HTTP_404_NOT_FOUND)
+        if request.query_params.get('download') == 'pstats':
+            response = HttpResponse(stored['pstats'], content_type='application/octet-stream')
+            response['Content-Disposition'] = f'attachment; filename="{report_id}.prof"'
+            return response
+        return Response(stored['report'])
+
+
+class AdminStudentsView(ReplicaReadMixin, APIView):
     """Admin API for managing all student profiles"""
     permission_classes = [IsAdmin]
 
     def get(self, request):
         """Get all student profiles with their status"""
-        profiles = Profile.objects.exclude(user__role='admin').select_related('user')
-        serializer = ProfileSerializer(profiles, many=True)
+        profiles = Profile.objects.exclude(user__role='admin').order_by('pk')
+        if engine_enabled(profiles.db):
+            # Every student in one statement, streamed as PostgreSQL produces it
+            return stream_payloads(profiles)
+        serializer = ProfileSerializer(profiles.select_related('user').prefetch_related(*PROFILE_PREFETCH), many=True)
         return Response(serializer.data)
 
 
+class AdminStudentChangesView(APIView):
+    """Admin change feed; unlike the public feed it includes deactivated profiles"""
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        profiles = (
+            Profile.objects.select_related('user')
+            .prefetch_related(*PROFILE_PREFETCH)
+            .exclude(user__role='admin')
+        )
+        return Response(feed_response_data(request, profiles, ProfileSerializer))
+
+
 class AdminStudentDetailView(APIView):
     """Admin API for managing individual student profile"""
     permission_classes = [IsAdmin]
@@ -205,6 +646,48 @@ class AdminStudentDetailView(APIView):
         return Response(serializer.data)
 
 
+class AdminArchiveView(generics.ListAPIView):
+    """Admin API listing archived profiles; POST {"user_id"} archives one student now"""
+    permission_classes = [IsAdmin]
+    serializer_class = ArchivedProfileSerializer
+
+    def get_queryset(self):
+        return ArchivedProfile.objects.defer('data').order_by('-archived_at', '-id')
+
+    def post(self, request):
+        profile_id = Profile.objects.filter(
+            user_id=request.data.get('user_id'), user__role='mahasiswa'
+        ).values_list('pk', flat=True).first()
+        if profile_id is None:
+            return Response({'detail': 'Student not found'}, status=status.HTTP_404_NOT_FOUND)
+        archived = archive_profile(profile_id, reason='manual')
+        return Response(ArchivedProfileSerializer(archived).data, status=status.HTTP_201_CREATED)
+
+
+class AdminArchivedProfileView(APIView):
+    """Admin API showing one archived profile; POST restores it to the live tables"""
+    permission_classes = [IsAdmin]
+
+    def get_archived(self, profile_id):
+        return ArchivedProfile.objects.filter(profile_id=profile_id).first()
+
+    def get(self, request, profile_id):
+        archived = self.get_archived(profile_id)
+        if archived is None:
+            return Response({'detail': 'Archived profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(archived_detail(archived))
+
+    def post(self, request, profile_id):
+        archived = self.get_archived(profile_id)
+        if archived is None:
+            return Response({'detail': 'Archived profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            profile = restore_profile(archived)
+        except ArchiveError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response(ProfileSerializer(profile).data)
+
+
 class ProfilePhotoUploadView(APIView):
     """Upload a profile photo to Supabase Storage and persist the public URL."""
 
@@ -222,7 +705,7 @@ class ProfilePhotoUploadView(APIView):
         try:
             public_url = upload_profile_photo(photo_file)
         except SupabaseUploadError as exc:
-            return Response({"detail": str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
+            return storage_error_response(exc)
 
         request.user.photo_profile = public_url
         request.user.save(update_fields=["photo_profile"])
@@ -233,6 +716,73 @@ class ProfilePhotoUploadView(APIView):
         return self.post(request, *args, **kwargs)
 
 
+class DirectUploadSignView(APIView):
+    """
+    Step one of a direct upload: a short-lived URL the client sends the file to itself.
+
+    Body: {"target": "photo" | "project_image", "project_id"?, "content_type", "size"}.
+    The response carries the upload_id to pass to DirectUploadConfirmView afterwards.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    TARGETS = ("photo", "project_image")
+
+    def post(self, request, *args, **kwargs):
+        target = request.data.get("target", "photo")
+        if target not in self.TARGETS:
+            return Response({"detail": "target must be 'photo' or 'project_image'."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            size = int(request.data["size"]) if request.data.get("size") is not None else None
+        except (TypeError, ValueError):
+            return Response({"detail": "size must be a number of bytes."}, status=status.HTTP_400_BAD_REQUEST)
+
+        project_id = None
+        if target == "project_image":
+            project = Project.objects.filter(
+                pk=request.data.get("project_id") or 0, profile__user=request.user
+            ).first()
+            if project is None:
+                return Response({"detail": "Project not found."}, status=status.HTTP_404_NOT_FOUND)
+            project_id = project.pk
+
+        try:
+            upload = sign_upload(request.user.pk, target, request.data.get("content_type", ""), size, project_id)
+        except DirectUploadError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except SupabaseStorageError as exc:
+            return storage_error_response(exc)
+        return Response(upload, status=status.HTTP_201_CREATED)
+
+
+class DirectUploadConfirmView(APIView):
+    """Step two: check the uploaded object and record it on the user or project."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        try:
+            upload = load_upload_id(str(request.data.get("upload_id", "")), request.user.pk)
+            project = None
+            if upload["t"] == "project_image":
+                project = Project.objects.filter(pk=upload["p"], profile__user=request.user).first()
+                if project is None:
+                    return Response({"detail": "Project not found."}, status=status.HTTP_404_NOT_FOUND)
+            public_url, key = confirm_upload(upload)
+        except DirectUploadError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except SupabaseStorageError as exc:
+            return storage_error_response(exc)
+
+        if project is not None:
+            project.image.name = key
+            project.save(update_fields=["image"])
+            return Response({"project_id": project.pk, "image": project.image.url}, status=status.HTTP_200_OK)
+
+        request.user.photo_profile = public_url
+        request.user.save(update_fields=["photo_profile"])
+        return Response({"photo_profile": public_url}, status=status.HTTP_200_OK)
+
+
 class SkillEndorsementView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -299,3 +849,34 @@ class SkillEndorsementView(APIView):
             },
             status=status.HTTP_200_OK,
         )
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets EventSource requests through content negotiation; error bodies are sent as JSON."""
+    media_type = 'text/event-stream'
+    format = 'sse'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b'' if data is None else json.dumps(data).encode()
+
+
+class EndorsementSnapshotView(APIView):
+    """
+    WSGI stand-in for the live endorsement stream in api/async_views.py. It sends the same
+    snapshot event and ends the response, and EventSource reconnects after
+    SSE_FALLBACK_RETRY_MS, so sync deployments poll the counts instead of getting a 404.
+    """
+    permission_classes = [permissions.AllowAny]
+    renderer_classes = [EventStreamRenderer]
+    throttle_scope = 'profiles'
+
+    def get(self, request, pk):
+        if not public_profile_queryset().order_by().filter(pk=pk).exists():
+            return Response({'detail': 'No Profile matches the given query.'}, status=status.HTTP_404_NOT_FOUND)
+        snapshot = [{'id': skill_id, 'endorsements_count': count} for skill_id, count in endorsement_counts(pk)]
+        response = HttpResponse(
+            f"retry: {settings.SSE_FALLBACK_RETRY_MS}\n" + sse_event('snapshot', snapshot),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        return response
@@ -5,6 +5,12 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+
+Run with e.g. ``uvicorn backend.asgi:application --workers 2``. Under ASGI the
+public profile reads and photo uploads use the async views in api/async_views.py
+(set ASYNC_READ_VIEWS=false to keep the sync DRF views), and the endorsement stream
+at /api/profiles/<id>/endorsements/stream/ pushes live updates; under WSGI it only
+serves a snapshot that the browser polls.
 """
 
 import os
@@ -12,5 +18,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+os.environ.setdefault('ASYNC_READ_VIEWS', 'true')
 
 application = get_asgi_application()
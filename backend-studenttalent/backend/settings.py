@@ -36,6 +36,7 @@ INSTALLED_APPS = [
     'rest_framework',
     'corsheaders',
     'storages',  # Add django-storages
+    'django.contrib.postgres',  # pg_trgm lookups for typeahead (api/search.py)
 
     # Local
     'api',
@@ -44,11 +45,14 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware', # Top
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.ConcurrencyLimitMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.ReplicaPinningMiddleware',
+    'api.middleware.RequestProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -68,6 +72,30 @@ SUPABASE_PUBLIC_STORAGE_URL = (
     else ""
 )
 
+# Supabase Storage calls: timeouts (seconds) and the circuit breaker around them (api/utils/circuit_breaker.py).
+# The circuit opens when FAILURE_RATE of at least MIN_CALLS calls in WINDOW_SECONDS failed or took longer
+# than SLOW_CALL_SECONDS, then fails fast for OPEN_SECONDS before letting one probe call through.
+STORAGE_CONNECT_TIMEOUT = float(os.getenv("STORAGE_CONNECT_TIMEOUT", "3"))
+STORAGE_READ_TIMEOUT = float(os.getenv("STORAGE_READ_TIMEOUT", "15"))
+STORAGE_BREAKER_FAILURE_RATE = float(os.getenv("STORAGE_BREAKER_FAILURE_RATE", "0.5"))
+STORAGE_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("STORAGE_BREAKER_SLOW_CALL_SECONDS", "5"))
+STORAGE_BREAKER_MIN_CALLS = int(os.getenv("STORAGE_BREAKER_MIN_CALLS", "5"))
+STORAGE_BREAKER_WINDOW_SECONDS = float(os.getenv("STORAGE_BREAKER_WINDOW_SECONDS", "60"))
+STORAGE_BREAKER_OPEN_SECONDS = float(os.getenv("STORAGE_BREAKER_OPEN_SECONDS", "30"))
+# Degraded mode: photo uploads that hit a storage outage are kept here and sent later by
+# replay_storage_spool (run it on every host). The photo URL is returned right away but only
+# resolves after the replay. Empty disables spooling; uploads then fail with 503 / 502.
+STORAGE_SPOOL_DIR = os.getenv("STORAGE_SPOOL_DIR", "")
+
+# Direct uploads (POST /api/uploads/sign/ then /confirm/): limits bound to each signed upload URL
+DIRECT_UPLOAD_MAX_BYTES = int(os.getenv("DIRECT_UPLOAD_MAX_BYTES", str(5 * 1024 * 1024)))
+DIRECT_UPLOAD_URL_TTL = int(os.getenv("DIRECT_UPLOAD_URL_TTL", "300"))  # seconds
+DIRECT_UPLOAD_CONTENT_TYPES = [
+    value.strip()
+    for value in os.getenv("DIRECT_UPLOAD_CONTENT_TYPES", "image/jpeg,image/png,image/webp,image/gif").split(",")
+    if value.strip()
+]
+
 # Optional local storage override (for Vite + local previews)
 USE_SUPABASE_STORAGE = os.getenv("USE_SUPABASE_STORAGE") == "true"
 STATICFILES_BACKEND = (
@@ -139,6 +167,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
+ASGI_APPLICATION = 'backend.asgi.application'
+
+# Serve public profile reads, photo uploads and the SSE stream from async views (enabled by backend/asgi.py)
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "false").lower() == "true"
 
 # Database
 DATABASES = {
@@ -155,13 +187,94 @@ if os.getenv('DATABASE_URL'):
             default=os.getenv('DATABASE_URL'),
             conn_max_age=0,  # Close connections immediately to prevent pool exhaustion
             conn_health_checks=True,
-            ssl_require=True
+            ssl_require=os.getenv("DATABASE_SSL_REQUIRE", "true").lower() == "true",
         )
         # For Supabase with PgBouncer, reduce connection timeout
         DATABASES['default']['CONN_HEALTH_CHECKS'] = True
     except Exception as e:
         print(f"Warning: Could not parse DATABASE_URL: {e}, using default SQLite.")
 
+# Cache (shared across workers when REDIS_URL is set; used by throttling and metrics)
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Live updates (SSE): api.pubsub.InProcessBroker for a single process, RedisBroker across workers
+PUBSUB_REDIS_URL = os.getenv("REDIS_URL")
+PUBSUB_BACKEND = os.getenv(
+    "PUBSUB_BACKEND",
+    "api.pubsub.RedisBroker" if PUBSUB_REDIS_URL else "api.pubsub.InProcessBroker",
+)
+SSE_MAX_SUBSCRIBERS = int(os.getenv("SSE_MAX_SUBSCRIBERS", "5000"))  # open streams per worker
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "20"))
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "5000"))
+# Poll interval of the one-shot snapshot served in place of the stream under WSGI
+SSE_FALLBACK_RETRY_MS = int(os.getenv("SSE_FALLBACK_RETRY_MS", "30000"))
+
+# Admins can profile single requests with an X-Profile header; off means the middleware is not loaded
+REQUEST_PROFILING_ENABLED = os.getenv("REQUEST_PROFILING_ENABLED", "false").lower() == "true"
+
+# Most subrequests accepted by POST /api/batch/
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+
+# Load shedding: max in-flight requests per worker process (0 disables)
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "0"))
+REQUEST_QUEUE_TIMEOUT = float(os.getenv("REQUEST_QUEUE_TIMEOUT", "0.5"))
+LOAD_SHEDDING_EXEMPT_PATHS = ["/static/", "/admin/"]
+
+# Read replicas: DATABASE_REPLICA_URLS="postgres://...,postgres://..." (or sqlite:///... locally)
+DATABASE_REPLICAS = []
+for index, replica_url in enumerate(
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+):
+    alias = f"replica_{index + 1}"
+    DATABASES[alias] = dj_database_url.parse(
+        replica_url,
+        conn_max_age=0,
+        conn_health_checks=True,
+        ssl_require=(
+            not replica_url.startswith("sqlite")
+            and os.getenv("DATABASE_REPLICA_SSL_REQUIRE", "true").lower() == "true"
+        ),
+    )
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+DATABASE_REPLICA_MAX_LAG = float(os.getenv("DATABASE_REPLICA_MAX_LAG", "5"))  # seconds
+READ_YOUR_WRITES_WINDOW = int(os.getenv("READ_YOUR_WRITES_WINDOW", "15"))  # seconds
+# Change feed rows younger than this are held back until their (single statement) inserts commit
+CHANGE_FEED_SETTLE_SECONDS = float(os.getenv("CHANGE_FEED_SETTLE_SECONDS", "2"))
+
+# archive_profiles moves profiles out of the live tables when they have been deactivated
+# for this many days, or when their entry year is this many years back (0 disables either)
+ARCHIVE_INACTIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_INACTIVE_AFTER_DAYS", "180"))
+ARCHIVE_GRADUATED_AFTER_YEARS = int(os.getenv("ARCHIVE_GRADUATED_AFTER_YEARS", "8"))
+
+# "postgres" builds profile payloads (stored documents, the admin student list) in SQL with
+# json_build_object / json_agg; "python" or a non-PostgreSQL database uses ProfileSerializer
+PROFILE_JSON_ENGINE = os.getenv("PROFILE_JSON_ENGINE", "python")
+
+# Profile view counts (api/profile_views.py): buffered in the worker (ProcessBuffer) or in the shared
+# cache (CacheBuffer), flushed to the database every FLUSH_SECONDS (0 leaves it to flush_profile_views).
+# A viewer counts once per profile per DEDUP_SECONDS.
+PROFILE_VIEW_BUFFER = os.getenv(
+    "PROFILE_VIEW_BUFFER",
+    "api.profile_views.CacheBuffer" if os.getenv("REDIS_URL") else "api.profile_views.ProcessBuffer",
+)
+PROFILE_VIEW_FLUSH_SECONDS = float(os.getenv("PROFILE_VIEW_FLUSH_SECONDS", "60"))
+PROFILE_VIEW_DEDUP_SECONDS = int(os.getenv("PROFILE_VIEW_DEDUP_SECONDS", "1800"))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     { 'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator', },
@@ -197,8 +310,29 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,  # Reduce query overhead
+    'DEFAULT_THROTTLE_CLASSES': (
+        'api.throttling.AnonTokenBucketThrottle',
+        'api.throttling.UserTokenBucketThrottle',
+        'api.throttling.ScopedWindowThrottle',  # exact under parallel bursts
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '300/min',  # per IP
+        'user': '1200/min',  # per user
+        'profiles': '120/min',  # public talent list, detail and search
+        'typeahead': '600/min',  # name / NIM suggestions, one call per keystroke
+        'auth': '10/min',  # login / token refresh (PBKDF2 is expensive)
+        'register': '5/min',
+    },
 }
 
+# Override any rate with THROTTLE_RATES="auth=20/min,profiles=60/min"
+for item in os.getenv("THROTTLE_RATES", "").split(","):
+    if "=" in item:
+        scope, rate = item.split("=", 1)
+        REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'][scope.strip()] = rate.strip() or None
+if os.getenv("RATE_LIMIT_ENABLED", "true").lower() != "true":
+    REST_FRAMEWORK['DEFAULT_THROTTLE_CLASSES'] = ()
+
 # CORS
 CORS_ALLOWED_ORIGINS = [
     origin.strip()
@@ -208,6 +342,8 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_ALL_ORIGINS = os.getenv("CORS_ALLOW_ALL_ORIGINS", "").lower() == "true"
 if DEBUG and not CORS_ALLOWED_ORIGINS:
     CORS_ALLOW_ALL_ORIGINS = True
+# Let browser clients revalidate profile payloads with If-None-Match
+CORS_EXPOSE_HEADERS = ["ETag", "Last-Modified", "X-Profile-Report"]
 
 CSRF_TRUSTED_ORIGINS = [
     origin.strip()
@@ -18,7 +18,11 @@ import {
   Share2,
 } from "lucide-react";
 import { generateCV } from "../utils/pdfGenerator";
-import { endorseSkillAPI, unendorseSkillAPI } from "../utils/api";
+import {
+  endorseSkillAPI,
+  subscribeEndorsementCounts,
+  unendorseSkillAPI,
+} from "../utils/api";
 import * as QRCode from "qrcode";
 
 export default function TalentDetail() {
@@ -36,6 +40,25 @@ export default function TalentDetail() {
     loadTalent();
   }, [id]);
 
+  useEffect(() => {
+    if (!id) return;
+    return subscribeEndorsementCounts(id, (counts) => {
+      const byId = new Map(counts.map((c) => [String(c.id), c.endorsements_count]));
+      setTalent((current) =>
+        current
+          ? {
+              ...current,
+              skills: current.skills.map((skill) =>
+                byId.has(skill.id)
+                  ? { ...skill, endorsements_count: byId.get(skill.id) }
+                  : skill
+              ),
+            }
+          : current
+      );
+    });
+  }, [id]);
+
   const loadTalent = async () => {
     if (!id) return;
 
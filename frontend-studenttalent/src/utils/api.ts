@@ -38,6 +38,7 @@ export interface UserProfile {
   skills?: SkillPayload[];
   experiences?: ExperiencePayload[];
   portfolio?: string[];
+  views?: number;
 }
 
 const defaultAvatar = "https://api.dicebear.com/7.x/initials/svg?seed=UMS";
@@ -68,19 +69,42 @@ async function request(
   if (!res.ok) {
     const text = await res.text();
     let message = text;
+    let data: any = null;
     try {
-      const data = JSON.parse(text);
+      data = JSON.parse(text);
       message = data.detail || data.error || JSON.stringify(data);
     } catch (_) {
       // ignore JSON parse error
     }
-    throw new Error(message || `Request failed: ${res.status}`);
+    throw Object.assign(new Error(message || `Request failed: ${res.status}`), { status: res.status, data });
   }
 
   if (res.status === 204) return null;
   return res.json();
 }
 
+export type BatchRequest = {
+  method?: string;
+  path: string;
+  body?: unknown;
+  headers?: Record<string, string>;
+};
+export type BatchResponse = { status: number; headers: Record<string, string>; body: any };
+
+// Several API calls in one round-trip; paths include the /api prefix, e.g. "/api/profiles/me/"
+export async function batchAPI(
+  requests: BatchRequest[],
+  token?: string,
+  atomic = false
+): Promise<BatchResponse[]> {
+  const data = await request(
+    "/batch/",
+    { method: "POST", body: JSON.stringify({ requests, atomic }) },
+    token
+  );
+  return data.responses;
+}
+
 // Helper to get base URL (remove /api from the end)
 const BASE_URL = API_BASE_URL.replace('/api', '');
 
@@ -121,6 +145,7 @@ function mapProfileToUser(profile: any): UserProfile {
       current: exp.current,
     })),
     portfolio: profile.portfolio || [],
+    views: profile.views ?? 0,
   };
 }
 
@@ -153,13 +178,11 @@ export async function registerAPI(userData: any) {
 
   // Optionally update profile info if provided
   if (userData.major || userData.year || userData.bio) {
-    await updateProfileAPI(loginResult.token, {
+    const refreshed = await updateProfileAPI(loginResult.token, {
       major: userData.major,
       year: userData.year,
       bio: userData.bio,
     });
-    // refresh profile
-    const refreshed = await getCurrentUserAPI(loginResult.token);
     return { ...loginResult, user: refreshed };
   }
 
@@ -167,7 +190,20 @@ export async function registerAPI(userData: any) {
 }
 
 export async function getCurrentUserAPI(token: string): Promise<UserProfile> {
-  const data = await request("/profiles/me/", { method: "GET" }, token);
+  try {
+    const data = await request("/profiles/me/", { method: "GET" }, token);
+    return mapProfileToUser(data);
+  } catch (err: any) {
+    // A returning student's archived profile comes back on their first visit
+    if (err?.status === 409 && err.data?.archived) {
+      return restoreMyProfileAPI(token);
+    }
+    throw err;
+  }
+}
+
+export async function restoreMyProfileAPI(token: string): Promise<UserProfile> {
+  const data = await request("/profiles/me/restore/", { method: "POST" }, token);
   return mapProfileToUser(data);
 }
 
@@ -184,6 +220,20 @@ export async function getTalentByIdAPI(id: string): Promise<UserProfile> {
   return mapProfileToUser(data);
 }
 
+export interface ProfileViewStats {
+  total: number;
+  days: { day: string; views: number }[];
+}
+
+// Daily view counts of a profile (its owner or an admin only)
+export async function getProfileViewsAPI(
+  token: string,
+  id: number | string,
+  days = 30
+): Promise<ProfileViewStats> {
+  return request(`/profiles/${id}/views/?days=${days}`, { method: "GET" }, token);
+}
+
 // Skills CRUD (current user)
 export async function addSkillAPI(
   token: string,
@@ -239,6 +289,78 @@ export async function unendorseSkillAPI(
   );
 }
 
+export type TrendingSkill = {
+  id: number;
+  name: string;
+  endorsements: number;
+  additions: number;
+  previous_endorsements: number;
+};
+
+// Skills gaining endorsements over the last `days` days
+export async function getTrendingSkillsAPI(days = 7, limit = 10): Promise<TrendingSkill[]> {
+  const data = await request(`/skills/trending/?days=${days}&limit=${limit}`);
+  return data.results || [];
+}
+
+export type RelatedSkill = {
+  id: number;
+  name: string;
+  profiles: number;
+  confidence: number;
+  lift: number;
+  pmi: number;
+};
+
+// Skills students often list together with this one, e.g. to suggest after adding a skill
+export async function getRelatedSkillsAPI(skillId: number | string, limit = 5): Promise<RelatedSkill[]> {
+  const data = await request(`/skills/${skillId}/related/?limit=${limit}`);
+  return data.results || [];
+}
+
+// Saved talent searches (current user); new matches arrive on the per-search feed
+export type SavedSearch = {
+  id?: number;
+  name: string;
+  skill_name?: string;
+  min_level?: SkillLevel | "";
+  prodi?: string;
+  entry_year?: number | null;
+};
+
+export async function createSavedSearchAPI(token: string, search: SavedSearch) {
+  return request("/saved-searches/", { method: "POST", body: JSON.stringify(search) }, token);
+}
+
+export async function getSavedSearchMatchesAPI(
+  token: string,
+  searchId: number,
+  cursor?: number | null
+) {
+  const query = cursor != null ? `?cursor=${cursor}` : "";
+  return request(`/saved-searches/${searchId}/matches/${query}`, {}, token);
+}
+
+export type EndorsementCount = { id: number; endorsements_count: number };
+
+// Live endorsement counts for a profile's skills (Server-Sent Events). WSGI deployments
+// answer with one snapshot and a long retry, so the browser polls them instead
+export function subscribeEndorsementCounts(
+  profileId: string | number,
+  onCounts: (counts: EndorsementCount[]) => void
+) {
+  const source = new EventSource(
+    `${API_BASE_URL}/profiles/${profileId}/endorsements/stream/`
+  );
+  source.addEventListener("snapshot", (event) =>
+    onCounts(JSON.parse((event as MessageEvent).data))
+  );
+  source.addEventListener("endorsements", (event) =>
+    onCounts([JSON.parse((event as MessageEvent).data)])
+  );
+  return () => source.close();
+}
+
 // Experience CRUD (current user)
 export async function addExperienceAPI(
   token: string,
@@ -288,61 +410,70 @@ export async function updateProfileAPI(
     >
   > & { avatarFile?: File | null }
 ) {
-  // Fetch current profile to know user id
-  const current = await getCurrentUserAPI(token);
-
-  // Update user (name/email)
-  const userPayload: any = {};
-  if (profileData.name) userPayload.name = profileData.name;
-  if (profileData.email) userPayload.email = profileData.email;
-  if (Object.keys(userPayload).length > 0) {
-    await request(
-      `/users/${current.userId}/`,
-      {
-        method: "PATCH",
-        body: JSON.stringify(userPayload),
-      },
-      token
-    );
-  }
-
+  // One PATCH applies user fields, profile fields and the photo atomically
+  const payload: Record<string, any> = {};
+  if (profileData.name) payload.name = profileData.name;
+  if (profileData.email) payload.email = profileData.email;
+  if (profileData.major !== undefined) payload.major = profileData.major;
+  if (profileData.year !== undefined) payload.year = profileData.year;
+  if (profileData.bio !== undefined) payload.bio = profileData.bio;
+  if (profileData.linkedin !== undefined) payload.linkedin = profileData.linkedin;
+  if (profileData.github !== undefined) payload.github = profileData.github;
+  if (profileData.website !== undefined) payload.website = profileData.website;
+
+  let body: BodyInit = JSON.stringify(payload);
   if (profileData.avatarFile) {
     const fd = new FormData();
+    Object.entries(payload).forEach(([key, value]) => {
+      if (value !== null && value !== undefined) fd.append(key, String(value));
+    });
     fd.append("file", profileData.avatarFile);
-    await request(
-      "/users/me/photo/",
-      {
-        method: "POST",
-        body: fd,
-      },
-      token
-    );
+    body = fd;
   }
 
-  // Update profile fields
-  const profilePayload: any = {};
-  if (profileData.major !== undefined) profilePayload.major = profileData.major;
-  if (profileData.year !== undefined) profilePayload.year = profileData.year;
-  if (profileData.bio !== undefined) profilePayload.bio = profileData.bio;
-  if (profileData.linkedin !== undefined)
-    profilePayload.linkedin = profileData.linkedin;
-  if (profileData.github !== undefined) profilePayload.github = profileData.github;
-  if (profileData.website !== undefined)
-    profilePayload.website = profileData.website;
-
-  if (Object.keys(profilePayload).length > 0) {
-    await request(
-      "/profiles/me/",
-      {
-        method: "PUT",
-        body: JSON.stringify(profilePayload),
-      },
-      token
+  const data = await request("/profiles/me/", { method: "PATCH", body }, token);
+  return mapProfileToUser(data);
+}
+
+// Direct upload: the file goes straight to storage, the API only signs and confirms it
+export async function uploadFileDirectAPI(
+  token: string,
+  file: File,
+  target: "photo" | "project_image" = "photo",
+  projectId?: number
+) {
+  const upload = await request(
+    "/uploads/sign/",
+    {
+      method: "POST",
+      body: JSON.stringify({
+        target,
+        project_id: projectId,
+        content_type: file.type,
+        size: file.size,
+      }),
+    },
+    token
+  );
+
+  let res: Response;
+  if (upload.method === "POST") {
+    const fd = new FormData();
+    Object.entries(upload.fields as Record<string, string>).forEach(([key, value]) =>
+      fd.append(key, value)
     );
+    fd.append("file", file);
+    res = await fetch(upload.url, { method: "POST", body: fd });
+  } else {
+    res = await fetch(upload.url, { method: "PUT", headers: upload.headers, body: file });
   }
+  if (!res.ok) throw new Error(`Upload failed: ${res.status}`);
 
-  const updated = await getCurrentUserAPI(token);
-  return updated;
+  return request(
+    "/uploads/confirm/",
+    { method: "POST", body: JSON.stringify({ upload_id: upload.upload_id }) },
+    token
+  );
 }
 
 // Admin APIs